@@ -0,0 +1,73 @@
+"""
+Import-time benchmark: the wall time of fresh interpreters importing
+compbrain, above the time of an interpreter doing nothing, against a budget
+per statement. The process fails when a median exceeds its budget, so it can
+guard releases
+
+    python benchmarks/import_time.py --output import.json
+    python benchmarks/import_time.py --budget "import compbrain=10"
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import numpy as np
+from collections import OrderedDict
+
+# milliseconds above the bare interpreter
+BUDGETS = OrderedDict([
+    ("import compbrain", 10.0),
+    ("import compbrain.neurons; compbrain.neurons.registry.names()", 100.0),
+    ("import compbrain; compbrain.core.Circuit", 250.0),
+    ("from compbrain.neurons import MorrisLecarNeuron", 250.0),
+    ("from compbrain.utils import read_cfg", 400.0),
+    ("import runpy, sys; sys.argv = ['run.py', '--help']; runpy.run_path('benchmarks/run.py', run_name='__main__')",
+     450.0),
+])
+
+
+def wall_time(statement: str, repeat: int) -> list:
+    """
+    wall times of fresh interpreters executing a statement, in milliseconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, stdout=subprocess.DEVNULL)
+        times.append(1e3 * (time.perf_counter() - start))
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="compbrain import-time benchmark")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--budget', action='append', default=[],
+                        help="statement=milliseconds, overrides or adds a budget")
+    parser.add_argument('--output', help="JSON file of the results")
+    args = parser.parse_args(argv)
+
+    budgets = OrderedDict(BUDGETS)
+    for item in args.budget:
+        statement, _, budget = item.rpartition('=')
+        budgets[statement] = float(budget)
+
+    baseline = float(np.median(wall_time("pass", args.repeat)))
+    rows, failed = [], False
+    for statement, budget in budgets.items():
+        median = float(np.median(wall_time(statement, args.repeat))) - baseline
+        rows.append(OrderedDict(statement=statement, milliseconds=median, budget=budget, ok=median <= budget))
+        failed |= median > budget
+        print("{:>9.1f} ms {:>8.0f} {:<4} {}".format(median, budget, 'ok' if median <= budget else 'OVER', statement))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(OrderedDict(meta=OrderedDict(python=platform.python_version(), platform=platform.platform(),
+                                                   interpreter_ms=baseline, repeat=args.repeat),
+                                  results=rows), file, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
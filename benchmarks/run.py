@@ -0,0 +1,295 @@
+"""
+Benchmarks of compbrain: the speed of every neuron model, of CustomSynapse
+fan-in and fan-out, the construction time of a Circuit against its size, and
+full execute_circuit runs over a grid of neurons x synapses x steps
+
+every case runs on each of the requested engines and reports the steps per
+second, the neuron (or synapse) steps per second and the traced memory per
+neuron, once built and added by every recorded step, the results are written
+as JSON so two releases or two engines can be compared with ``--baseline``.
+The script benchmarks the checkout it belongs to, installed or not
+
+    python benchmarks/run.py --quick --output results.json
+    python benchmarks/run.py --suite circuit --engine object population
+    python benchmarks/run.py --output new.json --baseline results.json
+"""
+import gc
+import os
+import sys
+import json
+import time
+import pkgutil
+import argparse
+import platform
+import importlib
+import tracemalloc
+import numpy as np
+from collections import OrderedDict
+
+# the compbrain of this checkout, also when it is not installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compbrain as cb
+from compbrain.core import Circuit, BaseNeuron
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import CustomSynapse, InjectCurrent
+
+DT = 1e-5
+I_EXT = 10.0
+
+# sizes: neurons per model, fan: synapses of fan-in/fan-out, build: neurons of the built circuits,
+# neurons x synapses (per neuron) x steps: the execute_circuit grid
+GRIDS = OrderedDict(
+    quick=OrderedDict(sizes=(10, 100), fan=(10, 100), build=(100, 1000), neurons=(10, 100),
+                      synapses=(0, 4), steps=(100, 500), model_steps=500, repeat=1),
+    full=OrderedDict(sizes=(10, 100, 1000), fan=(10, 100, 1000), build=(100, 1000, 10000), neurons=(10, 100, 1000),
+                     synapses=(0, 4, 16), steps=(100, 1000), model_steps=2000, repeat=3),
+)
+
+
+def neuron_models() -> list:
+    """
+    every neuron class defined in compbrain.neurons, including the modules not
+    imported by the package
+    """
+    models = OrderedDict()
+    for info in pkgutil.iter_modules(cb.neurons.__path__):
+        module = importlib.import_module("compbrain.neurons." + info.name)
+        for val in vars(module).values():
+            if isinstance(val, type) and issubclass(val, BaseNeuron) and val.__module__ == module.__name__:
+                models[val.__name__] = val
+    return list(models.values())
+
+
+def build_circuit(model, n_neurons: int, n_synapses: int, steps: int, engine: str, recorder: str,
+                  seed: int = 0) -> Circuit:
+    """
+    n_neurons neurons of one model, each driven by a constant current, and
+    n_synapses CustomSynapse between random pairs of them
+    """
+    t = np.arange(steps) * DT
+    rng = np.random.default_rng(seed)
+    neurons = [model("n{}".format(i)) for i in range(n_neurons)]
+    injections = [InjectCurrent("i{}".format(i), "None", "n{}".format(i), t=t, current=np.full(steps, I_EXT))
+                  for i in range(n_neurons)]
+    circuit = Circuit(neurons, injections, engine=engine, recorder=recorder)
+    if n_synapses:
+        circuit.connect(rng.integers(n_neurons, size=n_synapses), rng.integers(n_neurons, size=n_synapses))
+    return circuit
+
+
+def timed_run(make, steps: int, repeat: int) -> float:
+    """
+    best wall time of execute_circuit over ``repeat`` fresh circuits,
+    without progress bar
+    """
+    t = np.arange(steps) * DT
+    best = np.inf
+    for _ in range(repeat):
+        circuit = make()
+        gc.collect()
+        start = time.perf_counter()
+        circuit.execute_circuit(t, progress=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_bytes(make, steps: int = 20) -> tuple:
+    """
+    memory allocated by building a circuit and by running it for a few steps,
+    tracing slows the execution down too much to trace the timed runs
+
+    :return: (bytes after construction, bytes added per step)
+    """
+    t = np.arange(steps) * DT
+    gc.collect()
+    tracemalloc.start()
+    try:
+        circuit = make()
+        built = tracemalloc.get_traced_memory()[0]
+        circuit.execute_circuit(t, progress=False)
+        executed = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return built, (executed - built) / steps
+
+
+def record(suite: str, name: str, engine: str, recorder: str, neurons: int, synapses: int, steps: int,
+           seconds: float, memory: tuple = None, units: int = None) -> OrderedDict:
+    """
+    one row of the results, ``units`` is the number of components stepped
+    each step for the per-unit throughput, the neurons by default
+    """
+    units = neurons if units is None else units
+    row = OrderedDict(suite=suite, name=name, engine=engine, recorder=recorder, neurons=neurons,
+                      synapses=synapses, steps=steps, seconds=seconds,
+                      steps_per_second=steps / seconds if seconds else None,
+                      unit_steps_per_second=steps * units / seconds if seconds else None)
+    if memory is not None:
+        row['bytes_per_neuron_built'] = memory[0] / max(neurons, 1)
+        row['bytes_per_neuron_step'] = memory[1] / max(neurons, 1)
+    return row
+
+
+def bench_neurons(grid: dict, engines: list, recorder: str, models: list = None) -> list:
+    """
+    every neuron model alone, driven by a constant current
+    """
+    rows = []
+    steps = grid['model_steps']
+    for model in models or neuron_models():
+        for engine in engines:
+            for size in grid['sizes']:
+                make = lambda: build_circuit(model, size, 0, steps, engine, recorder)
+                seconds = timed_run(make, steps, grid['repeat'])
+                rows.append(record('neurons', model.__name__, engine, recorder, size, 0, steps, seconds,
+                                   traced_bytes(make)))
+    return rows
+
+
+def fan_circuit(kind: str, size: int, steps: int, engine: str, recorder: str) -> Circuit:
+    """
+    ``size`` CustomSynapse converging onto one neuron (fan-in) or diverging
+    from one neuron (fan-out)
+    """
+    t = np.arange(steps) * DT
+    neurons = [MorrisLecarNeuron("hub")] + [MorrisLecarNeuron("n{}".format(i)) for i in range(size)]
+    injections = [InjectCurrent("i-" + neuron.name, "None", neuron.name, t=t, current=np.full(steps, I_EXT))
+                  for neuron in neurons]
+    others = ["n{}".format(i) for i in range(size)]
+    if kind == 'fan-in':
+        synapses = [CustomSynapse("s{}".format(i), name, "hub") for i, name in enumerate(others)]
+    else:
+        synapses = [CustomSynapse("s{}".format(i), "hub", name) for i, name in enumerate(others)]
+    return Circuit(neurons, injections + synapses, engine=engine, recorder=recorder)
+
+
+def bench_synapses(grid: dict, engines: list, recorder: str) -> list:
+    """
+    CustomSynapse fan-in and fan-out, the throughput is per synapse
+    """
+    rows = []
+    steps = grid['model_steps']
+    for kind in ('fan-in', 'fan-out'):
+        for engine in engines:
+            for size in grid['fan']:
+                make = lambda: fan_circuit(kind, size, steps, engine, recorder)
+                seconds = timed_run(make, steps, grid['repeat'])
+                rows.append(record('synapses', kind, engine, recorder, size + 1, size, steps, seconds,
+                                   traced_bytes(make), units=size))
+    return rows
+
+
+def bench_build(grid: dict, engines: list, recorder: str, synapses: int = 4) -> list:
+    """
+    construction time of a Circuit against its size, including the grouping
+    into populations done before the first step of the population engine
+    """
+    rows = []
+    for engine in engines:
+        for size in grid['build']:
+            best = np.inf
+            for _ in range(grid['repeat']):
+                gc.collect()
+                start = time.perf_counter()
+                circuit = build_circuit(MorrisLecarNeuron, size, synapses * size, 2, engine, recorder)
+                if engine == 'population':
+                    circuit.build_populations()
+                best = min(best, time.perf_counter() - start)
+            row = record('build', 'Circuit', engine, recorder, size, synapses * size, 0, best,
+                         units=2 * size + synapses * size)
+            row['steps_per_second'] = row['unit_steps_per_second'] = None
+            row['seconds_per_component'] = best / (2 * size + synapses * size)
+            rows.append(row)
+    return rows
+
+
+def bench_circuit(grid: dict, engines: list, recorder: str) -> list:
+    """
+    execute_circuit over the grid of neurons x synapses per neuron x steps
+    """
+    rows = []
+    for engine in engines:
+        for size in grid['neurons']:
+            for per_neuron in grid['synapses']:
+                for steps in grid['steps']:
+                    make = lambda: build_circuit(MorrisLecarNeuron, size, per_neuron * size, steps, engine, recorder)
+                    seconds = timed_run(make, steps, grid['repeat'])
+                    rows.append(record('circuit', 'MorrisLecarNeuron', engine, recorder, size, per_neuron * size,
+                                       steps, seconds, traced_bytes(make)))
+    return rows
+
+
+SUITES = OrderedDict(neurons=bench_neurons, synapses=bench_synapses, build=bench_build, circuit=bench_circuit)
+
+
+def version():
+    try:
+        from importlib.metadata import version
+        return version('compbrain')
+    except Exception:
+        return None
+
+
+def key(row: dict) -> tuple:
+    return row['suite'], row['name'], row['engine'], row['recorder'], row['neurons'], row['synapses'], row['steps']
+
+
+def compare(rows: list, baseline: list) -> list:
+    """
+    speed of every case relative to the same case of a baseline run, above 1
+    is faster than the baseline
+
+    :return: list of (row, ratio)
+    """
+    reference = {key(row): row for row in baseline}
+    ratios = []
+    for row in rows:
+        old = reference.get(key(row))
+        if old is not None and old['seconds'] and row['seconds']:
+            ratios.append((row, old['seconds'] / row['seconds']))
+    return ratios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="compbrain benchmarks")
+    parser.add_argument('--suite', nargs='+', choices=list(SUITES), default=list(SUITES))
+    parser.add_argument('--engine', nargs='+', choices=['object', 'population'], default=['object', 'population'])
+    parser.add_argument('--recorder', choices=['list', 'array'], default='list')
+    parser.add_argument('--quick', action='store_true', help="small grid for a smoke run")
+    parser.add_argument('--output', help="JSON file of the results")
+    parser.add_argument('--baseline', help="JSON file of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    grid = GRIDS['quick' if args.quick else 'full']
+    rows = []
+    for suite in args.suite:
+        for row in SUITES[suite](grid, args.engine, args.recorder):
+            rows.append(row)
+            print("{suite:<9}{name:<28}{engine:<11}{neurons:>7}{synapses:>8}{steps:>7}{seconds:>11.4f}s".format(**row))
+
+    results = OrderedDict(
+        meta=OrderedDict(
+            compbrain=version(), python=platform.python_version(), numpy=np.__version__,
+            platform=platform.platform(), processor=platform.processor(), time=time.strftime('%Y-%m-%dT%H:%M:%S'),
+            grid='quick' if args.quick else 'full', dt=DT,
+        ),
+        results=rows,
+    )
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        print("\nspeed relative to {}".format(args.baseline))
+        for row, ratio in compare(rows, baseline):
+            print("{suite:<9}{name:<28}{engine:<11}{neurons:>7}{synapses:>8}{steps:>7}".format(**row) +
+                  "{:>9.2f}x".format(ratio))
+
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,8 +1,6 @@
-# from core import *
-# from neurons import *
-# from synapses import *
-# from utils import *
-from . import utils
-from . import core
-from . import synapses
-from . import neurons
\ No newline at end of file
+# the subpackages are imported on first access, ``import compbrain`` stays cheap
+from .registry import lazy_exports
+
+__version__ = "0.0.2"
+
+__getattr__, __dir__ = lazy_exports(__name__, {}, modules=('utils', 'core', 'synapses', 'neurons'))
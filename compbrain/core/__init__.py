@@ -1,3 +1,10 @@
 from .circuit import Circuit
-from .node import BaseComponent
+from .ensemble import Ensemble
+from .node import BaseComponent, BaseNeuron
+from .population import NeuronPopulation, SynapseGroup, InjectionGroup, ProjectionGroup
+from .recorder import StateBuffer, StreamBuffer, LatestBuffer
+from .delay import DelayLine
+from .spikes import SpikeDetector
+from .tables import RateTable
+from .profiler import Profiler
 from .errors import CompBrainModelError, CompBrainUtilsError
\ No newline at end of file
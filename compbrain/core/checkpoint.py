@@ -0,0 +1,115 @@
+"""Compact checkpoints of a running circuit"""
+import os
+import numpy as np
+from collections import OrderedDict
+from .errors import CompBrainModelError
+
+
+def save_checkpoint(circuit, path: str, step: int):
+    """
+    save what the circuit needs to continue after ``step`` steps into a .npz
+    file: the last value of every neuron state, the counters of the injections,
+    the delay lines, the quiet neurons of the activity gating, the spikes
+    detected and the state of the numpy random generator. The recorded histories are not saved, the
+    synapses recompute their outputs from the neurons at the next step
+
+    :param circuit: the Circuit
+    :param path: the checkpoint file, written atomically
+    :param step: number of steps executed
+    """
+    states = OrderedDict()
+    counts = OrderedDict()
+    quiet = []
+    if circuit.engine == 'population' and circuit.populations is not None:
+        for population in circuit.populations:
+            for i, neuron in enumerate(population.neurons):
+                states[neuron.name] = OrderedDict((key, val[i]) for key, val in population.states.items())
+            quiet.extend(neuron.name for neuron, val in zip(population.neurons, population.quiet) if val)
+        for group in circuit.synapse_groups:
+            if hasattr(group, 'count'):
+                counts.update((synapse.name, count) for synapse, count in zip(group.synapses, group.count))
+    else:
+        for neuron in circuit.neurons:
+            states[neuron.name] = OrderedDict((key, val[-1]) for key, val in neuron.states.items())
+        for synapse in circuit.synapses:
+            if hasattr(synapse, 'count'):
+                counts[synapse.name] = synapse.count
+        quiet = sorted(circuit.quiet)
+
+    arrays = OrderedDict(step=np.array(step))
+    keys = OrderedDict.fromkeys(key for values in states.values() for key in values)
+    for key in keys:
+        names = [name for name, values in states.items() if key in values]
+        arrays['names:' + key] = np.array(names, dtype=str)
+        arrays['state:' + key] = np.array([states[name][key] for name in names], dtype=float)
+    arrays['count:names'] = np.array(list(counts), dtype=str)
+    arrays['count:values'] = np.array(list(counts.values()), dtype=int)
+    arrays['quiet'] = np.array(quiet, dtype=str)
+
+    if circuit.delay_dt is not None:
+        arrays['delay_dt'] = np.array(circuit.delay_dt)
+        for key, line in circuit.delay_lines.items():
+            arrays['delay:{}:buffer'.format(key)] = line.buffer
+            arrays['delay:{}:head'.format(key)] = np.array(line.head)
+
+    if circuit.detector is not None:
+        arrays['spikes:index'], arrays['spikes:times'] = circuit.detector.train()
+        arrays['spikes:last'] = circuit.detector.last
+
+    name, keys, position, has_gauss, cached = np.random.get_state()
+    arrays['rng:keys'] = keys
+    arrays['rng:state'] = np.array([position, has_gauss])
+    arrays['rng:cached'] = np.array(cached)
+
+    with open(path + '.tmp', 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(circuit, path: str) -> int:
+    """
+    restore a checkpoint into a circuit built like the one that saved it,
+    the states of every neuron restart from their checkpointed values
+
+    :param circuit: the Circuit
+    :param path: the checkpoint file
+    :return: number of steps executed when the checkpoint was saved
+    """
+    with np.load(path) as checkpoint:
+        arrays = OrderedDict((key, checkpoint[key]) for key in checkpoint.files)
+
+    for key in [key[len('state:'):] for key in arrays if key.startswith('state:')]:
+        for name, val in zip(arrays['names:' + key], arrays['state:' + key]):
+            if name not in circuit.index:
+                raise CompBrainModelError(f"no component named {name} in the circuit")
+            circuit.index[name].states[key] = [float(val)]
+    for name, count in zip(arrays['count:names'], arrays['count:values']):
+        circuit.index[name].count = int(count)
+
+    circuit.populations = None
+    circuit.synapse_groups = None
+    circuit.event_solvers = None
+    circuit.delay_dt = None
+    circuit.quiet = set(arrays['quiet'].tolist())
+    if circuit.engine == 'population':
+        circuit.build_populations()
+        for population in circuit.populations:
+            population.quiet = np.array([neuron.name in circuit.quiet for neuron in population.neurons], dtype=bool)
+
+    if 'delay_dt' in arrays:
+        circuit.setup_delays(float(arrays['delay_dt']))
+        for key, line in circuit.delay_lines.items():
+            line.buffer[...] = arrays['delay:{}:buffer'.format(key)]
+            line.head = int(arrays['delay:{}:head'.format(key)])
+
+    circuit.detector = None
+    if 'spikes:index' in arrays and circuit.detect_spikes:
+        circuit.setup_detector()
+        circuit.detector.index.extend(arrays['spikes:index'])
+        circuit.detector.times.extend(arrays['spikes:times'])
+        circuit.detector.last[...] = arrays['spikes:last']
+
+    position, has_gauss = arrays['rng:state']
+    np.random.set_state(('MT19937', arrays['rng:keys'], int(position), int(has_gauss), float(arrays['rng:cached'])))
+
+    return int(arrays['step'])
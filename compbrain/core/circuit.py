@@ -1,6 +1,37 @@
+import gc
+import os
 import numpy as np
-from tqdm import tqdm as tqdm
-from tqdm.notebook import tqdm as tqdm_notebook
+from contextlib import contextmanager
+from time import perf_counter
+from collections import OrderedDict
+from .node import BaseNeuron
+from .population import NeuronPopulation, SynapseGroup
+from .recorder import StateBuffer, StreamBuffer, LatestBuffer
+from .integrators import INTEGRATORS
+from .events import EventSolver
+from .delay import DelayLine
+from .checkpoint import save_checkpoint, load_checkpoint
+from .rest import rest
+from .spikes import SpikeDetector, default_threshold
+from .profiler import Profiler
+from .progress import ProgressBar
+from .errors import CompBrainModelError
+
+
+@contextmanager
+def paused_gc():
+    """
+    pause the cyclic garbage collector while building many components, the
+    parents/children references make every component part of a cycle and the
+    collector would otherwise rescan the growing circuit over and over
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 
 class Circuit:
@@ -13,24 +44,215 @@ class Circuit:
     :argument
         neurons: list of instantiated neurons
         synapses: list of instantiated synapses
+        engine: 'object' computes every component one by one,
+            'population' groups the components of the same class into
+            struct-of-arrays populations updated with vectorized numpy operations,
+            the states of each component are written back by ``sync``
+        recorder: 'list' records the states in python lists,
+            'array' records them in numpy buffers preallocated by ``execute_circuit``,
+            'file' streams them to .npy files in ``directory``, keeping only the last
+            ``chunk`` steps in memory, the recordings are memory-mapped views of the
+            files once ``execute_circuit`` returns,
+            'none' keeps only the last two values of every state, for the runs read
+            through their spikes, see detect_spikes
+        method: the integration scheme of the neurons, one of
+            'euler', 'rk2', 'rk4' and 'exp_euler' (exponential Euler for the gating variables)
+        gating: activity-gated execution, synapses whose presynaptic voltage is
+            below threshold output zero without being computed, and neurons sitting
+            at a converged state (no state variable moving by more than gating_tol
+            over a step) without input keep their states without being computed
+        gating_tol: the convergence tolerance of the activity gating
+        detect_spikes: detect the spikes of the neurons while they run into ``spike_train``,
+            True, or a dict of the 'threshold' in mV shared by every neuron (the V_T
+            parameter of each neuron or 0 mV by default) and of the 'refractory'
+            interval in seconds, see SpikeDetector
+        tables: step the models having ``analytic_rates`` with their rate functions
+            read from lookup tables, True for the default resolution or a dict of
+            'V_min', 'V_max' and 'step' in mV, see BaseNeuron.tabulate. The option
+            only applies to this circuit, the model classes are unchanged
+        directory: the directory of the 'file' recorder, a new temporary directory by default
+        chunk: number of steps the 'file' recorder keeps in memory per recording
+        dtype: the precision of the states, parameters and recordings, 'float64'
+            or 'float32', which halves the memory and the bandwidth of a run. With
+            the object engine the float32 states live in the recordings, so it needs
+            the 'array' or 'file' recorder. ``compare_precision`` of compbrain.utils
+            measures the error of float32 on each neuron model
+        profile: accumulate the wall time per phase and per component class in
+            ``profiler``, see Profiler, the unprofiled execution is unchanged
 
+    a synapse with a ``delay`` parameter (in seconds) sees the voltage its
+    presynaptic neuron had that many steps ago, served by one ring-buffer
+    delay line per neuron (object engine) or per population (population engine)
     """
-    def __init__(self, neurons: list, synapses: list, **kargs):
-        self.neurons = neurons
-        self.synapses = synapses
+    engines = ('object', 'population')
+    recorders = ('list', 'array', 'file', 'none')
+    dtypes = ('float64', 'float32')
 
-        for synapse in synapses:
-            pre_synaptic_neurons = self.find_neuron(synapse.presynaptic)
-            post_synaptic_neurons = self.find_neuron(synapse.postsynaptic)
+    def __init__(self, neurons: list, synapses: list, engine: str = 'object', recorder: str = 'list',
+                 method: str = 'euler', gating: bool = False, gating_tol: float = 1e-10, directory: str = None,
+                 chunk: int = 1024, dtype='float64', detect_spikes=False, tables=False, profile: bool = False,
+                 **kargs):
+        if engine not in self.engines:
+            raise CompBrainModelError("no {} engine implemented".format(engine))
+        if recorder not in self.recorders:
+            raise CompBrainModelError("no {} recorder implemented".format(recorder))
+        if method not in INTEGRATORS:
+            raise CompBrainModelError("no {} integrator implemented".format(method))
+        if np.dtype(dtype).name not in self.dtypes:
+            raise CompBrainModelError("no {} precision implemented".format(np.dtype(dtype).name))
+        if np.dtype(dtype) != np.float64 and engine == 'object' and recorder == 'list':
+            raise CompBrainModelError("the object engine records float32 states with the 'array' or 'file' recorder")
+
+        self.neurons = []
+        self.synapses = []
+        self.index = {}
+        self.engine = engine
+        self.recorder = recorder
+        self.method = method
+        self.gating = gating
+        self.gating_tol = gating_tol
+        self.directory = directory
+        self.chunk = chunk
+        self.dtype = np.dtype(dtype)
+        self.quiet = set()
+        self.populations = None
+        self.synapse_groups = None
+        self.currents = None
+        self.event_solvers = None
+        self.delay_dt = None
+        self.delay_lines = OrderedDict()
+        self.synapse_delays = {}
+        self.delay_plans = None
+        self.profiler = Profiler() if profile else None
+        self.detect_spikes = OrderedDict(detect_spikes) if isinstance(detect_spikes, dict) else detect_spikes
+        self.detector = None
+        self.tables = OrderedDict(tables) if isinstance(tables, dict) else tables
+        self.dt = None
+
+        with paused_gc():
+            for neuron in neurons:
+                self.add_neuron(neuron)
+
+            for synapse in synapses:
+                self.add_synapse(synapse)
+
+    def __getitem__(self, name: str):
+        return self.index[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def add_neuron(self, neuron):
+        """
+        add an instantiated neuron to the circuit
 
+        :param neuron: the neuron, its name should be different from all the
+            components already in the circuit
+        :return: the neuron
+        """
+        if neuron.name in self.index:
+            raise CompBrainModelError(f"a component named {neuron.name} is already in the circuit")
+
+        self.neurons.append(neuron)
+        self.index[neuron.name] = neuron
+        self.populations = None
+        self.synapse_groups = None
+        self.delay_dt = None
+        return neuron
+
+    def add_synapse(self, synapse):
+        """
+        add an instantiated synapse to the circuit and wire it to its
+        presynaptic and postsynaptic neurons, which must be in the circuit already
+
+        :param synapse: the synapse, its name should be different from all the
+            components already in the circuit
+        :return: the synapse
+        """
+        if synapse.name in self.index:
+            raise CompBrainModelError(f"a component named {synapse.name} is already in the circuit")
+        if self.engine == 'object' and getattr(synapse, 'population_only', False):
+            raise CompBrainModelError(f"{type(synapse).__name__} needs the population engine")
+
+        presynaptic = synapse.presynaptic if isinstance(synapse.presynaptic, list) else [synapse.presynaptic]
+        postsynaptic = synapse.postsynaptic if isinstance(synapse.postsynaptic, list) else [synapse.postsynaptic]
+
+        # every name is looked up before any wiring, a missing neuron leaves the circuit unchanged
+        pre_neurons = [self.find_neuron(name) for name in presynaptic]
+        post_neurons = [self.find_neuron(name) for name in postsynaptic]
+
+        for pre_synaptic_neurons in pre_neurons:
             if pre_synaptic_neurons:
                 pre_synaptic_neurons.append_children(synapse)
                 synapse.append_parents(pre_synaptic_neurons)
 
+        for post_synaptic_neurons in post_neurons:
             if post_synaptic_neurons:
                 post_synaptic_neurons.append_parents(synapse)
                 synapse.append_children(post_synaptic_neurons)
 
+        self.synapses.append(synapse)
+        self.index[synapse.name] = synapse
+        self.populations = None
+        self.synapse_groups = None
+        self.delay_dt = None
+        return synapse
+
+    def connect(self, pre, post, model=None, params=None, names=None, **kwargs) -> list:
+        """
+        wire many (pre, post) pairs of neurons in one call
+
+        :param pre: names or indices in ``neurons`` of the presynaptic neurons
+        :param post: names or indices in ``neurons`` of the postsynaptic neurons
+        :param model: the synapse class, CustomSynapse by default, a population-only
+            model such as Projection gets a single instance for all the pairs
+        :param params: dict of the synapse parameters, each value is either shared
+            by all the pairs or an array with one value per pair
+        :param names: names of the synapses, "pre-post" by default with a "-k" suffix
+            for repeated pairs, the name of the projection for a population-only model
+        :param kwargs: keyword arguments passed to the synapse class
+        :return: list of the new synapses
+        """
+        if model is None:
+            from compbrain.synapses import CustomSynapse
+            model = CustomSynapse
+
+        pre = [self.neurons[i].name if isinstance(i, (int, np.integer)) else i for i in np.asarray(pre).tolist()]
+        post = [self.neurons[i].name if isinstance(i, (int, np.integer)) else i for i in np.asarray(post).tolist()]
+        if len(pre) != len(post):
+            raise CompBrainModelError("pre and post should have the same length")
+        for neuron in set(pre).union(post):
+            self.find_neuron(neuron)
+
+        params = {} if params is None else params
+        if getattr(model, 'population_only', False):
+            sources = list(OrderedDict.fromkeys(pre))
+            targets = list(OrderedDict.fromkeys(post))
+            source_index = {name: i for i, name in enumerate(sources)}
+            target_index = {name: i for i, name in enumerate(targets)}
+            name = names if isinstance(names, str) else "{}-{}".format(len(self.synapses), model.__name__)
+            projection = model.from_edges(name, sources, targets,
+                                          [source_index[neuron] for neuron in pre],
+                                          [target_index[neuron] for neuron in post],
+                                          params=params, **kwargs)
+            return [self.add_synapse(projection)]
+
+        if names is None:
+            names, seen = [], {}
+            for pre_name, post_name in zip(pre, post):
+                name = "{}-{}".format(pre_name, post_name)
+                seen[name] = seen.get(name, -1) + 1
+                names.append(name if seen[name] == 0 else "{}-{}".format(name, seen[name]))
+        per_pair = {key: np.broadcast_to(np.asarray(val), (len(pre),)).tolist() for key, val in params.items()}
+
+        synapses = []
+        with paused_gc():
+            for i, (name, pre_name, post_name) in enumerate(zip(names, pre, post)):
+                synapse_params = {key: val[i] for key, val in per_pair.items()}
+                synapses.append(self.add_synapse(model(name, pre_name, post_name, params=synapse_params, **kwargs)))
+
+        return synapses
+
     def clear_circuit(self):
         """
         reset the whole circuit
@@ -39,6 +261,11 @@ class Circuit:
         """
         self.neurons = []
         self.synapses = []
+        self.index = {}
+        self.populations = None
+        self.synapse_groups = None
+        self.delay_dt = None
+        self.detector = None
 
     def reset_circuit(self):
         """
@@ -50,6 +277,340 @@ class Circuit:
         for synapse in self.synapses:
             synapse.reset_value()
 
+        self.populations = None
+        self.synapse_groups = None
+        self.event_solvers = None
+        self.delay_dt = None
+        self.detector = None
+        self.quiet = set()
+
+    def rest(self, I_ext=0.0) -> list:
+        """
+        start every neuron from its resting state at a holding current instead
+        of its initial values, skipping the warm-up transient, see ``rest`` of
+        compbrain.core.rest, the solutions are cached per parameter set
+
+        :param I_ext: the holding current, a scalar for all the neurons, a list
+            with one value per neuron or a dict from neuron name to its current
+        :return: list of the names of the neurons without a stable resting state, left as they were
+        """
+        unchanged = rest(self.neurons, I_ext, self.model_of)
+        self.populations = None
+        self.synapse_groups = None
+        self.event_solvers = None
+        self.delay_dt = None
+        self.quiet = set()
+        return unchanged
+
+    def build_populations(self):
+        """
+        group the neurons and synapses by class into struct-of-arrays
+        populations for the vectorized engine, the neurons are indexed
+        population by population in the circuit voltage vector, the last
+        entry of which is a constant 0 standing for a missing neuron
+        """
+        by_model = OrderedDict()
+        for neuron in self.neurons:
+            by_model.setdefault(type(neuron), []).append(neuron)
+        self.populations = [NeuronPopulation(self.model_of(model), neurons, self.dtype)
+                            for model, neurons in by_model.items()]
+
+        index = OrderedDict()
+        for population in self.populations:
+            for neuron in population.neurons:
+                index[neuron.name] = len(index)
+
+        position = {neuron.name: i for i, neuron in enumerate(self.neurons)}
+        for population in self.populations:
+            population.indices = np.array([position[neuron.name] for neuron in population.neurons], dtype=int)
+            population.detector = self.detector
+
+        by_model = OrderedDict()
+        for synapse in self.synapses:
+            by_model.setdefault(type(synapse), []).append(synapse)
+
+        self.synapse_groups = []
+        for model, synapses in by_model.items():
+            if not hasattr(model, 'group') and not hasattr(model, 'update'):
+                raise CompBrainModelError(f"{model.__name__} has no vectorized update function")
+            group = getattr(model, 'group', SynapseGroup)
+            self.synapse_groups.append(group(model, synapses, index, self.dtype))
+
+        self.currents = OrderedDict(I_syn=np.zeros(len(index) + 1, dtype=self.dtype),
+                                    I_ext=np.zeros(len(index) + 1, dtype=self.dtype))
+        self.delay_dt = None
+
+    def setup_delays(self, dt: float):
+        """
+        build the delay lines serving the presynaptic voltages of the delayed
+        synapses, the delays are rounded to whole steps of dt and the lines
+        are started with the current voltages as their history
+
+        :param dt: dt
+        """
+        self.delay_dt = dt
+        self.delay_lines = OrderedDict()
+        if self.engine == 'population':
+            self.setup_population_delays(dt)
+            return
+
+        self.synapse_delays = {}
+        lengths = OrderedDict()
+        for synapse in self.synapses:
+            steps = int(round(getattr(synapse, 'params', {}).get('delay', 0) / dt))
+            if steps > 0 and isinstance(synapse.presynaptic, str) and synapse.presynaptic in self.index:
+                self.synapse_delays[synapse.name] = (synapse.presynaptic, steps)
+                lengths[synapse.presynaptic] = max(lengths.get(synapse.presynaptic, 0), steps + 1)
+
+        for name, length in lengths.items():
+            self.delay_lines[name] = DelayLine(self.index[name].states['V'][-1], length, self.dtype)
+        for name, (neuron, steps) in self.synapse_delays.items():
+            self.synapse_delays[name] = (self.delay_lines[neuron], steps)
+
+    def setup_population_delays(self, dt: float):
+        """
+        build one delay line per population read by delayed synapses, and for
+        each synapse group the plan of its delayed presynaptic entries as
+        (population, entries, neurons in the population, steps)
+
+        :param dt: dt
+        """
+        sizes = [population.size for population in self.populations]
+        starts = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+        owner = np.concatenate([np.repeat(np.arange(len(sizes)), sizes), [-1]]).astype(int)
+
+        lengths = np.zeros(len(sizes), dtype=int)
+        self.delay_plans = []
+        for group in self.synapse_groups:
+            steps = np.rint(np.asarray(group.delays, dtype=float) / dt).astype(int)
+            delayed = np.flatnonzero((steps > 0) & (owner[group.pre] >= 0))
+            plan = []
+            for p in np.unique(owner[group.pre[delayed]]):
+                entries = delayed[owner[group.pre[delayed]] == p]
+                plan.append((p, entries, group.pre[entries] - starts[p], steps[entries]))
+                lengths[p] = max(lengths[p], steps[entries].max() + 1)
+            self.delay_plans.append(plan)
+
+        for p, population in enumerate(self.populations):
+            if lengths[p] > 0:
+                self.delay_lines[p] = DelayLine(population.states['V'], lengths[p], self.dtype)
+
+    def push_delays(self):
+        """
+        store the current presynaptic voltages into the delay lines
+        """
+        if self.engine == 'population':
+            for p, line in self.delay_lines.items():
+                line.push(self.populations[p].states['V'])
+        else:
+            for name, line in self.delay_lines.items():
+                line.push(self.index[name].states['V'][-1])
+
+    def sync(self):
+        """
+        write the steps computed by the population engine back into the
+        states of every neuron and synapse
+        """
+        if self.populations is None:
+            return
+
+        view = self.recorder != 'list'
+        for population in self.populations:
+            population.sync(view)
+
+        for group in self.synapse_groups:
+            group.sync(view)
+
+    def allocate(self, steps: int):
+        """
+        preallocate the array recordings of every component for the coming steps
+
+        :param steps: number of steps to make room for
+        """
+        if self.engine == 'population':
+            if self.populations is None:
+                self.build_populations()
+            if self.recorder == 'file':
+                self.stream(steps)
+                return
+            if self.recorder == 'none':
+                self.keep_latest()
+                return
+            for container in self.populations + self.synapse_groups:
+                container.reserve(steps)
+            return
+
+        for component in self.neurons + self.synapses:
+            for key, val in component.states.items():
+                if isinstance(val, StateBuffer):
+                    val.reserve(steps)
+                elif self.recorder == 'none':
+                    component.states[key] = LatestBuffer(val, dtype=self.dtype)
+                elif self.recorder == 'file':
+                    component.states[key] = StreamBuffer(self.trace_path(component.name, key), val, capacity=steps,
+                                                         dtype=self.dtype, chunk=self.chunk)
+                else:
+                    component.states[key] = StateBuffer(val, capacity=steps, dtype=self.dtype)
+
+    def trace_directory(self) -> str:
+        """
+        the directory of the 'file' recorder, created when missing
+
+        :return: the directory
+        """
+        if self.directory is None:
+            import tempfile
+            self.directory = tempfile.mkdtemp(prefix='compbrain-')
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+    def trace_path(self, name: str, key: str) -> str:
+        """
+        the file streaming one recording of the 'file' recorder
+
+        :param name: name of the component or population
+        :param key: name of the state variable
+        :return: path of the .npy file
+        """
+        return os.path.join(self.trace_directory(), "{}.{}.npy".format(name, key))
+
+    def stream(self, steps: int):
+        """
+        turn the recordings of the populations and synapse groups into
+        recordings streamed to files, one file per state variable
+
+        :param steps: number of steps to make room for
+        """
+        for p, population in enumerate(self.populations):
+            for key, record in population.records.items():
+                if isinstance(record, StreamBuffer):
+                    record.reserve(steps)
+                else:
+                    path = self.trace_path("{}-{}".format(population.model.__name__, p), key)
+                    population.records[key] = StreamBuffer(path, record.array, capacity=steps,
+                                                           shape=(population.size,), dtype=self.dtype,
+                                                           chunk=self.chunk)
+
+        for g, group in enumerate(self.synapse_groups):
+            if isinstance(group.record, StreamBuffer):
+                group.record.reserve(steps)
+            else:
+                path = self.trace_path("{}-{}".format(group.model.__name__, g), group.output)
+                group.record = StreamBuffer(path, group.record.array, capacity=steps, shape=(group.size,),
+                                            dtype=self.dtype, chunk=self.chunk)
+
+    def keep_latest(self):
+        """
+        turn the recordings of the populations and synapse groups into
+        recordings of their last values, see LatestBuffer
+        """
+        for population in self.populations:
+            for key, record in population.records.items():
+                if not isinstance(record, LatestBuffer):
+                    population.records[key] = LatestBuffer(record.array, shape=(population.size,), dtype=self.dtype)
+
+        for group in self.synapse_groups:
+            if not isinstance(group.record, LatestBuffer):
+                group.record = LatestBuffer(group.record.array, shape=(group.size,), dtype=self.dtype)
+
+    def setup_detector(self):
+        """
+        start the spike detector, or add the neurons added to the circuit since
+        """
+        threshold = self.detect_spikes.get('threshold') if isinstance(self.detect_spikes, dict) else None
+        start = 0 if self.detector is None else self.detector.size
+        thresholds = [default_threshold(neuron) if threshold is None else threshold for neuron in self.neurons[start:]]
+        if self.detector is None:
+            refractory = self.detect_spikes.get('refractory', 0.0) if isinstance(self.detect_spikes, dict) else 0.0
+            self.detector = SpikeDetector(thresholds, refractory)
+        else:
+            self.detector.extend(thresholds)
+        for population in self.populations or []:
+            population.detector = self.detector
+
+    @property
+    def spike_train(self) -> tuple:
+        """
+        the spikes detected since the start, see detect_spikes
+
+        :return: (index of the neuron in ``neurons``, time of the spike) arrays, in order of time
+        """
+        if self.detector is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return self.detector.train()
+
+    def model_of(self, model):
+        """
+        the class stepping the neurons of a model, its tabulated variant when
+        the circuit is built with ``tables``
+
+        :param model: the neuron class
+        :return: the class
+        """
+        if not self.tables or not hasattr(model, 'analytic_rates'):
+            return model
+        return model.tabulate(**(self.tables if isinstance(self.tables, dict) else {}))
+
+    def compute_neuron(self, i: int, neuron, I_syn: float, I_ext: float, dt: float):
+        """
+        advance one neuron of the object engine by one time step with the class
+        of ``model_of``, detecting its spike on the voltage reached before the
+        reset of the model when the circuit detects spikes, and timing the
+        update and the recording when the circuit is profiled
+
+        :param i: the index of the neuron in ``neurons``
+        :param neuron: the neuron
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :param dt: dt
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            start = profiler.clock()
+        V = neuron.states['V'][-1]
+        if type(neuron).compute is not BaseNeuron.compute:
+            _ = neuron.compute(I_syn, I_ext, dt, method=self.method)
+            if self.detector is not None:
+                self.detector.check(i, V, neuron.states['V'][-1])
+            if profiler is not None:
+                profiler.add('neuron update', type(neuron).__name__, profiler.clock() - start)
+            return
+
+        model = self.model_of(type(neuron))
+        current = OrderedDict((key, val[-1]) for key, val in neuron.states.items())
+        reached = model.integrate(current, neuron.params, I_syn, I_ext, dt, self.method)
+        if self.detector is not None:
+            self.detector.check(i, V, reached['V'])
+        states = model.reset(reached, neuron.params)
+        if profiler is not None:
+            split = profiler.clock()
+        for key, val in states.items():
+            neuron.states[key].append(float(val))
+        if profiler is not None:
+            profiler.add('neuron update', type(neuron).__name__, split - start)
+            profiler.add('recording', type(neuron).__name__, profiler.clock() - split)
+
+    def finish(self):
+        """
+        write the last steps of the streamed recordings and map their files
+        """
+        if self.recorder != 'file':
+            return
+
+        if self.populations is not None:
+            for population in self.populations:
+                for record in population.records.values():
+                    if isinstance(record, StreamBuffer):
+                        record.finish()
+            for group in self.synapse_groups:
+                if isinstance(group.record, StreamBuffer):
+                    group.record.finish()
+
+        for component in self.neurons + self.synapses:
+            for val in component.states.values():
+                if isinstance(val, StreamBuffer):
+                    val.finish()
+
     def find_neuron(self, name: str):
         """
         Find the instantiated neuron according its name
@@ -57,51 +618,407 @@ class Circuit:
         :return: instantiated neuron
         """
         if name != "None":
-            for i in range(len(self.neurons)):
-                if self.neurons[i].name == name:
-                    return self.neurons[i]
+            if name in self.index:
+                return self.index[name]
 
             raise ValueError("Couldn't find neuron")
         return None
 
     def execute_step(self, dt: float=1e-4, synapses_policy: bool=True, neurons_policy: bool=True):
         """
-        execute the whole circuit by one time step
+        execute the whole circuit by one time step, with the activity gating
+        skipping the inactive synapses and the quiet neurons, and the profiler
+        timing every phase of every component class when they are enabled
         :param dt: dt
         :param synapses_policy: whether execute the synapses
         :param neurons_policy: whether execute the neurons
         :return: None
         """
+        if self.detect_spikes and neurons_policy:
+            if self.detector is None or self.detector.size < len(self.neurons):
+                self.setup_detector()
+            self.detector.tick(dt)
+
+        profiler = self.profiler
+        if profiler is not None:
+            clock = profiler.clock
+            profiler.steps += 1
+
+        if self.engine == 'population':
+            self.execute_populations(dt, synapses_policy, neurons_policy, profiler)
+            return
+
+        gating = self.gating
         if synapses_policy:
+            if profiler is not None:
+                start = clock()
+            if self.delay_dt != dt:
+                self.setup_delays(dt)
+            self.push_delays()
+            if profiler is not None:
+                profiler.add('aggregation', 'DelayLine', clock() - start)
+            delays = self.synapse_delays
             for synapse in self.synapses:
-                V_pre = synapse.get_V_pre()
-                V_post = synapse.get_V_post()
-                _ = synapse.compute(V_pre, V_post)
+                if profiler is not None:
+                    start = clock()
+                V_pre = self.delayed_V_pre(synapse) if synapse.name in delays else synapse.get_V_pre()
+                if gating and hasattr(synapse, 'active') and not synapse.active(V_pre, synapse.params):
+                    if profiler is not None:
+                        middle = clock()
+                    synapse.states[synapse.output].append(0.0)
+                else:
+                    V_post = synapse.get_V_post()
+                    if profiler is not None:
+                        middle = clock()
+                    _ = synapse.compute(V_pre, V_post)
+                if profiler is not None:
+                    name = type(synapse).__name__
+                    profiler.add('aggregation', name, middle - start)
+                    profiler.add('synapse update', name, clock() - middle)
 
         if neurons_policy:
-            for neuron in self.neurons:
+            custom = self.detector is not None or self.tables or profiler is not None
+            for i, neuron in enumerate(self.neurons):
+                if profiler is not None:
+                    start = clock()
                 I_syn = neuron.get_I_syn()
                 I_ext = neuron.get_I_ext()
-                _ = neuron.compute(I_syn, I_ext, dt)
+                if profiler is not None:
+                    middle = clock()
+                    profiler.add('aggregation', type(neuron).__name__, middle - start)
+
+                if gating:
+                    silent = I_syn == 0 and I_ext == 0
+                    if silent and neuron.name in self.quiet:
+                        for val in neuron.states.values():
+                            val.append(val[-1])
+                        if profiler is not None:
+                            profiler.add('recording', type(neuron).__name__, clock() - middle)
+                        continue
+
+                if custom:
+                    self.compute_neuron(i, neuron, I_syn, I_ext, dt)
+                elif self.method == 'euler':
+                    _ = neuron.compute(I_syn, I_ext, dt)
+                else:
+                    _ = neuron.compute(I_syn, I_ext, dt, method=self.method)
+
+                if gating:
+                    if silent and all(abs(val[-1] - val[-2]) <= self.gating_tol for val in neuron.states.values()):
+                        self.quiet.add(neuron.name)
+                    else:
+                        self.quiet.discard(neuron.name)
 
-    def execute_circuit(self, t: np.ndarray, notebook: bool=False):
+    def delayed_V_pre(self, synapse) -> float:
+        """
+        the presynaptic voltage of a delayed synapse read from its delay line
+
+        :param synapse: a synapse set up with a delay
+        :return: V_pre
+        """
+        line, steps = self.synapse_delays[synapse.name]
+        return float(line.read(steps))
+
+    def execute_populations(self, dt: float, synapses_policy: bool = True, neurons_policy: bool = True,
+                            profiler: Profiler = None):
+        """
+        execute the whole circuit by one time step with the vectorized engine,
+        in the same order as the object engine: synapses first, then neurons
+
+        :param dt: dt
+        :param synapses_policy: whether execute the synapses
+        :param neurons_policy: whether execute the neurons
+        :param profiler: the Profiler timing the phases, None to not time them
+        :return: None
+        """
+        if self.populations is None:
+            self.build_populations()
+        clock = profiler.clock if profiler is not None else None
+
+        if synapses_policy:
+            if profiler is not None:
+                start = clock()
+            if self.delay_dt != dt:
+                self.setup_delays(dt)
+            self.push_delays()
+
+            V = np.concatenate([population.states['V'] for population in self.populations] +
+                               [np.zeros(1, dtype=self.dtype)])
+            size = len(V)
+            self.currents = OrderedDict(I_syn=np.zeros(size, dtype=self.dtype), I_ext=np.zeros(size, dtype=self.dtype))
+            if profiler is not None:
+                profiler.add('aggregation', 'Circuit', clock() - start)
+            for group, plan in zip(self.synapse_groups, self.delay_plans):
+                if profiler is not None:
+                    start = clock()
+                V_pre = None
+                if plan:
+                    V_pre = V[group.pre]
+                    for p, entries, neurons, steps in plan:
+                        V_pre[entries] = self.delay_lines[p].read(steps, neurons)
+                if profiler is not None:
+                    middle = clock()
+                I = group.compute(V, self.gating, V_pre)
+                if profiler is not None:
+                    split = clock()
+                self.currents[group.output] += np.bincount(group.post, weights=I, minlength=size)
+                if profiler is not None:
+                    name = group.model.__name__
+                    profiler.add('synapse update', name, split - middle, group.size)
+                    profiler.add('aggregation', name, clock() - split + middle - start, group.size)
+
+        if neurons_policy:
+            start = 0
+            for population in self.populations:
+                if profiler is not None:
+                    begin = clock()
+                stop = start + population.size
+                population.step(self.currents['I_syn'][start:stop], self.currents['I_ext'][start:stop], dt, self.method,
+                                self.gating_tol if self.gating else None)
+                start = stop
+                if profiler is not None:
+                    profiler.add('neuron update', population.model.__name__, clock() - begin, population.size)
+
+    def begin_run(self, steps: int):
+        """
+        prepare the recordings for the coming steps
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            begin = profiler.clock()
+        if self.recorder != 'list':
+            self.allocate(steps)
+        if profiler is not None:
+            profiler.add('recording', 'Circuit', profiler.clock() - begin)
+
+    def end_run(self):
+        """
+        flush the streamed recordings and bring the states of every component up to date
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            begin = profiler.clock()
+        self.finish()
+        self.sync()
+        if profiler is not None:
+            profiler.add('recording', 'Circuit', profiler.clock() - begin)
+
+    def advance(self, dt: float, start: int, stop: int, chunk: int = None, callbacks: list = (),
+                interval: float = 0.1, checkpoint: str = None, every: int = None) -> int:
+        """
+        execute the full steps from ``start`` to ``stop`` in chunks, with
+        nothing done between the steps of a chunk. Between two chunks the
+        periodic checkpoint is saved and, at most every ``interval`` seconds
+        and after the last chunk, every callback is called as
+        callback(circuit, step, stop), a callback returning False stops the run
+
+        :param dt: dt
+        :param start: the index of the first step
+        :param stop: the index of the step to reach
+        :param chunk: number of steps per chunk, by default sized to last about
+            ``interval`` seconds when there are callbacks, the whole run otherwise
+        :param callbacks: list of callbacks
+        :param interval: minimum number of seconds between two calls of the callbacks
+        :param checkpoint: the file of the periodic checkpoints
+        :param every: save a checkpoint every ``every`` steps
+        :return: the index of the step reached
+        """
+        adaptive = chunk is None and len(callbacks) > 0
+        size = chunk or (1 if adaptive else max(stop - start, 1))
+        called = perf_counter()
+        step = start
+        while step < stop:
+            end = min(step + size, stop)
+            if every:
+                end = min(end, (step // every + 1) * every)
+            begin = perf_counter()
+            for _ in range(step, end):
+                self.execute_step(dt)
+            now = perf_counter()
+            if adaptive:
+                size = min(max(int((end - step) * interval / max(now - begin, 1e-9)), 1), 4 * size)
+            step = end
+
+            if every and step % every == 0:
+                self.checkpoint(checkpoint, step)
+            if callbacks and (now - called >= interval or step == stop):
+                called = now
+                if not all([callback(self, step, stop) is not False for callback in callbacks]):
+                    break
+
+        return step
+
+    def run(self, steps: int, dt: float = None, chunk: int = None, callback=None, interval: float = 0.1,
+            progress: bool = False) -> int:
+        """
+        advance the circuit by ``steps`` steps from its current state, so a
+        simulation can be continued run after run without a time array,
+        see ``advance`` for the chunks and the callback. Unlike
+        ``execute_circuit`` the synapses are not computed once more after the
+        last step, their recordings lag the neurons by one step until the next run
+
+        :param steps: number of steps
+        :param dt: the time step, the one of the previous run by default
+        :param chunk: number of steps executed between two calls of the callback
+        :param callback: called as callback(circuit, step, stop) between chunks,
+            returning False stops the run
+        :param interval: minimum number of seconds between two calls of the callback
+        :param progress: draw a progress bar
+        :return: number of steps executed
+        """
+        dt = self.dt if dt is None else dt
+        if dt is None:
+            raise CompBrainModelError("no time step given")
+        self.dt = dt
+
+        bar = ProgressBar() if progress else None
+        callbacks = [c for c in (bar, callback) if c is not None]
+        self.begin_run(steps)
+        try:
+            done = self.advance(dt, 0, steps, chunk, callbacks, interval)
+        finally:
+            if bar is not None:
+                bar.close()
+            self.end_run()
+
+        return done
+
+    def execute_circuit(self, t: np.ndarray, notebook: bool=False, start: int = 0, checkpoint: str = None,
+                        every: int = None, progress: bool = True, callback=None, chunk: int = None) -> int:
         """
         execute the whole circuit for all the time steps
         :param t: a time numpy array
-        :return: None
+        :param notebook: draw the progress bar as a notebook widget
+        :param start: the first step to execute, the value returned by ``resume``
+            to continue an interrupted run
+        :param checkpoint: the file of the periodic checkpoints
+        :param every: save a checkpoint every ``every`` steps
+        :param progress: draw a progress bar
+        :param callback: called as callback(circuit, step, stop) between chunks of
+            steps, returning False stops the run, see ``advance``
+        :param chunk: number of steps executed between two calls of the callbacks
+        :return: the index of the step reached
         """
         dt = t[1] - t[0]
+        self.dt = dt
+        if self.detect_spikes:
+            if self.detector is None or self.detector.size < len(self.neurons):
+                self.setup_detector()
+            self.detector.start(float(t[start]))
 
-        if not notebook:
-            for i in tqdm(range(len(t))):
-                if i < len(t)-1:
-                    self.execute_step(dt)
-                else:
-                    self.execute_step(dt, synapses_policy=True, neurons_policy=False)
+        bar = ProgressBar(notebook) if progress else None
+        callbacks = [c for c in (bar, callback) if c is not None]
+        self.begin_run(len(t) - start)
+        try:
+            step = self.advance(dt, start, len(t) - 1, chunk, callbacks, checkpoint=checkpoint, every=every)
+            if step == len(t) - 1:
+                self.execute_step(dt, synapses_policy=True, neurons_policy=False)
+                step += 1
+        finally:
+            if bar is not None:
+                bar.close()
+            self.end_run()
+
+        return step
+
+    def checkpoint(self, path: str, step: int):
+        """
+        save a compact checkpoint of the circuit, see ``save_checkpoint``
+
+        :param path: the checkpoint file
+        :param step: number of steps executed
+        """
+        if path is None:
+            raise CompBrainModelError("no checkpoint file given")
+        save_checkpoint(self, path, step)
+
+    def resume(self, path: str) -> int:
+        """
+        restore a checkpoint saved by a circuit built the same way, the states
+        restart from the checkpointed values without their histories
+
+        :param path: the checkpoint file
+        :return: the step to pass as ``start`` to ``execute_circuit``
+        """
+        return load_checkpoint(self, path)
+
+    def execute_sharded(self, t: np.ndarray, shards: int = None) -> np.ndarray:
+        """
+        execute the whole circuit for all the time steps on several processes
+
+        the neurons are partitioned into shards with few synapses between them,
+        every process steps one shard with the synapses onto its neurons, and the
+        processes exchange the voltages of the neurons read across shards through
+        shared memory after every step, so the results are identical to
+        ``execute_circuit`` with the object engine
+
+        :param t: a time numpy array
+        :param shards: number of processes, all the cores by default
+        :return: the shard of each neuron
+        """
+        if self.engine != 'object':
+            raise CompBrainModelError("the sharded execution runs on the object engine")
+        if self.detect_spikes:
+            raise CompBrainModelError("the spike detection runs in a single process")
+
+        # multiprocessing is only imported by the circuits executed on several processes
+        from .shard import execute_sharded
+        shard = execute_sharded(self, t, shards or os.cpu_count())
+        self.delay_dt = None
+        self.quiet = set()
+        return shard
+
+    def execute_events(self, t: np.ndarray) -> OrderedDict:
+        """
+        execute the whole circuit in the event-driven mode, for neurons with
+        linear subthreshold dynamics such as LIFNeuron and IAFNeuron
+
+        every neuron is integrated exactly between the changes of its external
+        injections and its spikes, which is all these models consume, the other
+        synapses are not evaluated. The neurons are integrated up to t[-1], a
+        next call continues from there with a time array starting at t[-1], the
+        voltage traces are rebuilt with ``reconstruct``
+
+        :param t: a time numpy array
+        :return: dict from neuron name to its spike times in this run
+        """
+        if self.event_solvers is None:
+            self.event_solvers = OrderedDict((neuron.name, EventSolver(neuron)) for neuron in self.neurons)
+
+        spikes = OrderedDict()
+        for neuron in self.neurons:
+            I_ext = np.zeros(len(t))
+            for parent in neuron.parents:
+                if getattr(parent, 'output', None) == 'I_ext':
+                    I_ext += np.asarray(parent.current[parent.count:parent.count + len(t)], dtype=float)
+            spikes[neuron.name] = self.event_solvers[neuron.name].run(t, I_ext)
+
+        for synapse in self.synapses:
+            if getattr(synapse, 'output', None) == 'I_ext':
+                synapse.count += len(t) - 1
+
+        return spikes
+
+    @property
+    def spikes(self) -> OrderedDict:
+        """
+        spike times of every neuron integrated in the event-driven mode
+        """
+        if self.event_solvers is None:
+            if self.detector is not None:
+                return self.detector.by_neuron([neuron.name for neuron in self.neurons])
+            return OrderedDict()
+        return OrderedDict((name, np.array(solver.spikes)) for name, solver in self.event_solvers.items())
+
+    def reconstruct(self, t: np.ndarray):
+        """
+        rebuild the voltage traces of the neurons integrated in the event-driven
+        mode at the sample times t, replacing their recorded states['V']
+
+        :param t: sample times within the executed interval
+        :return: None
+        """
+        for name, solver in self.event_solvers.items():
+            V = solver.trace(t)
+            self.index[name].states['V'] = StateBuffer(V, dtype=self.dtype) if self.recorder != 'list' else V.tolist()
 
-        if notebook:
-            for i in tqdm_notebook(range(len(t))):
-                if i < len(t)-1:
-                    self.execute_step(dt)
-                else:
-                    self.execute_step(dt, synapses_policy=True, neurons_policy=False)
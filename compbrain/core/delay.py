@@ -0,0 +1,43 @@
+"""Circular buffers serving delayed values in O(1)"""
+import numpy as np
+
+
+class DelayLine:
+    """
+    A circular buffer holding the last values of a scalar or of a vector, so a
+    value delayed by d steps is read in O(1) without keeping the whole history
+
+    :argument
+        values: the current values, also used as the history before the start
+        length: number of steps kept, the maximum delay in steps plus one
+        dtype: the numpy dtype of the buffer
+    """
+    def __init__(self, values, length: int, dtype=float):
+        values = np.asarray(values, dtype=dtype)
+        self.length = length
+        self.buffer = np.repeat(values[np.newaxis], length, axis=0)
+        self.head = 0
+
+    def push(self, values):
+        """
+        store the values of the current step, overwriting the oldest ones
+
+        :param values: the current values
+        """
+        self.head += 1
+        if self.head == self.length:
+            self.head = 0
+        self.buffer[self.head] = values
+
+    def read(self, steps, index=None):
+        """
+        read the values pushed ``steps`` steps ago
+
+        :param steps: delay in steps, an int or an array of ints, at most length - 1
+        :param index: the entries of a vector to read, one per delay
+        :return: the delayed values
+        """
+        rows = (self.head - steps) % self.length
+        if index is None:
+            return self.buffer[rows]
+        return self.buffer[rows, index]
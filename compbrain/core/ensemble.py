@@ -0,0 +1,202 @@
+"""Batched simulation of one circuit over many parameter sets"""
+import copy
+import numpy as np
+from collections import OrderedDict
+from .circuit import Circuit, paused_gc
+from .errors import CompBrainModelError
+
+
+def replica_name(name: str, k: int) -> str:
+    """
+    name of the k-th replica of a component
+    """
+    return "{}[{}]".format(name, k)
+
+
+def copy_component(component, name: str, overrides: dict, presynaptic=None, postsynaptic=None):
+    """
+    copy a component with fresh states and parameters, unwired, the large
+    read-only arrays (currents, weights) are shared with the original
+
+    :param component: the component to copy
+    :param name: name of the copy
+    :param overrides: dict of the parameters or initial states to overwrite,
+        an InjectCurrent also takes its keyword arguments (e.g. intensity)
+    :param presynaptic: the presynaptic wiring of a synapse copy, unchanged by default
+    :param postsynaptic: the postsynaptic wiring of a synapse copy, unchanged by default
+    :return: the copy
+    """
+    params = getattr(component, 'params', {})
+    if hasattr(component, 'presynaptic'):
+        presynaptic = component.presynaptic if presynaptic is None else presynaptic
+        postsynaptic = component.postsynaptic if postsynaptic is None else postsynaptic
+
+    keywords = {key: val for key, val in overrides.items() if key not in params and key not in component.states}
+    if keywords:
+        if not hasattr(component, 'current'):
+            raise CompBrainModelError(f"Unrecognized argument {', '.join(keywords)} of {component.name}")
+        replica = type(component)(name, presynaptic, postsynaptic, **{**component.kargs, **keywords})
+    else:
+        replica = copy.copy(component)
+        replica.name = name
+        replica.parents = []
+        replica.children = []
+        replica.states = OrderedDict((key, list(val)) for key, val in component.states.items())
+        if hasattr(component, 'params'):
+            replica.params = OrderedDict(component.params)
+        if hasattr(component, 'presynaptic'):
+            replica.presynaptic = presynaptic
+            replica.postsynaptic = postsynaptic
+
+    for key, val in overrides.items():
+        if key in params:
+            replica.params[key] = val
+        elif key in component.states:
+            replica.states[key] = [val]
+
+    return replica
+
+
+class Ensemble:
+    """
+    K replicas of one circuit, each with its own parameter set, stepped
+    together in a single run of the population engine
+
+    the replicas are laid out replica by replica inside every population and
+    synapse group, so each state is one (K, n) array per population and the
+    parameters differing across the replicas become per-component arrays,
+    which replaces K step loops by one vectorized loop. The components of
+    replica k are named "name[k]"
+
+    :argument
+        neurons: list of instantiated neurons, the template of every replica
+        synapses: list of instantiated synapses, the template of every replica
+        params: list of K dicts, one per replica, from a component name to the
+            dict of the parameters or initial states overwritten in that replica,
+            an InjectCurrent also takes its keyword arguments (e.g. intensity)
+        kargs: keyword arguments of the Circuit (recorder, method, gating, ...),
+            the engine is always the population engine
+    """
+    def __init__(self, neurons: list, synapses: list, params: list, **kargs):
+        if kargs.pop('engine', 'population') != 'population':
+            raise CompBrainModelError("an ensemble runs on the population engine only")
+
+        self.size = len(params)
+        self.neurons = list(neurons)
+        self.synapses = list(synapses)
+        names = set(component.name for component in self.neurons + self.synapses)
+        for overrides in params:
+            for name in overrides:
+                if name not in names:
+                    raise CompBrainModelError(f"no component named {name} in the circuit")
+
+        self.replicas = []
+        with paused_gc():
+            for k, overrides in enumerate(params):
+                replica = OrderedDict()
+                for component in self.neurons + self.synapses:
+                    replica[component.name] = self.replicate(component, k, overrides.get(component.name, {}))
+                self.replicas.append(replica)
+
+        # replica-major order inside every population and synapse group
+        self.circuit = Circuit([replica[neuron.name] for replica in self.replicas for neuron in self.neurons],
+                               [replica[synapse.name] for replica in self.replicas for synapse in self.synapses],
+                               engine='population', **kargs)
+
+    def rename(self, names, k: int):
+        """
+        map the wiring of a template synapse onto the neurons of replica k
+
+        :param names: name or list of names of neurons, "None" is kept
+        :param k: index of the replica
+        :return: the names of the replica neurons
+        """
+        neurons = set(neuron.name for neuron in self.neurons)
+        if isinstance(names, list):
+            return [replica_name(name, k) if name in neurons else name for name in names]
+        return replica_name(names, k) if names in neurons else names
+
+    def replicate(self, component, k: int, overrides: dict):
+        """
+        copy a template component into replica k
+
+        :param component: the template component
+        :param k: index of the replica
+        :param overrides: dict of the parameters or initial states to overwrite
+        :return: the replica component
+        """
+        if not hasattr(component, 'presynaptic'):
+            return copy_component(component, replica_name(component.name, k), overrides)
+        return copy_component(component, replica_name(component.name, k), overrides,
+                              self.rename(component.presynaptic, k), self.rename(component.postsynaptic, k))
+
+    def execute_circuit(self, t: np.ndarray, notebook: bool = False, **kargs) -> int:
+        """
+        execute all the replicas for all the time steps
+
+        :param t: a time numpy array
+        :param notebook: draw the progress bar as a notebook widget
+        :param kargs: keyword arguments of Circuit.execute_circuit (start,
+            checkpoint, every, progress, callback, chunk)
+        :return: the index of the step reached
+        """
+        return self.circuit.execute_circuit(t, notebook, **kargs)
+
+    def resume(self, path: str) -> int:
+        """
+        restore a checkpoint saved by an ensemble built the same way, see Circuit.resume
+
+        :param path: the checkpoint file
+        :return: the step to pass as ``start`` to ``execute_circuit``
+        """
+        return self.circuit.resume(path)
+
+    def reset_circuit(self):
+        """
+        reset the components of every replica to their initial values
+        """
+        self.circuit.reset_circuit()
+
+    def __getitem__(self, k: int) -> OrderedDict:
+        return self.replicas[k]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def results(self, k: int) -> OrderedDict:
+        """
+        the recorded states of replica k
+
+        :param k: index of the replica
+        :return: dict from template component name to its states dict
+        """
+        return OrderedDict((name, component.states) for name, component in self.replicas[k].items())
+
+    def trace(self, name: str, key: str = 'V') -> np.ndarray:
+        """
+        one state variable of a component across all the replicas
+
+        :param name: name of the template component
+        :param key: name of the state variable
+        :return: (time, K) numpy array
+        """
+        return np.stack([np.asarray(replica[name].states[key], dtype=self.circuit.dtype) for replica in self.replicas],
+                        axis=1)
+
+    def records(self, key: str = 'V') -> OrderedDict:
+        """
+        the recording of one state variable of every neuron population, shaped
+        by replica, without copying
+
+        :param key: name of the state variable
+        :return: dict from neuron class name to a (time, K, n) numpy array
+        """
+        if self.circuit.populations is None:
+            self.circuit.build_populations()
+
+        records = OrderedDict()
+        for population in self.circuit.populations:
+            if key in population.records:
+                values = np.asarray(population.records[key])
+                records[population.model.__name__] = values.reshape(len(values), self.size, -1)
+        return records
@@ -0,0 +1,90 @@
+"""Exact event-driven integration of neurons with linear subthreshold dynamics"""
+import numpy as np
+from .errors import CompBrainModelError
+
+
+class EventSolver:
+    """
+    Event-driven integration of one neuron driven by a piecewise constant input
+
+    between two events (a change of the input or a spike) the membrane is
+    advanced with the model's exact ``propagate`` function, and the next spike
+    time is solved directly with ``crossing_time``, so the work scales with the
+    number of input changes and spikes instead of the number of time steps.
+    A spike resets the membrane to V_0 at the crossing time, the voltage trace
+    is rebuilt on demand from the recorded segments
+
+    :argument
+        neuron: the instantiated neuron, its model should provide
+            ``propagate`` and ``crossing_time``
+    """
+    def __init__(self, neuron):
+        model = type(neuron)
+        if not (hasattr(model, 'propagate') and hasattr(model, 'crossing_time')):
+            raise CompBrainModelError(f"{model.__name__} has no exact propagator for the event-driven mode")
+        if neuron.params['V_0'] >= neuron.params['V_T']:
+            raise CompBrainModelError(f"{neuron.name} resets above its threshold")
+
+        self.model = model
+        self.neuron = neuron
+        self.params = neuron.params
+        self.V = float(neuron.states['V'][-1])
+        self.segment_t = []
+        self.segment_V = []
+        self.segment_I = []
+        self.spikes = []
+
+    def run(self, t: np.ndarray, I_ext: np.ndarray) -> np.ndarray:
+        """
+        integrate the neuron over t, the input I_ext[i] is held during [t[i], t[i+1])
+
+        :param t: a time numpy array in seconds
+        :param I_ext: the external injection current at each time step
+        :return: the spike times in seconds
+        """
+        scale = self.model.time_scale
+        I_ext = np.asarray(I_ext, dtype=float)
+        changes = np.concatenate([[0], np.flatnonzero(np.diff(I_ext[:len(t) - 1])) + 1, [len(t) - 1]])
+
+        V = self.V
+        spikes = []
+        for start, stop in zip(changes[:-1], changes[1:]):
+            I = I_ext[start]
+            t_start = t[start]
+            t_stop = t[stop]
+            while True:
+                self.segment_t.append(t_start)
+                self.segment_V.append(V)
+                self.segment_I.append(I)
+
+                t_spike = t_start + self.model.crossing_time(V, I, self.params) / scale
+                if t_spike >= t_stop:
+                    V = self.model.propagate(V, I, (t_stop - t_start) * scale, self.params)
+                    break
+                spikes.append(t_spike)
+                V = self.params['V_0']
+                t_start = t_spike
+
+        self.V = float(V)
+        self.spikes.extend(spikes)
+        return np.array(spikes)
+
+    def trace(self, t: np.ndarray) -> np.ndarray:
+        """
+        rebuild the membrane voltage at the requested sample times, the first
+        sample after each spike shows the spike value V_imp when it is above V_T
+
+        :param t: sample times in seconds, within the integrated interval
+        :return: membrane voltage at each sample time
+        """
+        t = np.asarray(t, dtype=float)
+        segment_t = np.array(self.segment_t)
+        segment = np.maximum(np.searchsorted(segment_t, t, side='right') - 1, 0)
+        V = self.model.propagate(np.array(self.segment_V)[segment], np.array(self.segment_I)[segment],
+                                 (t - segment_t[segment]) * self.model.time_scale, self.params)
+
+        if self.params['V_imp'] > self.params['V_T'] and len(self.spikes) > 0:
+            marks = np.searchsorted(t, self.spikes, side='left')
+            V[marks[marks < len(t)]] = self.params['V_imp']
+
+        return V
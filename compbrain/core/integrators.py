@@ -0,0 +1,77 @@
+"""Integration schemes advancing the neuron models by one time step"""
+import numpy as np
+from collections import OrderedDict
+
+
+def shift(states: dict, derivatives: dict, h: float) -> OrderedDict:
+    """
+    states + h * derivatives, variable by variable
+    """
+    return OrderedDict((key, val + derivatives[key] * h) for key, val in states.items())
+
+
+def euler(model, states: dict, params: dict, I_syn, I_ext, dt: float) -> OrderedDict:
+    """
+    forward Euler, the scheme the models were written with
+
+    :param model: the neuron class providing ``gradient``
+    :param states: dict of the state variables
+    :param params: dict of the parameters
+    :param I_syn: the input synapse current
+    :param I_ext: the external injection current
+    :param dt: time step in the time unit of the model
+    :return: dict of the next state variables
+    """
+    return shift(states, model.gradient(states, params, I_syn, I_ext), dt)
+
+
+def rk2(model, states: dict, params: dict, I_syn, I_ext, dt: float) -> OrderedDict:
+    """
+    second order Runge-Kutta (midpoint), the inputs are held constant over the step
+    """
+    k1 = model.gradient(states, params, I_syn, I_ext)
+    k2 = model.gradient(shift(states, k1, dt / 2), params, I_syn, I_ext)
+    return shift(states, k2, dt)
+
+
+def rk4(model, states: dict, params: dict, I_syn, I_ext, dt: float) -> OrderedDict:
+    """
+    classical fourth order Runge-Kutta, the inputs are held constant over the step
+    """
+    k1 = model.gradient(states, params, I_syn, I_ext)
+    k2 = model.gradient(shift(states, k1, dt / 2), params, I_syn, I_ext)
+    k3 = model.gradient(shift(states, k2, dt / 2), params, I_syn, I_ext)
+    k4 = model.gradient(shift(states, k3, dt), params, I_syn, I_ext)
+    return OrderedDict(
+        (key, val + (k1[key] + 2 * k2[key] + 2 * k3[key] + k4[key]) * (dt / 6))
+        for key, val in states.items()
+    )
+
+
+def exponential_euler(model, states: dict, params: dict, I_syn, I_ext, dt: float) -> OrderedDict:
+    """
+    exponential Euler, the variables relaxing linearly towards a steady state
+    (dx/dt = (x_inf - x) / tau, as returned by the model's ``gating``) are
+    advanced with the exact exponential propagator, which stays stable for
+    steps much larger than tau, the other variables use forward Euler
+    """
+    derivatives = model.gradient(states, params, I_syn, I_ext)
+    gating = model.gating(states, params, I_syn, I_ext)
+
+    next_states = OrderedDict()
+    for key, val in states.items():
+        if key in gating:
+            x_inf, tau = gating[key]
+            next_states[key] = x_inf + (val - x_inf) * np.exp(-dt / tau)
+        else:
+            next_states[key] = val + derivatives[key] * dt
+
+    return next_states
+
+
+INTEGRATORS = OrderedDict(
+    euler=euler,
+    rk2=rk2,
+    rk4=rk4,
+    exp_euler=exponential_euler,
+)
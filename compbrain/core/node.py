@@ -1,4 +1,8 @@
 import abc
+from collections import OrderedDict
+from .integrators import INTEGRATORS
+from .tables import tabulated
+from .errors import CompBrainModelError
 
 
 class BaseComponent:
@@ -54,3 +58,133 @@ class BaseComponent:
         """
 
 
+class BaseNeuron(BaseComponent):
+    """
+    Base class for neuron models
+
+    a neuron model implements its derivatives once, as the static ``gradient``
+    function working on numpy arrays, so the same code advances a single neuron
+    object and a whole population of neurons in the vectorized engine, with any
+    of the integration schemes of ``compbrain.core.integrators``
+    """
+    time_scale = 1e3
+    table = None
+    analytic = None
+    rate_names = ()
+
+    @staticmethod
+    @abc.abstractmethod
+    def gradient(states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        abstract method computing the time derivatives of the state variables,
+        in the time unit of the model
+
+        :param states: dict of the current state variables, scalars or arrays
+        :param params: dict of the parameters, scalars or arrays
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :return: dict of the derivatives
+        """
+
+    @staticmethod
+    def gating(states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        the variables relaxing linearly towards a steady state,
+        dx/dt = (x_inf - x) / tau, used by the exponential Euler scheme
+
+        :return: dict of (x_inf, tau) for each such variable
+        """
+        return {}
+
+    @classmethod
+    def rates(cls, V) -> tuple:
+        """
+        the rate functions of the voltage of the model, ``analytic_rates``, read
+        from the lookup table when the model is tabulated
+
+        :param V: membrane voltage
+        :return: tuple of the rates
+        """
+        if cls.table is not None:
+            return cls.table(V)
+        return cls.analytic_rates(V)
+
+    @classmethod
+    def tabulate(cls, V_min: float = -100.0, V_max: float = 60.0, step: float = 0.01) -> type:
+        """
+        the tabulated variant of the model, whose ``analytic_rates`` are
+        tabulated over [V_min, V_max] and linearly interpolated at runtime, the
+        model itself is unchanged, a circuit steps its neurons with the variant
+        when built with ``tables``. ``variant.table.error()`` reports the error
+        of the table, see ``RateTable.error``
+
+        :param V_min: lower end of the table in mV
+        :param V_max: upper end of the table in mV
+        :param step: resolution of the table in mV
+        :return: the tabulated subclass, shared by the calls with the same resolution
+        """
+        if not hasattr(cls, 'analytic_rates'):
+            raise CompBrainModelError(f"{cls.__name__} has no rate functions to tabulate")
+        return tabulated(cls.analytic or cls, V_min, V_max, step)
+
+    @staticmethod
+    def clamp(states: dict, params: dict) -> dict:
+        """
+        constrain the state variables before a step, nothing by default
+        """
+        return states
+
+    @staticmethod
+    def reset(states: dict, params: dict) -> dict:
+        """
+        apply discontinuities such as spike resets after a step, nothing by default
+        """
+        return states
+
+    @classmethod
+    def integrate(cls, states: dict, params: dict, I_syn, I_ext, dt: float, method: str = 'euler') -> dict:
+        """
+        advance the state variables by one time step without the discontinuities
+        of ``reset``, the voltage reached is the one a spike is detected on
+
+        :param states: dict of the current state variables, scalars or arrays
+        :param params: dict of the parameters, scalars or arrays
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :param dt: time step in seconds
+        :param method: the integration scheme, one of ``INTEGRATORS``
+        :return: dict of the next state variables before the reset
+        """
+        states = cls.clamp(states, params)
+        return INTEGRATORS[method](cls, states, params, I_syn, I_ext, dt * cls.time_scale)
+
+    @classmethod
+    def step(cls, states: dict, params: dict, I_syn, I_ext, dt: float, method: str = 'euler') -> dict:
+        """
+        advance the state variables by one time step
+
+        :param states: dict of the current state variables, scalars or arrays
+        :param params: dict of the parameters, scalars or arrays
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :param dt: time step in seconds
+        :param method: the integration scheme, one of ``INTEGRATORS``
+        :return: dict of the next state variables
+        """
+        return cls.reset(cls.integrate(states, params, I_syn, I_ext, dt, method), params)
+
+    def compute(self, I_syn: float, I_ext: float, dt: float, method: str = 'euler') -> dict:
+        """
+        advance the neuron by one time step and append the new values to its states
+
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :param dt: time step
+        :param method: the integration scheme
+        :return: states
+        """
+        current = OrderedDict((key, val[-1]) for key, val in self.states.items())
+        for key, val in self.step(current, self.params, I_syn, I_ext, dt, method).items():
+            self.states[key].append(float(val))
+
+        return self.states
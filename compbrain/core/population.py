@@ -0,0 +1,440 @@
+"""Struct-of-arrays containers used by the vectorized circuit engine"""
+import numpy as np
+from collections import OrderedDict
+from .errors import CompBrainModelError
+from .recorder import StateBuffer
+
+
+def shared(value, dtype=float):
+    """
+    a parameter shared by all the components, a numpy float is cast to the
+    precision of the arrays it meets, a python scalar never changes it
+    """
+    if isinstance(value, np.floating):
+        return np.dtype(dtype).type(value)
+    return value
+
+
+def stack_params(components: list, dtype=float) -> OrderedDict:
+    """
+    stack the params of the components into one entry per parameter,
+    a parameter shared by all the components is kept as a scalar so it
+    broadcasts for free
+
+    :param components: list of instantiated components of the same class
+    :param dtype: the numpy dtype of the stacked parameters
+    :return: OrderedDict of scalars or numpy arrays
+    """
+    params = OrderedDict()
+    for key in getattr(components[0], 'params', {}):
+        values = [component.params[key] for component in components]
+        if all(val == values[0] for val in values):
+            params[key] = shared(values[0], dtype)
+        else:
+            params[key] = np.array(values, dtype=dtype)
+
+    return params
+
+
+def subset(params: dict, index: np.ndarray) -> OrderedDict:
+    """
+    the params of a subset of the components, scalars are shared as they are
+
+    :param params: OrderedDict of scalars or numpy arrays
+    :param index: indices of the components
+    :return: OrderedDict of scalars or numpy arrays
+    """
+    return OrderedDict(
+        (key, val[index] if isinstance(val, np.ndarray) else val) for key, val in params.items()
+    )
+
+
+def stack_records(components: list, key: str, shape: tuple, dtype=float) -> StateBuffer:
+    """
+    start a population recording from the states of the components, the whole
+    history is kept when every component has the same number of values,
+    otherwise only the last value of each component
+
+    :param components: list of instantiated components
+    :param key: name of the state variable
+    :param shape: shape of one recorded row
+    :param dtype: the numpy dtype of the recording
+    :return: StateBuffer of rows
+    """
+    lengths = set(len(component.states[key]) for component in components)
+    if len(lengths) == 1:
+        values = np.array([np.asarray(component.states[key], dtype=dtype) for component in components]).T
+    else:
+        values = np.array([[component.states[key][-1] for component in components]])
+    return StateBuffer(values, shape=shape, dtype=dtype)
+
+
+class NeuronPopulation:
+    """
+    A group of neurons of the same model stored as struct-of-arrays
+
+    every state variable is one numpy array over the population, so one call
+    to the model's vectorized ``step`` advances all the neurons together
+
+    :argument
+        model: the neuron class shared by the neurons
+        neurons: list of instantiated neurons of that class
+        dtype: the numpy dtype of the states, parameters and recordings
+    """
+    def __init__(self, model, neurons: list, dtype=float):
+        if not hasattr(model, 'step'):
+            raise CompBrainModelError(f"{model.__name__} has no vectorized step function")
+
+        self.model = model
+        self.neurons = list(neurons)
+        self.size = len(self.neurons)
+        self.dtype = np.dtype(dtype)
+        self.params = stack_params(self.neurons, dtype)
+        self.records = OrderedDict(
+            (key, stack_records(self.neurons, key, (self.size,), dtype)) for key in self.neurons[0].states
+        )
+        self.states = OrderedDict((key, record[-1]) for key, record in self.records.items())
+        self.synced = len(self.records['V'])
+        self.quiet = np.zeros(self.size, dtype=bool)
+        self.detector = None
+        self.indices = np.arange(self.size)
+
+    def reserve(self, steps: int):
+        """
+        preallocate the recordings for the coming steps
+
+        :param steps: number of steps to make room for
+        """
+        for record in self.records.values():
+            record.reserve(steps)
+
+    def step(self, I_syn: np.ndarray, I_ext: np.ndarray, dt: float, method: str = 'euler',
+             tol: float = None) -> OrderedDict:
+        """
+        advance the whole population by one time step
+
+        :param I_syn: the input synapse current of each neuron
+        :param I_ext: the external injection current of each neuron
+        :param dt: time step
+        :param method: the integration scheme
+        :param tol: enable activity gating, a neuron whose state variables moved by
+            less than tol on a step without input is quiet, it keeps its states
+            without being computed until it receives an input again
+        :return: states
+        """
+        if tol is None:
+            self.states = self.advance(self.states, self.params, I_syn, I_ext, dt, method)
+        else:
+            self.states = self.gated_step(I_syn, I_ext, dt, method, tol)
+        if self.dtype != np.float64:
+            # a rate table or a float64 input promotes the result, the states keep their precision
+            self.states = OrderedDict((key, val.astype(self.dtype, copy=False)) for key, val in self.states.items())
+
+        for key, val in self.states.items():
+            self.records[key].append(val)
+
+        return self.states
+
+    def gated_step(self, I_syn: np.ndarray, I_ext: np.ndarray, dt: float, method: str, tol: float) -> OrderedDict:
+        """
+        advance the neurons which are not quiet, see ``step``
+        """
+        silent = (I_syn == 0) & (I_ext == 0)
+        skip = self.quiet & silent
+        if not skip.any():
+            states = self.advance(self.states, self.params, I_syn, I_ext, dt, method)
+        elif skip.all():
+            states = self.states
+        else:
+            index = np.flatnonzero(~skip)
+            computed = self.advance(subset(self.states, index), subset(self.params, index),
+                                    I_syn[index], I_ext[index], dt, method, index)
+            states = OrderedDict()
+            for key, val in self.states.items():
+                states[key] = val.copy()
+                states[key][index] = computed[key]
+
+        moved = np.zeros(self.size, dtype=bool)
+        for key, val in states.items():
+            moved |= ~(np.abs(val - self.states[key]) <= tol)
+        self.quiet = silent & ~moved
+        return states
+
+    def advance(self, states: dict, params: dict, I_syn: np.ndarray, I_ext: np.ndarray, dt: float, method: str,
+                index: np.ndarray = None) -> OrderedDict:
+        """
+        one step of the model on the neurons of the population, or on the subset
+        ``index`` of them, the spikes are detected on the voltages reached before
+        the reset when the population has a ``detector``, see SpikeDetector
+        """
+        if self.detector is None:
+            return self.model.step(states, params, I_syn, I_ext, dt, method)
+        reached = self.model.integrate(states, params, I_syn, I_ext, dt, method)
+        self.detector.detect(states['V'], reached['V'], self.indices if index is None else self.indices[index])
+        return self.model.reset(reached, params)
+
+    def sync(self, view: bool = False):
+        """
+        bring the states of each neuron up to date with the population recordings
+
+        :param view: replace the states of each neuron by a view on its column of
+            the recordings instead of appending the new steps to its lists
+        """
+        for key, record in self.records.items():
+            for i, neuron in enumerate(self.neurons):
+                if view and len(neuron.states[key]) <= self.synced:
+                    neuron.states[key] = record.column(i)
+                elif len(record) > self.synced:
+                    neuron.states[key].extend(record[self.synced:, i].tolist())
+        self.synced = len(self.records['V'])
+
+
+class SynapseGroup:
+    """
+    A group of synapses of the same model stored as struct-of-arrays
+
+    :argument
+        model: the synapse class shared by the synapses
+        synapses: list of instantiated synapses of that class
+        index: dict from neuron name to its index in the circuit voltage vector,
+            a name missing from it is mapped to the last entry of the vector
+        dtype: the numpy dtype of the parameters and of the recording
+    """
+    def __init__(self, model, synapses: list, index: dict, dtype=float):
+        self.model = model
+        self.synapses = list(synapses)
+        self.size = len(self.synapses)
+        self.output = model.output
+        self.dtype = np.dtype(dtype)
+        self.pre = np.array([index.get(synapse.presynaptic, len(index)) for synapse in self.synapses], dtype=int)
+        self.post = np.array([index.get(synapse.postsynaptic, len(index)) for synapse in self.synapses], dtype=int)
+        self.params = stack_params(self.synapses, dtype)
+        self.record = stack_records(self.synapses, self.output, (self.size,), dtype)
+        self.synced = len(self.record)
+
+    def reserve(self, steps: int):
+        """
+        preallocate the recording for the coming steps
+
+        :param steps: number of steps to make room for
+        """
+        self.record.reserve(steps)
+
+    @property
+    def delays(self) -> np.ndarray:
+        """
+        transmission delay in seconds of each presynaptic entry of the group
+        """
+        return np.broadcast_to(self.params.get('delay', 0), self.pre.shape)
+
+    def compute(self, V: np.ndarray, gating: bool = False, V_pre: np.ndarray = None) -> np.ndarray:
+        """
+        compute the output current of every synapse in the group
+
+        :param V: the circuit voltage vector
+        :param gating: only compute the synapses the model reports as ``active``,
+            the others output zero
+        :param V_pre: the presynaptic voltages when they differ from V[pre], e.g. delayed
+        :return: output current of each synapse
+        """
+        if V_pre is None:
+            V_pre = V[self.pre]
+        if gating and hasattr(self.model, 'active'):
+            index = np.flatnonzero(self.model.active(V_pre, self.params))
+            if len(index) < self.size:
+                I = np.zeros(self.size, dtype=self.dtype)
+                I[index] = self.model.update(V_pre[index], V[self.post[index]], subset(self.params, index))
+                self.record.append(I)
+                return I
+
+        I = self.model.update(V_pre, V[self.post], self.params)
+        self.record.append(I)
+        return I
+
+    def sync(self, view: bool = False):
+        """
+        bring the states of each synapse up to date with the group recording
+
+        :param view: replace the states of each synapse by a view on its column of
+            the recording instead of appending the new steps to its lists
+        """
+        for i, synapse in enumerate(self.synapses):
+            if view and len(synapse.states[self.output]) <= self.synced:
+                synapse.states[self.output] = self.record.column(i)
+            elif len(self.record) > self.synced:
+                synapse.states[self.output].extend(self.record[self.synced:, i].tolist())
+        self.synced = len(self.record)
+
+
+class InjectionGroup(SynapseGroup):
+    """
+    A group of current injections, the current arrays are stacked into one
+    (time, synapse) array and read row by row, the injections of a stimulus
+    evaluated on demand read their shared buffer
+    """
+    def __init__(self, model, synapses: list, index: dict, dtype=float):
+        super(InjectionGroup, self).__init__(model, synapses, index, dtype)
+
+        self.count = np.array([synapse.count for synapse in self.synapses])
+        stored = np.array([isinstance(synapse.current, (np.ndarray, list)) for synapse in self.synapses], dtype=bool)
+        self.dense = np.flatnonzero(stored)
+        self.columns = np.arange(len(self.dense))
+        self.current = np.stack([np.asarray(self.synapses[i].current, dtype=dtype) for i in self.dense], axis=1) \
+            if len(self.dense) > 0 else None
+
+        # the channels of a multichannel buffer are read together
+        buffers = OrderedDict()
+        for i, synapse in enumerate(self.synapses):
+            if not stored[i]:
+                source = getattr(synapse.current, 'source', synapse.current)
+                buffers.setdefault(id(source), (source, [], []))[1].append(i)
+                buffers[id(source)][2].append(getattr(synapse.current, 'column', None))
+        self.buffers = [(source, np.array(members), None if None in columns else np.array(columns))
+                        for source, members, columns in buffers.values()]
+
+    def compute(self, V: np.ndarray, gating: bool = False, V_pre: np.ndarray = None) -> np.ndarray:
+        """
+        query the current of every injection at its current count
+
+        :param V: the circuit voltage vector, not needed
+        :param gating: not needed
+        :param V_pre: not needed
+        :return: output current of each injection
+        """
+        if not self.buffers:
+            I = self.current[self.count, self.columns]
+        else:
+            I = np.empty(self.size, dtype=self.dtype)
+            if len(self.dense) > 0:
+                I[self.dense] = self.current[self.count[self.dense], self.columns]
+            for source, members, columns in self.buffers:
+                I[members] = source.take(self.count[members], columns)
+        self.count += 1
+        self.record.append(I)
+        return I
+
+    def sync(self, view: bool = False):
+        """
+        bring the states of each injection up to date and update their counters
+
+        :param view: replace the states of each injection by a view on its column of
+            the recording instead of appending the new steps to its lists
+        """
+        super(InjectionGroup, self).sync(view)
+        for synapse, count in zip(self.synapses, self.count):
+            synapse.count = int(count)
+
+
+def expand_params(components: list, sizes: list, keys: list, dtype=float) -> OrderedDict:
+    """
+    expand the params of the components to one entry per row or column they own,
+    a parameter shared by all the components is kept as a scalar
+
+    :param components: list of instantiated components of the same class
+    :param sizes: number of entries owned by each component
+    :param keys: names of the parameters to expand
+    :param dtype: the numpy dtype of the expanded parameters
+    :return: OrderedDict of scalars or numpy arrays
+    """
+    params = OrderedDict()
+    for key in keys:
+        values = [component.params[key] for component in components]
+        if all(val == values[0] for val in values):
+            params[key] = shared(values[0], dtype)
+        else:
+            params[key] = np.repeat(np.array(values, dtype=dtype), sizes)
+
+    return params
+
+
+class ProjectionGroup(SynapseGroup):
+    """
+    A group of sparse projections merged into one block CSR matrix with one row
+    per target neuron and one column per source neuron of every projection,
+    the conductances of the source neurons are aggregated onto the targets with
+    a single sparse matrix-vector product per step
+    """
+    def __init__(self, model, projections: list, index: dict, dtype=float):
+        self.model = model
+        self.synapses = list(projections)
+        self.output = model.output
+        self.dtype = np.dtype(dtype)
+
+        missing = len(index)
+        pre, post, rows, indices, data, self.slices = [], [], [], [], [], []
+        for projection in self.synapses:
+            n_post, n_pre = projection.shape
+            rows.append(np.repeat(np.arange(n_post), np.diff(projection.indptr)) + len(post))
+            indices.append(projection.indices + len(pre))
+            data.append(projection.data)
+            self.slices.append(slice(len(post), len(post) + n_post))
+            pre.extend(index.get(name, missing) for name in projection.presynaptic)
+            post.extend(index.get(name, missing) for name in projection.postsynaptic)
+
+        self.size = len(post)
+        self.pre = np.array(pre, dtype=int)
+        self.post = np.array(post, dtype=int)
+        self.rows = np.concatenate(rows)
+        self.indices = np.concatenate(indices)
+        self.data = np.concatenate(data).astype(dtype, copy=False)
+
+        n_post = [projection.shape[0] for projection in self.synapses]
+        n_pre = [projection.shape[1] for projection in self.synapses]
+        column_keys = [key for key in self.synapses[0].params if key not in model.row_params]
+        self.column_params = expand_params(self.synapses, n_pre, column_keys, dtype)
+        self.row_params = expand_params(self.synapses, n_post, model.row_params, dtype)
+        self.params = self.row_params
+
+        lengths = set(len(projection.states[self.output]) for projection in self.synapses)
+        if lengths == {0}:
+            values = np.empty((0, self.size))
+        elif len(lengths) == 1:
+            values = np.concatenate([np.asarray(projection.states[self.output], dtype=dtype)
+                                     for projection in self.synapses], axis=1)
+        else:
+            values = np.concatenate([projection.states[self.output][-1] for projection in self.synapses])
+        self.record = StateBuffer(values, shape=(self.size,), dtype=dtype)
+        self.synced = len(self.record)
+
+    @property
+    def delays(self) -> np.ndarray:
+        """
+        transmission delay in seconds of each source column of the group
+        """
+        return np.broadcast_to(self.column_params.get('delay', 0), self.pre.shape)
+
+    def compute(self, V: np.ndarray, gating: bool = False, V_pre: np.ndarray = None) -> np.ndarray:
+        """
+        compute the synapse current of every target neuron of the projections
+
+        :param V: the circuit voltage vector
+        :param gating: skip the sparse product when no source neuron is active
+        :param V_pre: the source voltages when they differ from V[pre], e.g. delayed
+        :return: output current of each target neuron
+        """
+        if V_pre is None:
+            V_pre = V[self.pre]
+        if gating and not np.any(self.model.active(V_pre, self.column_params)):
+            I = np.zeros(self.size, dtype=self.dtype)
+            self.record.append(I)
+            return I
+
+        g = self.model.conductance(V_pre, self.column_params)
+        G = np.bincount(self.rows, weights=self.data * g[self.indices], minlength=self.size)
+        I = self.model.current(G, V[self.post], self.row_params)
+        self.record.append(I)
+        return I
+
+    def sync(self, view: bool = False):
+        """
+        bring the states of each projection up to date with the group recording
+
+        :param view: replace the states of each projection by a view on its columns of
+            the recording instead of appending the new steps to its lists
+        """
+        for columns, projection in zip(self.slices, self.synapses):
+            if view and len(projection.states[self.output]) <= self.synced:
+                projection.states[self.output] = self.record.column(columns)
+            elif len(self.record) > self.synced:
+                projection.states[self.output].extend(list(self.record[self.synced:, columns]))
+        self.synced = len(self.record)
@@ -0,0 +1,89 @@
+"""Wall time spent by a circuit per phase and per component class"""
+from time import perf_counter
+from collections import OrderedDict
+
+
+class Profiler:
+    """
+    Accumulates the wall time and the number of calls of every (phase,
+    component class) of a profiled circuit
+
+    the phases are
+        aggregation: reading the presynaptic/postsynaptic voltages and summing the
+            input currents of the neurons, get_V_pre/get_V_post/get_I_syn/get_I_ext
+            on the object engine, the voltage vector, the delay lines and the
+            bincounts on the population engine
+        synapse update: the synapse computations
+        neuron update: the neuron integration steps
+        recording: appending the new neuron states on the object engine, and
+            preallocating, flushing and syncing the recordings of a run
+
+    the population engine appends the states inside its vectorized updates,
+    that time is counted with the updates
+    """
+    phases = ('aggregation', 'synapse update', 'neuron update', 'recording')
+    clock = staticmethod(perf_counter)
+
+    def __init__(self):
+        self.times = OrderedDict()
+        self.steps = 0
+
+    def add(self, phase: str, name: str, seconds: float, calls: int = 1):
+        """
+        account for time spent in a phase by a component class
+
+        :param phase: one of ``phases``
+        :param name: the component class name
+        :param seconds: the elapsed wall time
+        :param calls: number of calls it covers
+        """
+        entry = self.times.get((phase, name))
+        if entry is None:
+            self.times[(phase, name)] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    def reset(self):
+        """
+        forget the accumulated times
+        """
+        self.times = OrderedDict()
+        self.steps = 0
+
+    def summary(self) -> OrderedDict:
+        """
+        the accumulated times as nested dicts
+
+        :return: dict(total, steps, phases), with phases a dict from phase to
+            dict(seconds, calls, share, classes) and classes a dict from class
+            name to dict(seconds, calls, per_call)
+        """
+        total = sum(seconds for seconds, _ in self.times.values())
+        phases = OrderedDict()
+        for phase in self.phases:
+            classes = OrderedDict()
+            entries = sorted(((name, val) for (key, name), val in self.times.items() if key == phase),
+                             key=lambda item: -item[1][0])
+            for name, (seconds, calls) in entries:
+                classes[name] = OrderedDict(seconds=seconds, calls=calls, per_call=seconds / calls if calls else 0.0)
+            seconds = sum(val['seconds'] for val in classes.values())
+            phases[phase] = OrderedDict(seconds=seconds, calls=sum(val['calls'] for val in classes.values()),
+                                        share=seconds / total if total else 0.0, classes=classes)
+        return OrderedDict(total=total, steps=self.steps, phases=phases)
+
+    def report(self) -> str:
+        """
+        the summary as a table
+
+        :return: str
+        """
+        summary = self.summary()
+        lines = ["{} steps, {:.4f} s".format(summary['steps'], summary['total']),
+                 "{:<16}{:<26}{:>12}{:>10}{:>12}{:>8}".format('phase', 'class', 'seconds', 'calls', 'us/call', 'share')]
+        for phase, val in summary['phases'].items():
+            for name, entry in val['classes'].items():
+                lines.append("{:<16}{:<26}{:>12.4f}{:>10}{:>12.2f}{:>7.1f}%".format(
+                    phase, name, entry['seconds'], entry['calls'], 1e6 * entry['per_call'],
+                    100 * entry['seconds'] / summary['total'] if summary['total'] else 0.0))
+        return "\n".join(lines)
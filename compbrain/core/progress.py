@@ -0,0 +1,28 @@
+"""Progress bar callback of the chunked run loop"""
+
+
+class ProgressBar:
+    """
+    A run callback drawing a tqdm progress bar, tqdm (or tqdm.notebook and its
+    widgets) is only imported when the bar is first drawn
+
+    :argument
+        notebook: draw the notebook widget instead of the terminal bar
+    """
+    def __init__(self, notebook: bool = False):
+        self.notebook = notebook
+        self.bar = None
+
+    def __call__(self, circuit, step: int, stop: int):
+        if self.bar is None:
+            if self.notebook:
+                from tqdm.notebook import tqdm
+            else:
+                from tqdm import tqdm
+            self.bar = tqdm(total=stop, initial=step)
+        else:
+            self.bar.update(step - self.bar.n)
+
+    def close(self):
+        if self.bar is not None:
+            self.bar.close()
@@ -0,0 +1,347 @@
+"""Array-backed recording of the component states"""
+import io
+import numpy as np
+
+
+class StateBuffer:
+    """
+    A preallocated, list-like recording of one state variable
+
+    the values are written into a contiguous numpy buffer instead of being
+    boxed into a python list, ``append`` and ``[-1]`` behave like the lists the
+    models use and ``array`` returns the recorded values without a copy
+
+    :argument
+        values: initial values of the recording
+        capacity: number of values to preallocate on top of the initial values
+        shape: shape of each recorded value, () for a single component and
+            (n,) for a whole population
+        dtype: the numpy dtype of the buffer
+    """
+    def __init__(self, values=(), capacity: int = 0, shape: tuple = (), dtype=float):
+        values = np.asarray(values, dtype=dtype).reshape((-1,) + tuple(shape))
+        self.size = len(values)
+        self.data = np.empty((self.size + capacity,) + tuple(shape), dtype=dtype)
+        self.data[:self.size] = values
+
+    @classmethod
+    def wrap(cls, data: np.ndarray, size: int):
+        """
+        wrap an existing numpy array, used to expose one column of a
+        population recording without copying it
+
+        :param data: the preallocated array
+        :param size: number of values already recorded in the array
+        :return: StateBuffer
+        """
+        buffer = cls.__new__(cls)
+        buffer.data = data
+        buffer.size = size
+        return buffer
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        the recorded values as a numpy array, a view on the buffer
+        """
+        return self.data[:self.size]
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    def reserve(self, n: int):
+        """
+        make sure the buffer can take n more values without reallocating
+
+        :param n: number of values to make room for
+        """
+        if self.size + n <= len(self.data):
+            return
+        data = np.empty((self.size + n,) + self.data.shape[1:], dtype=self.data.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
+
+    def append(self, value):
+        """
+        record one value, the buffer doubles its capacity when it is full
+        """
+        if self.size == len(self.data):
+            self.reserve(max(self.size, 16))
+        self.data[self.size] = value
+        self.size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.data.dtype)
+        self.reserve(len(values))
+        self.data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def column(self, i: int):
+        """
+        the recording of one component of a population recording
+
+        :param i: index of the component in the population
+        :return: StateBuffer viewing the column
+        """
+        return StateBuffer.wrap(self.data[:, i], self.size)
+
+    def tolist(self) -> list:
+        return self.array.tolist()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            index = item + self.size if item < 0 else item
+            if not 0 <= index < self.size:
+                raise IndexError("StateBuffer index out of range")
+            return self.data[index]
+        return self.array[item]
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def __repr__(self):
+        return "StateBuffer({})".format(self.array)
+
+
+class StreamBuffer(StateBuffer):
+    """
+    A recording streamed to a .npy file in fixed-size chunks
+
+    only the last ``chunk`` values are kept in memory, the older ones are
+    written to the file whenever the chunk is full, so the memory used does not
+    grow with the length of the run. ``finish`` writes the last values and
+    turns the recording into a read-only memory-mapped view of the file, which
+    ``np.load(path, mmap_mode='r')`` opens without copying as well
+
+    :argument
+        path: the .npy file of the recording
+        values: initial values of the recording
+        capacity: number of values to make room for in the file on top of the initial values
+        shape: shape of each recorded value
+        dtype: the numpy dtype of the recording
+        chunk: number of values kept in memory between two writes
+    """
+    def __init__(self, path: str, values=(), capacity: int = 0, shape: tuple = (), dtype=float, chunk: int = 1024):
+        values = np.asarray(values, dtype=dtype).reshape((-1,) + tuple(shape))
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk = chunk
+        self.size = 0
+        self.start = 0
+        self.length = 0
+        self.offset = None
+        self.streaming = False
+        self.data = np.empty((0,) + self.shape, dtype=self.dtype)
+        self.reserve(len(values) + capacity)
+        self.extend(values)
+
+    @classmethod
+    def load(cls, path: str, chunk: int = 1024):
+        """
+        open a finished recording, a read-only memory-mapped view of its file,
+        a later append resumes the streaming into it
+
+        :param path: the .npy file of the recording
+        :param chunk: number of values kept in memory between two writes
+        :return: StreamBuffer
+        """
+        buffer = cls.__new__(cls)
+        buffer.path = path
+        buffer.chunk = chunk
+        buffer.data = np.load(path, mmap_mode='r')
+        buffer.shape = buffer.data.shape[1:]
+        buffer.dtype = buffer.data.dtype
+        buffer.size = buffer.start = buffer.length = len(buffer.data)
+        buffer.offset = buffer.data.offset
+        buffer.streaming = False
+        return buffer
+
+    def header(self, length: int) -> bytes:
+        """
+        the .npy header of a recording of the given length
+        """
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+            'shape': (length,) + self.shape,
+        })
+        return header.getvalue()
+
+    def reserve(self, n: int):
+        """
+        make room in the file for n more values and resume streaming into it
+
+        :param n: number of values to make room for
+        """
+        if not self.streaming:
+            self.data = np.empty((self.chunk,) + self.shape, dtype=self.dtype)
+            self.start = self.size
+            self.streaming = True
+        if self.offset is not None and self.size + n <= self.length:
+            return
+
+        self.resize(max(self.size + n, self.length))
+
+    def resize(self, length: int):
+        """
+        set the number of values the file holds, its header included
+
+        :param length: the new length, at least the number of values written
+        """
+        header = self.header(length)
+        row = int(np.prod(self.shape, dtype=int)) * self.dtype.itemsize
+        if self.offset is not None and len(header) != self.offset:
+            # the header changed size, move the values already written behind it
+            with open(self.path, 'rb') as file:
+                file.seek(self.offset)
+                written = file.read(self.start * row)
+            with open(self.path, 'wb') as file:
+                file.write(header)
+                file.write(written)
+        mode = 'r+b' if self.offset is not None else 'wb'
+        with open(self.path, mode) as file:
+            file.write(header)
+            file.truncate(len(header) + length * row)
+        self.offset = len(header)
+        self.length = length
+
+    def flush(self):
+        """
+        write the values held in memory to the file
+        """
+        if not self.streaming or self.size == self.start:
+            return
+        row = int(np.prod(self.shape, dtype=int)) * self.dtype.itemsize
+        with open(self.path, 'r+b') as file:
+            file.seek(self.offset + self.start * row)
+            file.write(self.data[:self.size - self.start].tobytes())
+        self.start = self.size
+
+    def finish(self):
+        """
+        write the last values and map the file, the recording becomes a
+        read-only view of the file, a later append resumes the streaming
+        """
+        self.flush()
+        self.resize(self.size)
+        self.streaming = False
+        self.data = np.load(self.path, mmap_mode='r')
+
+    def append(self, value):
+        if not self.streaming or self.size == self.length:
+            self.reserve(max(self.size, 16))
+        if self.size - self.start == self.chunk:
+            self.flush()
+        self.data[self.size - self.start] = value
+        self.size += 1
+
+    def extend(self, values):
+        for value in np.asarray(values, dtype=self.dtype).reshape((-1,) + self.shape):
+            self.append(value)
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        the recorded values as a numpy array, a memory-mapped view on the file
+        """
+        if self.streaming:
+            self.flush()
+            return np.load(self.path, mmap_mode='r')[:self.size]
+        return self.data[:self.size]
+
+    @property
+    def capacity(self) -> int:
+        return self.length
+
+    def column(self, i: int):
+        """
+        the recording of one component of a population recording, a view on
+        the file once the recording is finished
+        """
+        if self.streaming:
+            return StateBuffer.wrap(self.array[:, i], self.size)
+        return StateBuffer.wrap(self.data[:, i], self.size)
+
+    def __getitem__(self, item):
+        if self.streaming and isinstance(item, int):
+            index = item + self.size if item < 0 else item
+            if not 0 <= index < self.size:
+                raise IndexError("StreamBuffer index out of range")
+            if index >= self.start:
+                return self.data[index - self.start]
+            return self.array[index]
+        return super(StreamBuffer, self).__getitem__(item)
+
+    def __repr__(self):
+        return "StreamBuffer({}, {})".format(self.path, self.size)
+
+
+class LatestBuffer(StateBuffer):
+    """
+    A recording keeping only the first value and the last ``depth`` values,
+    for the runs read through their spikes, its memory does not grow with the
+    length of the run. ``[-1]`` and ``[-2]`` behave like the full recording and
+    ``[0]`` is still the initial value, which ``reset_value`` of the models restores
+
+    :argument
+        values: initial values of the recording, only the first and the last ``depth`` are kept
+        shape: shape of each recorded value
+        dtype: the numpy dtype of the recording
+        depth: number of values kept
+    """
+    def __init__(self, values=(), shape: tuple = (), dtype=float, depth: int = 2):
+        values = np.asarray(values, dtype=dtype).reshape((-1,) + tuple(shape))
+        self.first = values[0].copy() if len(values) > 0 else None
+        values = values[-depth:]
+        self.size = len(values)
+        self.data = np.empty((depth,) + tuple(shape), dtype=dtype)
+        self.data[:self.size] = values
+
+    def reserve(self, n: int):
+        pass
+
+    def append(self, value):
+        """
+        record one value, dropping the oldest one but the first when the buffer is full
+        """
+        if self.first is None:
+            self.first = np.array(value, dtype=self.data.dtype)
+        if self.size < len(self.data):
+            self.data[self.size] = value
+            self.size += 1
+            return
+        self.data[:-1] = self.data[1:]
+        self.data[-1] = value
+
+    def extend(self, values):
+        for value in np.asarray(values, dtype=self.data.dtype).reshape((-1,) + self.data.shape[1:]):
+            self.append(value)
+
+    def column(self, i: int):
+        """
+        the recording of one component of a population recording
+
+        :param i: index of the component in the population
+        :return: LatestBuffer viewing the column
+        """
+        buffer = LatestBuffer.wrap(self.data[:, i], self.size)
+        buffer.first = None if self.first is None else self.first[i]
+        return buffer
+
+    def __getitem__(self, item):
+        if isinstance(item, int) and item == 0 and self.first is not None:
+            return self.first
+        return super(LatestBuffer, self).__getitem__(item)
+
+    def __repr__(self):
+        return "LatestBuffer({})".format(self.array)
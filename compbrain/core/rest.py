@@ -0,0 +1,147 @@
+"""Resting states of the neuron models, solved once per parameter set"""
+import numpy as np
+from collections import OrderedDict
+from .population import stack_params
+
+# the resting states already solved, by (model, parameters, holding current),
+# None for a parameter set without a stable resting state
+RESTING_STATES = {}
+
+
+def derivatives(model, keys: list, x: np.ndarray, params: dict, I_ext: np.ndarray) -> np.ndarray:
+    """
+    the derivatives of the model at the (neuron, variable) states x, as an array of the same shape
+    """
+    with np.errstate(all='ignore'):
+        gradient = model.gradient(OrderedDict(zip(keys, x.T)), params, 0.0, I_ext)
+    return np.stack([np.broadcast_to(gradient[key], I_ext.shape) for key in keys], axis=1)
+
+
+def jacobian(model, keys: list, x: np.ndarray, params: dict, I_ext: np.ndarray, F: np.ndarray) -> np.ndarray:
+    """
+    the (neuron, derivative, variable) Jacobian of the model at x by forward differences
+    """
+    J = np.empty(x.shape + x.shape[1:])
+    h = 1e-7 * np.maximum(np.abs(x), 1.0)
+    for j in range(x.shape[1]):
+        shifted = x.copy()
+        shifted[:, j] += h[:, j]
+        J[:, :, j] = (derivatives(model, keys, shifted, params, I_ext) - F) / h[:, j:j + 1]
+    return J
+
+
+def solve_rest(model, states: dict, params: dict, I_ext, tol: float = 1e-10, iterations: int = 100) -> tuple:
+    """
+    the resting equilibrium of a population of neurons of one model, solved
+    with a damped Newton's method on all the neurons at once
+
+    the search starts from the given states with every gating variable at its
+    steady state, a Newton step is halved until it reduces the largest
+    derivative of the neuron. An equilibrium is a resting state when it is
+    stable, every eigenvalue of the Jacobian has a negative real part, and the
+    model's ``reset`` leaves it unchanged, so a neuron oscillating or firing
+    at its holding current has none
+
+    :param model: the neuron class
+    :param states: dict of the initial state variables, scalars or arrays
+    :param params: dict of the parameters, scalars or arrays
+    :param I_ext: the holding current of each neuron
+    :param tol: the largest derivative left at the equilibrium
+    :param iterations: maximum number of Newton steps
+    :return: (dict of the resting state variables, boolean array of the neurons having one)
+    """
+    I_ext = np.atleast_1d(np.asarray(I_ext, dtype=float))
+    keys = list(states)
+    x = np.stack([np.broadcast_to(np.asarray(states[key], dtype=float), I_ext.shape) for key in keys], axis=1)
+    with np.errstate(all='ignore'):
+        for key, (x_inf, _) in model.gating(OrderedDict(zip(keys, x.T)), params, 0.0, I_ext).items():
+            x[:, keys.index(key)] = x_inf
+    x = np.stack([np.broadcast_to(model.clamp(OrderedDict(zip(keys, x.T)), params)[key], I_ext.shape)
+                  for key in keys], axis=1)
+
+    F = derivatives(model, keys, x, params, I_ext)
+    residual = np.max(np.abs(F), axis=1)
+    active = np.isfinite(residual) & (residual > tol)
+    for _ in range(iterations):
+        if not active.any():
+            break
+        J = jacobian(model, keys, x, params, I_ext, F)
+        step = np.zeros_like(x)
+        step[active] = -(np.linalg.pinv(J[active]) @ F[active][..., None])[..., 0]
+
+        scale = np.ones(len(x))
+        moved = np.zeros(len(x), dtype=bool)
+        for _ in range(30):
+            trial = x + scale[:, None] * step
+            F_trial = derivatives(model, keys, trial, params, I_ext)
+            better = active & ~moved & (np.max(np.abs(F_trial), axis=1) < residual)
+            x[better], F[better] = trial[better], F_trial[better]
+            moved |= better
+            if moved[active].all():
+                break
+            scale[~moved] /= 2
+
+        residual = np.max(np.abs(F), axis=1)
+        # a neuron whose step does not reduce its derivatives is stuck
+        active &= moved & (residual > tol)
+
+    with np.errstate(all='ignore'):
+        stable = np.all(np.linalg.eigvals(jacobian(model, keys, x, params, I_ext, F)).real < 0, axis=1)
+    resting = OrderedDict(zip(keys, x.T))
+    after = model.reset(resting, params)
+    kept = np.all([np.broadcast_to(after[key] == resting[key], I_ext.shape) for key in keys], axis=0)
+    return resting, (residual <= tol) & stable & kept
+
+
+def rest(neurons: list, I_ext=0.0, model_of=None) -> list:
+    """
+    set the initial states of neurons to their resting states at a holding
+    current, without synaptic input, so a run starts without the warm-up
+    transient. The neurons of a model are solved together by ``solve_rest``
+    and every solution is cached by model, parameters and holding current, so
+    the next neurons or runs with the same parameter set are not solved again.
+    A tabulated variant of a model is a different model of the cache.
+    The recorded histories are dropped, ``reset_value`` returns to the resting states
+
+    :param neurons: list of instantiated neurons
+    :param I_ext: the holding current, a scalar for all the neurons, a list with
+        one value per neuron or a dict from neuron name to its current, 0 for a missing name
+    :param model_of: function from the class of a neuron to the class solved for it,
+        the class itself by default, see ``Circuit.model_of``
+    :return: list of the names of the neurons without a stable resting state, left as they were
+    """
+    if isinstance(I_ext, dict):
+        currents = [float(I_ext.get(neuron.name, 0.0)) for neuron in neurons]
+    else:
+        currents = np.broadcast_to(np.asarray(I_ext, dtype=float), (len(neurons),)).tolist()
+
+    models = {}
+    groups = OrderedDict()
+    for neuron, current in zip(neurons, currents):
+        if type(neuron) not in models:
+            models[type(neuron)] = type(neuron) if model_of is None else model_of(type(neuron))
+        groups.setdefault((models[type(neuron)], tuple(neuron.params.items()), current), []).append(neuron)
+
+    by_model = OrderedDict()
+    for key in groups:
+        if key not in RESTING_STATES:
+            by_model.setdefault(key[0], []).append(key)
+    for model, missing in by_model.items():
+        first = [groups[key][0] for key in missing]
+        states = OrderedDict((name, np.array([neuron.states[name][-1] for neuron in first], dtype=float))
+                             for name in first[0].states)
+        resting, found = solve_rest(model, states, stack_params(first), [key[2] for key in missing])
+        for i, key in enumerate(missing):
+            RESTING_STATES[key] = OrderedDict((name, float(val[i])) for name, val in resting.items()) \
+                if found[i] else None
+
+    unchanged = []
+    for key, members in groups.items():
+        state = RESTING_STATES[key]
+        if state is None:
+            unchanged.extend(neuron.name for neuron in members)
+            continue
+        for neuron in members:
+            neuron.states = OrderedDict((name, [val]) for name, val in state.items())
+
+    return unchanged
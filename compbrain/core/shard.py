@@ -0,0 +1,268 @@
+"""Domain-decomposed execution of one circuit on several processes"""
+import traceback
+import numpy as np
+import multiprocessing as mp
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from .node import BaseComponent
+from .recorder import StateBuffer, StreamBuffer, LatestBuffer
+from .errors import CompBrainModelError
+
+
+def wiring(synapse) -> tuple:
+    """
+    the presynaptic and postsynaptic neuron names of a synapse as lists
+    """
+    presynaptic = synapse.presynaptic if isinstance(synapse.presynaptic, list) else [synapse.presynaptic]
+    postsynaptic = synapse.postsynaptic if isinstance(synapse.postsynaptic, list) else [synapse.postsynaptic]
+    return presynaptic, postsynaptic
+
+
+def partition(neurons: list, synapses: list, shards: int, passes: int = 4, imbalance: float = 1.05) -> np.ndarray:
+    """
+    split the neurons into shards of balanced size with few synapses crossing
+    between shards
+
+    the neurons are ordered by a breadth-first walk of the synapse graph and cut
+    into contiguous blocks, then refined by moving each neuron to the shard
+    holding most of its neighbours as long as that shard stays below the
+    allowed imbalance
+
+    :param neurons: list of instantiated neurons
+    :param synapses: list of instantiated synapses
+    :param shards: number of shards
+    :param passes: number of refinement passes
+    :param imbalance: maximum size of a shard relative to the mean size
+    :return: the shard of each neuron
+    """
+    index = {neuron.name: i for i, neuron in enumerate(neurons)}
+    neighbours = [[] for _ in neurons]
+    for synapse in synapses:
+        presynaptic, postsynaptic = wiring(synapse)
+        for pre in presynaptic:
+            for post in postsynaptic:
+                if pre in index and post in index and pre != post:
+                    neighbours[index[pre]].append(index[post])
+                    neighbours[index[post]].append(index[pre])
+
+    order, seen = [], np.zeros(len(neurons), dtype=bool)
+    for root in range(len(neurons)):
+        if seen[root]:
+            continue
+        seen[root] = True
+        queue = [root]
+        while queue:
+            order.extend(queue)
+            frontier = []
+            for i in queue:
+                for j in neighbours[i]:
+                    if not seen[j]:
+                        seen[j] = True
+                        frontier.append(j)
+            queue = frontier
+
+    shard = np.empty(len(neurons), dtype=int)
+    shard[order] = np.arange(len(neurons)) * shards // max(len(neurons), 1)
+
+    capacity = imbalance * len(neurons) / shards
+    sizes = np.bincount(shard, minlength=shards)
+    for _ in range(passes):
+        moved = 0
+        for i in order:
+            if not neighbours[i]:
+                continue
+            counts = np.bincount(shard[neighbours[i]], minlength=shards)
+            best = int(np.argmax(counts))
+            if best != shard[i] and counts[best] > counts[shard[i]] and sizes[best] + 1 <= capacity:
+                sizes[shard[i]] -= 1
+                sizes[best] += 1
+                shard[i] = best
+                moved += 1
+        if moved == 0:
+            break
+
+    return shard
+
+
+class BoundaryNeuron(BaseComponent):
+    """
+    The stand-in of a neuron stepped by another shard, its voltage is the one
+    last published by that shard
+
+    :argument
+        name: the name of the neuron it stands for
+        V: its current voltage
+    """
+    def __init__(self, name: str, V: float):
+        super(BoundaryNeuron, self).__init__(name)
+        self.states = OrderedDict(V=[V])
+
+    def compute(self):
+        pass
+
+    def reset_value(self):
+        pass
+
+
+def run_shard(shard: int, neurons: list, synapses: list, boundary: list, published: list, kargs: dict,
+              t: np.ndarray, buffer_name: str, barrier, queue):
+    """
+    step the neurons of one shard and the synapses onto them, publishing the
+    voltages of its boundary neurons and reading the ones of the other shards
+    through the shared buffer after every step
+
+    :param shard: index of the shard
+    :param neurons: list of the neurons of the shard
+    :param synapses: list of the synapses onto the neurons of the shard, in circuit order
+    :param boundary: list of (slot, name) of the neurons of other shards read by the synapses
+    :param published: list of (slot, name) of the neurons of the shard read by other shards
+    :param kargs: keyword arguments of the Circuit
+    :param t: a time numpy array
+    :param buffer_name: name of the shared (2, boundary size) voltage buffer
+    :param barrier: barrier shared by all the shards
+    :param queue: queue receiving the results
+    """
+    from .circuit import Circuit
+
+    buffer = None
+    try:
+        memory = shared_memory.SharedMemory(name=buffer_name)
+        size = memory.size // (2 * np.dtype(float).itemsize)
+        buffer = np.ndarray((2, size), dtype=float, buffer=memory.buf)
+
+        circuit = Circuit([], [], **kargs)
+        ghosts = [(slot, BoundaryNeuron(name, float(buffer[0, slot]))) for slot, name in boundary]
+        for neuron in neurons:
+            circuit.add_neuron(neuron)
+        for _, ghost in ghosts:
+            circuit.index[ghost.name] = ghost
+        for synapse in synapses:
+            circuit.add_synapse(synapse)
+        published = [(slot, circuit.index[name]) for slot, name in published]
+        if circuit.recorder != 'list':
+            circuit.allocate(len(t))
+
+        dt = t[1] - t[0]
+        for i in range(len(t)):
+            for slot, ghost in ghosts:
+                ghost.states['V'][0] = float(buffer[i % 2, slot])
+            if i < len(t) - 1:
+                circuit.execute_step(dt)
+                for slot, neuron in published:
+                    buffer[(i + 1) % 2, slot] = neuron.states['V'][-1]
+                barrier.wait()
+            else:
+                circuit.execute_step(dt, synapses_policy=True, neurons_policy=False)
+
+        # the streamed recordings are sent back as the paths of their files
+        circuit.finish()
+        results = OrderedDict()
+        for component in neurons + synapses:
+            states = OrderedDict((key, val.path if isinstance(val, StreamBuffer) else np.asarray(val, dtype=circuit.dtype))
+                                 for key, val in component.states.items())
+            results[component.name] = (states, getattr(component, 'count', None))
+        queue.put((shard, results, None))
+    except Exception:
+        barrier.abort()
+        queue.put((shard, None, traceback.format_exc()))
+    finally:
+        del buffer
+
+
+def execute_sharded(circuit, t: np.ndarray, shards: int) -> np.ndarray:
+    """
+    execute a circuit on several processes, each stepping one shard of the
+    neurons with the synapses onto them, in the same order as the serial
+    execution (synapses first, then neurons) so the results are identical
+
+    :param circuit: the Circuit, executed with the object engine
+    :param t: a time numpy array
+    :param shards: number of processes
+    :return: the shard of each neuron
+    """
+    from .ensemble import copy_component
+
+    shard = partition(circuit.neurons, circuit.synapses, shards)
+    owner = {neuron.name: s for neuron, s in zip(circuit.neurons, shard)}
+
+    members = [[] for _ in range(shards)]
+    for neuron, s in zip(circuit.neurons, shard):
+        members[s].append(neuron)
+
+    incoming = [[] for _ in range(shards)]
+    reads = [OrderedDict() for _ in range(shards)]
+    for synapse in circuit.synapses:
+        presynaptic, postsynaptic = wiring(synapse)
+        targets = set(owner[name] for name in postsynaptic if name in owner)
+        if len(targets) > 1:
+            raise CompBrainModelError(f"{synapse.name} projects onto neurons of different shards")
+        s = targets.pop() if targets else owner.get(presynaptic[0], 0)
+        incoming[s].append(synapse)
+        for name in presynaptic:
+            if name in owner and owner[name] != s:
+                reads[s][name] = None
+
+    slots = OrderedDict.fromkeys(name for read in reads for name in read)
+    slots = OrderedDict((name, slot) for slot, name in enumerate(slots))
+    memory = shared_memory.SharedMemory(create=True, size=2 * max(len(slots), 1) * np.dtype(float).itemsize)
+    buffer = np.ndarray((2, max(len(slots), 1)), dtype=float, buffer=memory.buf)
+    for name, slot in slots.items():
+        buffer[0, slot] = circuit.index[name].states['V'][-1]
+
+    # the shards stream into the files of the circuit, or record into arrays
+    # written into the recorder of the circuit
+    if circuit.recorder == 'file':
+        circuit.trace_directory()
+    kargs = dict(engine='object', recorder=circuit.recorder, method=circuit.method, gating=circuit.gating,
+                 gating_tol=circuit.gating_tol, dtype=circuit.dtype, tables=circuit.tables,
+                 directory=circuit.directory, chunk=circuit.chunk)
+    context = mp.get_context()
+    barrier = context.Barrier(shards)
+    queue = context.Queue()
+    processes = []
+    try:
+        for s in range(shards):
+            neurons = [copy_component(neuron, neuron.name, {}) for neuron in members[s]]
+            synapses = [copy_component(synapse, synapse.name, {}) for synapse in incoming[s]]
+            boundary = [(slots[name], name) for name in reads[s]]
+            published = [(slot, name) for name, slot in slots.items() if owner[name] == s]
+            process = context.Process(target=run_shard, args=(s, neurons, synapses, boundary, published, kargs,
+                                                              t, memory.name, barrier, queue))
+            process.start()
+            processes.append(process)
+
+        errors = []
+        for _ in range(shards):
+            s, results, error = queue.get()
+            if error is not None:
+                errors.append(error)
+                continue
+            for name, (states, count) in results.items():
+                component = circuit.index[name]
+                for key, val in states.items():
+                    if circuit.recorder == 'list':
+                        component.states[key] = val.tolist()
+                    elif circuit.recorder == 'none':
+                        component.states[key] = LatestBuffer(val, dtype=circuit.dtype)
+                    elif circuit.recorder == 'file':
+                        component.states[key] = StreamBuffer.load(val, circuit.chunk)
+                    else:
+                        component.states[key] = StateBuffer(val, dtype=circuit.dtype)
+                if count is not None:
+                    component.count = count
+
+        for process in processes:
+            process.join()
+        if errors:
+            # the other shards only report the broken barrier
+            errors.sort(key=lambda error: 'BrokenBarrierError' in error)
+            raise CompBrainModelError("a shard failed:\n" + errors[0])
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        del buffer
+        memory.close()
+        memory.unlink()
+
+    return shard
@@ -0,0 +1,120 @@
+"""Online detection of the spikes of the neurons during a run"""
+import numpy as np
+from collections import OrderedDict
+from .recorder import StateBuffer
+
+
+def default_threshold(neuron) -> float:
+    """
+    the spike threshold of a neuron, its V_T parameter or 0 mV
+    """
+    return float(neuron.params.get('V_T', 0.0))
+
+
+class SpikeDetector:
+    """
+    Spikes of the neurons of a circuit detected while it runs, stored as two
+    growing arrays of events, the index of the neuron in ``circuit.neurons``
+    and the time of the spike, so a run read through its spikes takes memory
+    in the number of spikes instead of neurons times steps
+
+    a neuron spikes on a step when its voltage crosses its threshold upwards,
+    from below it before the step to at or above it at the end of the step
+    before the model's ``reset``, so the integrate-and-fire models which reset
+    within the step are detected too. A crossing within ``refractory`` seconds
+    of the previous spike of the neuron is ignored
+
+    :argument
+        thresholds: the threshold in mV of each neuron
+        refractory: minimum interval in seconds between two spikes of a neuron
+    """
+    def __init__(self, thresholds, refractory: float = 0.0):
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.refractory = refractory
+        self.last = np.full(len(self.thresholds), -np.inf)
+        self.index = StateBuffer(dtype=np.int64)
+        self.times = StateBuffer()
+        self.t0 = 0.0
+        self.count = 0
+        self.dt = None
+        self.time = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.thresholds)
+
+    def extend(self, thresholds):
+        """
+        add neurons to the detector
+
+        :param thresholds: the threshold in mV of each new neuron
+        """
+        self.thresholds = np.concatenate([self.thresholds, np.asarray(thresholds, dtype=float)])
+        self.last = np.concatenate([self.last, np.full(len(thresholds), -np.inf)])
+
+    def start(self, time: float):
+        """
+        set the time of the current states, the next step ends at time + dt
+        """
+        self.t0 = time
+        self.count = 0
+        self.time = time
+
+    def tick(self, dt: float):
+        """
+        move the clock to the end of the coming step
+
+        :param dt: dt
+        """
+        if dt != self.dt:
+            self.start(self.time)
+            self.dt = dt
+        self.count += 1
+        self.time = self.t0 + self.count * dt
+
+    def detect(self, V_before: np.ndarray, V_after: np.ndarray, index: np.ndarray):
+        """
+        record the spikes of the step of a group of neurons
+
+        :param V_before: the voltages at the start of the step
+        :param V_after: the voltages reached by the step, before the reset
+        :param index: the index of each voltage in the circuit neurons
+        """
+        threshold = self.thresholds[index]
+        found = index[(V_before < threshold) & (V_after >= threshold)]
+        if self.refractory > 0:
+            found = found[self.time - self.last[found] >= self.refractory]
+        if len(found) > 0:
+            self.last[found] = self.time
+            self.index.extend(found)
+            self.times.extend(np.full(len(found), self.time))
+
+    def check(self, i: int, V_before: float, V_after: float):
+        """
+        record the spike of the step of one neuron, see ``detect``
+
+        :param i: the index of the neuron in the circuit neurons
+        :param V_before: the voltage at the start of the step
+        :param V_after: the voltage reached by the step, before the reset
+        """
+        threshold = self.thresholds[i]
+        if V_before < threshold <= V_after and self.time - self.last[i] >= self.refractory:
+            self.last[i] = self.time
+            self.index.append(i)
+            self.times.append(self.time)
+
+    def train(self) -> tuple:
+        """
+        :return: (index of the neuron, time of the spike) arrays, in order of time
+        """
+        return self.index.array, self.times.array
+
+    def by_neuron(self, names: list) -> OrderedDict:
+        """
+        :param names: the names of the circuit neurons
+        :return: dict from neuron name to its spike times
+        """
+        index, times = self.train()
+        order = np.argsort(index, kind='stable')
+        bounds = np.searchsorted(index[order], np.arange(len(names) + 1))
+        return OrderedDict((name, times[order[bounds[i]:bounds[i + 1]]]) for i, name in enumerate(names))
@@ -0,0 +1,119 @@
+"""Voltage-indexed lookup tables of the gating rate functions"""
+import numpy as np
+from collections import OrderedDict
+
+# the tabulated variants of the neuron models, by (model, V_min, V_max, step)
+TABULATED = {}
+
+
+class RateTable:
+    """
+    Functions of the membrane voltage tabulated on a uniform grid and evaluated
+    by linear interpolation, which replaces the exponentials and powers of the
+    rate functions by one gather and one multiply-add per function, every
+    segment of the table is stored as an intercept and a slope in V
+
+    a grid point falling on a removable singularity of a function, such as
+    V=10 in the alpha_n rate of the Hodgkin-Huxley model, takes the limit of the
+    function, the mean of its values just around the point. A voltage outside
+    [V_min, V_max] takes the value at the nearest end of the table
+
+    :argument
+        function: the vectorized function of V returning a tuple of arrays
+        V_min: lower end of the table in mV
+        V_max: upper end of the table in mV
+        step: resolution of the table in mV
+        names: names of the outputs of the function, used by ``error``
+    """
+    def __init__(self, function, V_min: float = -100.0, V_max: float = 60.0, step: float = 0.01, names=None):
+        self.function = function
+        self.V_min = V_min
+        self.step = step
+        self.size = int(round((V_max - V_min) / step)) + 1
+        self.V_max = V_min + (self.size - 1) * step
+        self.V = V_min + np.arange(self.size) * step
+
+        with np.errstate(all='ignore'):
+            values = np.array(np.broadcast_arrays(*function(self.V)), dtype=float)
+            singular = ~np.isfinite(values)
+            if singular.any():
+                columns = np.flatnonzero(singular.any(axis=0))
+                eps = 1e-6 * max(step, 1.0)
+                around = 0.5 * (np.array(np.broadcast_arrays(*function(self.V[columns] - eps)), dtype=float) +
+                                np.array(np.broadcast_arrays(*function(self.V[columns] + eps)), dtype=float))
+                values[:, columns] = np.where(singular[:, columns], around, values[:, columns])
+
+        self.values = values
+        # the last segment is repeated for V = V_max
+        slope = np.diff(values, axis=1) / step
+        slope = np.concatenate([slope, slope[:, -1:]], axis=1)
+        self.slope = slope
+        self.intercept = values - slope * self.V
+        self.segments = np.concatenate([self.intercept, self.slope])
+        # python rows for the scalar voltages of the object engine
+        self.rows = [tuple(zip(a, b)) for a, b in zip(self.intercept.T.tolist(), self.slope.T.tolist())]
+        self.names = list(names) if names is not None else ["f{}".format(i) for i in range(len(values))]
+
+    def __call__(self, V) -> tuple:
+        """
+        interpolate every tabulated function at V
+
+        :param V: membrane voltage, a scalar or a numpy array
+        :return: tuple of the function values
+        """
+        if isinstance(V, float):
+            x = min(max(V, self.V_min), self.V_max)
+            row = self.rows[int((x - self.V_min) / self.step)]
+            return tuple(a + b * x for a, b in row)
+
+        x = np.clip(V, self.V_min, self.V_max)
+        segments = self.segments.take(((x - self.V_min) / self.step).astype(np.intp), axis=1)
+        k = len(self.values)
+        return tuple(segments[:k] + segments[k:] * x)
+
+    def error(self, samples: int = 100000, seed: int = 0) -> OrderedDict:
+        """
+        error of the table against the analytic functions on random voltages
+        of the tabulated range, with an estimate of the h**2/8 * max|f''| bound
+        of linear interpolation from the second differences of the table, which
+        is not a guaranteed bound since f'' is only sampled on the grid
+
+        :param samples: number of random voltages
+        :param seed: seed of the random voltages
+        :return: dict from output name to dict(max_abs_error, max_rel_error, estimate)
+        """
+        V = np.random.default_rng(seed).uniform(self.V_min, self.V_max, samples)
+        with np.errstate(all='ignore'):
+            exact = np.array(np.broadcast_arrays(*self.function(V)), dtype=float)
+        approx = np.array(np.broadcast_arrays(*self(V)), dtype=float)
+        curvature = np.abs(np.diff(self.values, n=2, axis=1)).max(axis=1) / 8
+
+        report = OrderedDict()
+        for name, f, g, estimate in zip(self.names, exact, approx, curvature):
+            finite = np.isfinite(f)
+            error = np.abs(g[finite] - f[finite])
+            report[name] = OrderedDict(
+                max_abs_error=float(error.max()),
+                max_rel_error=float((error / np.maximum(np.abs(f[finite]), 1e-300)).max()),
+                estimate=float(estimate),
+            )
+        return report
+
+
+def tabulated(model, V_min: float = -100.0, V_max: float = 60.0, step: float = 0.01):
+    """
+    the variant of a neuron model reading its ``analytic_rates`` from a
+    RateTable, a subclass built once per model and resolution, the model
+    itself keeps its analytic rate functions
+
+    :param model: the neuron class
+    :param V_min: lower end of the table in mV
+    :param V_max: upper end of the table in mV
+    :param step: resolution of the table in mV
+    :return: the tabulated subclass, its ``table`` is the RateTable
+    """
+    key = (model, V_min, V_max, step)
+    if key not in TABULATED:
+        table = RateTable(model.analytic_rates, V_min, V_max, step, model.rate_names)
+        TABULATED[key] = type(model.__name__, (model,), dict(table=table, analytic=model, __module__=model.__module__))
+    return TABULATED[key]
@@ -1,3 +1,18 @@
-from .morris_lecar import MorrisLecarNeuron
-from .photo_insensitive import PhotoInsensitiveNeuron
-from .hodgkin_huxley import HodgkinHuxleyNeuron
\ No newline at end of file
+from compbrain.registry import Registry, lazy_exports
+
+# the neuron models of the config files, by name
+registry = Registry('neurons', 'compbrain.neurons', {
+    'MorrisLecar': 'compbrain.neurons.morris_lecar:MorrisLecarNeuron',
+    'PhotoInsensitive': 'compbrain.neurons.photo_insensitive:PhotoInsensitiveNeuron',
+    'HodgkinHuxley': 'compbrain.neurons.hodgkin_huxley:HodgkinHuxleyNeuron',
+    'LIF': 'compbrain.neurons.leaky_integrate_and_fire:LIFNeuron',
+    'IAF': 'compbrain.neurons.integrate_and_fire:IAFNeuron',
+})
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'MorrisLecarNeuron': '.morris_lecar',
+    'PhotoInsensitiveNeuron': '.photo_insensitive',
+    'HodgkinHuxleyNeuron': '.hodgkin_huxley',
+    'LIFNeuron': '.leaky_integrate_and_fire',
+    'IAFNeuron': '.integrate_and_fire',
+})
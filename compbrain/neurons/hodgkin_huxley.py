@@ -1,10 +1,11 @@
 import numpy as np
 from collections import OrderedDict
-from compbrain.core import BaseComponent, CompBrainModelError
+from compbrain.core import BaseNeuron, CompBrainModelError
 
 
-class HodgkinHuxleyNeuron(BaseComponent):
+class HodgkinHuxleyNeuron(BaseNeuron):
     """Hodgkin Huxley Neuron Model"""
+    rate_names = ('alpha_n', 'beta_n', 'alpha_m', 'beta_m', 'alpha_h', 'beta_h')
 
     def __init__(self, name, **kwargs):
         """
@@ -71,44 +72,69 @@ class HodgkinHuxleyNeuron(BaseComponent):
             V=[V_init], n=[n_init], m=[m_init], h=[h_init]
         )
 
-    def compute(self, I_syn: float, I_ext: float, dt:float) -> dict:
+    @staticmethod
+    def analytic_rates(V) -> tuple:
         """
-        Morris-Lecar gradient function
+        opening and closing rates of the n, m and h gates, alpha_n and alpha_m
+        have removable singularities at V=10 and V=25
 
+        :param V: membrane voltage
+        :return: (alpha_n, beta_n, alpha_m, beta_m, alpha_h, beta_h)
+        """
+        alpha_n = 0.01*(10-V)/(np.exp(1-V/10)-1)
+        beta_n = 0.125*np.exp(-V/80)
+        alpha_m = (2.5-0.1*V)/(np.exp(2.5-V/10)-1)
+        beta_m = 4*np.exp(-V/18)
+        alpha_h = 0.07*np.exp(-V/20)
+        beta_h = 1/(1+np.exp(3-V/10))
+        return alpha_n, beta_n, alpha_m, beta_m, alpha_h, beta_h
+
+    @classmethod
+    def gradient(cls, states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        Hodgkin-Huxley gradient function, works on scalars as well as on
+        numpy arrays holding a whole population
+
+        :param states: dict(V, n, m, h)
+        :param params: the parameters of the model
         :param I_syn: the input synapse current
         :param I_ext: the external injection current
-        :param dt: time step
-        :return: dict(V, m, n, h)
+        :return: dict(V, n, m, h) of the derivatives
         """
-        V = self.states['V'][-1]
-        m = self.states['m'][-1]
-        n = self.states['n'][-1]
-        h = self.states['h'][-1]
-
-        dt = dt*1e3
-        offset = self.params['offset']
-        E_L = self.params['E_L']
-        E_Na = self.params['E_Na']
-        E_K = self.params['E_K']
-        g_L = self.params['g_L']
-        g_Na = self.params['g_Na']
-        g_K = self.params['g_K']
-        C = self.params['C']
+        V = states['V']
+        m = states['m']
+        n = states['n']
+        h = states['h']
+
+        offset = params['offset']
+        E_L = params['E_L']
+        E_Na = params['E_Na']
+        E_K = params['E_K']
+        g_L = params['g_L']
+        g_Na = params['g_Na']
+        g_K = params['g_K']
+        C = params['C']
 
         dV = (offset + I_ext - I_syn - g_K*n**4*(V-E_K) - g_Na*m**3*h*(V-E_Na) -
               g_L*(V-E_L))/C
 
-        dn = (0.01*(10-V)/(np.exp(1-V/10)-1))*(1-n) - 0.125*np.exp(-V/80)*n
-        dm = ((2.5-0.1*V)/(np.exp(2.5-V/10)-1))*(1-m) - 4*np.exp(-V/18)*m
-        dh = 0.07*np.exp(-V/20)*(1-h) - h/(1+np.exp(3-V/10))
+        alpha_n, beta_n, alpha_m, beta_m, alpha_h, beta_h = cls.rates(V)
+        dn = alpha_n*(1-n) - beta_n*n
+        dm = alpha_m*(1-m) - beta_m*m
+        dh = alpha_h*(1-h) - beta_h*h
 
-        V1 = V + dV * dt
-        n1 = n + dn * dt
-        m1 = m + dm * dt
-        h1 = h + dh * dt
+        return OrderedDict(V=dV, n=dn, m=dm, h=dh)
 
-        self.states['V'].append(V1)
-        self.states['n'].append(n1)
-        self.states['m'].append(m1)
-        self.states['h'].append(h1)
-        return self.states
+    @classmethod
+    def gating(cls, states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        steady states and time constants of the n, m and h gates
+
+        :return: dict of (x_inf, tau)
+        """
+        alpha_n, beta_n, alpha_m, beta_m, alpha_h, beta_h = cls.rates(states['V'])
+        return OrderedDict(
+            n=(alpha_n/(alpha_n+beta_n), 1/(alpha_n+beta_n)),
+            m=(alpha_m/(alpha_m+beta_m), 1/(alpha_m+beta_m)),
+            h=(alpha_h/(alpha_h+beta_h), 1/(alpha_h+beta_h)),
+        )
@@ -1,9 +1,9 @@
 import numpy as np
 from collections import OrderedDict
-from compbrain.core import BaseComponent, CompBrainModelError
+from compbrain.core import BaseNeuron, CompBrainModelError
 
 
-class IAFNeuron(BaseComponent):
+class IAFNeuron(BaseNeuron):
     """Integrate and Fire Neuron Model"""
 
     def __init__(self, name, **kwargs):
@@ -66,34 +66,67 @@ class IAFNeuron(BaseComponent):
             V=[V_init]
         )
 
-    def compute(self, I_syn: float, I_ext: float, dt:float) -> dict:
+    @staticmethod
+    def gradient(states: dict, params: dict, I_syn, I_ext) -> dict:
         """
-        Integrate and Fire gradient function
+        Integrate and Fire gradient function, works on scalars as well as on
+        numpy arrays holding a whole population
 
+        :param states: dict(V)
+        :param params: the parameters of the model
         :param I_syn: the input synapse current
         :param I_ext: the external injection current
-        :param dt: time step
-        :return: dict(V, N)
+        :return: dict(V) of the derivatives
         """
-        V = self.states['V'][-1]
-
-        dt = dt * 1000
-        V_T = self.params['V_T']
-        V_0 = self.params['V_0']
-        V_imp = self.params['V_imp']
-        C = self.params['C']
+        C = params['C']
 
         dV = I_ext/C
 
-        V1 = V + dV * dt
-        if V1 >= V_T:
-            if V1 >= V_imp:
-                V1 = V_0
-            else:
-                V1 = V_imp
+        return OrderedDict(V=dV)
+
+    @staticmethod
+    def propagate(V, I_ext, h, params: dict):
+        """
+        exact solution of the subthreshold dynamics with a constant input,
+        used by the event-driven mode
+
+        :param V: membrane voltage at the start
+        :param I_ext: the constant external injection current
+        :param h: elapsed time in the time unit of the model
+        :param params: the parameters of the model
+        :return: membrane voltage after h
+        """
+        return V + I_ext / params['C'] * h
+
+    @staticmethod
+    def crossing_time(V, I_ext, params: dict) -> float:
+        """
+        time until the membrane reaches the threshold V_T with a constant input
+
+        :param V: membrane voltage at the start
+        :param I_ext: the constant external injection current
+        :param params: the parameters of the model
+        :return: time in the time unit of the model, inf if it is never reached
+        """
+        V_T = params['V_T']
+        if V >= V_T:
+            return 0.0
+        if I_ext <= 0:
+            return np.inf
+        return (V_T - V) * params['C'] / I_ext
+
+    @staticmethod
+    def reset(states: dict, params: dict) -> dict:
+        """
+        fire once the membrane crosses the threshold V_T: the voltage is set to the
+        spike value V_imp, or reset to V_0 if it is already at V_imp
+        """
+        V_T = params['V_T']
+        V_0 = params['V_0']
+        V_imp = params['V_imp']
 
-        self.states['V'].append(V1)
-        return self.states
+        V = states['V']
+        return OrderedDict(V=np.where(V >= V_T, np.where(V >= V_imp, V_0, V_imp), V))
 
 
 if __name__ == "__main__":
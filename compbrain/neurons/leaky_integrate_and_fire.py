@@ -1,9 +1,9 @@
 import numpy as np
 from collections import OrderedDict
-from compbrain.core import BaseComponent, CompBrainModelError
+from compbrain.core import BaseNeuron, CompBrainModelError
 
 
-class LIFNeuron(BaseComponent):
+class LIFNeuron(BaseNeuron):
     """Leaky Integrate and Fire Neuron Model"""
 
     def __init__(self, name, **kwargs):
@@ -66,35 +66,85 @@ class LIFNeuron(BaseComponent):
             V=[V_init]
         )
 
-    def compute(self, I_syn: float, I_ext: float, dt:float) -> dict:
+    @staticmethod
+    def gradient(states: dict, params: dict, I_syn, I_ext) -> dict:
         """
-        Leaky Integrate and Fire gradient function
+        Leaky Integrate and Fire gradient function, works on scalars as well as on
+        numpy arrays holding a whole population
 
+        :param states: dict(V)
+        :param params: the parameters of the model
         :param I_syn: the input synapse current
         :param I_ext: the external injection current
-        :param dt: time step
-        :return: dict(V, N)
+        :return: dict(V) of the derivatives
         """
-        V = self.states['V'][-1]
-
-        dt = dt * 1000
-        V_T = self.params['V_T']
-        V_0 = self.params['V_0']
-        V_imp = self.params['V_imp']
-        R = self.params['R']
-        C = self.params['C']
+        V = states['V']
+        R = params['R']
+        C = params['C']
 
         dV = (I_ext - V/R)/C
 
-        V1 = V + dV * dt
-        if V1 >= V_T:
-            if V1 >= V_imp:
-                V1 = V_0
-            else:
-                V1 = V_imp
+        return OrderedDict(V=dV)
+
+    @staticmethod
+    def gating(states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        the membrane relaxes linearly towards R * I_ext with time constant R * C,
+        so the exponential Euler scheme is exact for a constant input
+
+        :return: dict of (x_inf, tau)
+        """
+        return OrderedDict(V=(I_ext * params['R'], params['R'] * params['C']))
+
+    @staticmethod
+    def propagate(V, I_ext, h, params: dict):
+        """
+        exact solution of the subthreshold dynamics with a constant input,
+        used by the event-driven mode
+
+        :param V: membrane voltage at the start
+        :param I_ext: the constant external injection current
+        :param h: elapsed time in the time unit of the model
+        :param params: the parameters of the model
+        :return: membrane voltage after h
+        """
+        R = params['R']
+        C = params['C']
+        V_inf = I_ext * R
+        return V_inf + (V - V_inf) * np.exp(-h / (R * C))
+
+    @staticmethod
+    def crossing_time(V, I_ext, params: dict) -> float:
+        """
+        time until the membrane reaches the threshold V_T with a constant input
+
+        :param V: membrane voltage at the start
+        :param I_ext: the constant external injection current
+        :param params: the parameters of the model
+        :return: time in the time unit of the model, inf if it is never reached
+        """
+        R = params['R']
+        C = params['C']
+        V_T = params['V_T']
+        V_inf = I_ext * R
+        if V >= V_T:
+            return 0.0
+        if V_inf <= V_T:
+            return np.inf
+        return R * C * np.log((V_inf - V) / (V_inf - V_T))
+
+    @staticmethod
+    def reset(states: dict, params: dict) -> dict:
+        """
+        fire once the membrane crosses the threshold V_T: the voltage is set to the
+        spike value V_imp, or reset to V_0 if it is already at V_imp
+        """
+        V_T = params['V_T']
+        V_0 = params['V_0']
+        V_imp = params['V_imp']
 
-        self.states['V'].append(V1)
-        return self.states
+        V = states['V']
+        return OrderedDict(V=np.where(V >= V_T, np.where(V >= V_imp, V_0, V_imp), V))
 
 
 if __name__ == "__main__":
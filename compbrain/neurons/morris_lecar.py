@@ -1,9 +1,9 @@
 import numpy as np
 from collections import OrderedDict
-from compbrain.core import BaseComponent, CompBrainModelError
+from compbrain.core import BaseNeuron, CompBrainModelError
 
 
-class MorrisLecarNeuron(BaseComponent):
+class MorrisLecarNeuron(BaseNeuron):
     """Morris Lecar Neuron Model"""
 
     def __init__(self, name, **kwargs):
@@ -69,45 +69,61 @@ class MorrisLecarNeuron(BaseComponent):
             V=[V_init], N=[N_init]
         )
 
-    def compute(self, I_syn: float, I_ext: float, dt:float) -> dict:
+    @staticmethod
+    def clamp(states: dict, params: dict) -> dict:
         """
-        Morris-Lecar gradient function
+        keep the potassium activation N within [0, 1]
+        """
+        N = states['N']
+        return OrderedDict(V=states['V'], N=np.where(N < 1e-7, 0, np.minimum(N, 1)))
+
+    @staticmethod
+    def gradient(states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        Morris-Lecar gradient function, works on scalars as well as on
+        numpy arrays holding a whole population
 
+        :param states: dict(V, N)
+        :param params: the parameters of the model
         :param I_syn: the input synapse current
         :param I_ext: the external injection current
-        :param dt: time step
-        :return: dict(V, N)
+        :return: dict(V, N) of the derivatives
         """
-        V = self.states['V'][-1]
-        N = self.states['N'][-1]
-        if N < 1e-7:
-            N = 0
-        elif N > 1:
-            N = 1
-
-        dt = dt*1e3
-        V_1 = self.params['V_1']
-        V_2 = self.params['V_2']
-        V_3 = self.params['V_3']
-        V_4 = self.params['V_4']
-        phi = self.params['phi']
-        offset = self.params['offset']
-        E_L = self.params['E_L']
-        E_Ca = self.params['E_Ca']
-        E_K = self.params['E_K']
-
-        g_L = self.params['g_L']
-        g_Ca = self.params['g_Ca']
-        g_K = self.params['g_K']
-        C = self.params['C']
+        V = states['V']
+        N = states['N']
+
+        V_1 = params['V_1']
+        V_2 = params['V_2']
+        V_3 = params['V_3']
+        V_4 = params['V_4']
+        phi = params['phi']
+        offset = params['offset']
+        E_L = params['E_L']
+        E_Ca = params['E_Ca']
+        E_K = params['E_K']
+
+        g_L = params['g_L']
+        g_Ca = params['g_Ca']
+        g_K = params['g_K']
+        C = params['C']
 
         dV = (I_ext + offset - I_syn - g_L * (V - E_L) - 0.5 * g_Ca * (1 + np.tanh((V - V_1) / V_2)) * (V - E_Ca) - g_K * N * (
                     V - E_K)) / C
         dN = (0.5 * (1 + np.tanh((V - V_3) / V_4)) - N) * (phi * np.cosh((V - V_3) / (2 * V_4)))
 
-        V1 = V + dV * dt
-        N1 = N + dN * dt
+        return OrderedDict(V=dV, N=dN)
 
-        self.states['V'].append(V1)
-        self.states['N'].append(N1)
-        return self.states
+    @staticmethod
+    def gating(states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        steady state and time constant of the potassium activation N
+
+        :return: dict of (x_inf, tau)
+        """
+        V = states['V']
+        V_3 = params['V_3']
+        V_4 = params['V_4']
+        phi = params['phi']
+        return OrderedDict(
+            N=(0.5 * (1 + np.tanh((V - V_3) / V_4)), 1 / (phi * np.cosh((V - V_3) / (2 * V_4)))),
+        )
@@ -1,13 +1,14 @@
 import numpy as np
 from collections import OrderedDict
-from compbrain.core import BaseComponent, CompBrainModelError
+from compbrain.core import BaseNeuron, CompBrainModelError
 
 
-class PhotoInsensitiveNeuron(BaseComponent):
+class PhotoInsensitiveNeuron(BaseNeuron):
     """
     The Photo-Insensitive Cell Membrane Model
     'http://neurokernel.github.io/rfc/nk-rfc3.pdf'
     """
+    rate_names = ('Y2_inf', 'tau2', 'Y3_inf', 'tau3', 'Y4_inf', 'tau4', 'Y5_inf', 'Y6_inf', 'tau6')
 
     def __init__(self, name, **kwargs):
         """
@@ -81,60 +82,78 @@ class PhotoInsensitiveNeuron(BaseComponent):
             Y4=[Y4_init], Y5=[Y5_init], Y6=[Y6_init]
         )
 
-    def compute(self, I_syn: float, I_ext: float, dt:float) -> dict:
+    @classmethod
+    def gating(cls, states: dict, params: dict, I_syn, I_ext) -> dict:
         """
-        Photo Insensitive gradient function
+        steady states and time constants of the Y2 to Y6 gates
 
-        :param I_syn: the input synapse current
-        :param I_ext: the external injection current
-        :param dt: time step
-        :return: dict(V, Y2, Y3, Y4, Y5, Y6)
-        """
-        V = self.states['V'][-1]
-        Y2 = self.states['Y2'][-1]
-        Y3 = self.states['Y3'][-1]
-        Y4 = self.states['Y4'][-1]
-        Y5 = self.states['Y5'][-1]
-        Y6 = self.states['Y6'][-1]
-
-        dt = dt*1e3
-        E_Cl = self.params['E_Cl']
-        E_K = self.params['E_K']
-
-        g_L = self.params['g_L']
-        g_A= self.params['g_A']
-        g_K = self.params['g_K']
-        g_dr = self.params['g_dr']
-        g_nov = self.params['g_nov']
-        C = self.params['C']
+        :return: dict of (x_inf, tau)
+        """
+        Y2_inf, tau2, Y3_inf, tau3, Y4_inf, tau4, Y5_inf, Y6_inf, tau6 = cls.rates(states['V'])
+        tau5 = 890
 
-        dV = (I_ext-g_K*(V-E_K)-g_L*(V-E_Cl)-g_A*Y2**3*Y3*(V-E_K)-
-              g_dr*Y4**2*Y3*(V-E_K)-g_nov*Y6*(V-E_K))/C
+        return OrderedDict(
+            Y2=(Y2_inf, tau2),
+            Y3=(Y3_inf, tau3),
+            Y4=(Y4_inf, tau4),
+            Y5=(Y5_inf, tau5),
+            Y6=(Y6_inf, tau6),
+        )
+
+    @staticmethod
+    def analytic_rates(V) -> tuple:
+        """
+        steady states and time constants of the gates as functions of the voltage
 
+        :param V: membrane voltage
+        :return: (Y2_inf, tau2, Y3_inf, tau3, Y4_inf, tau4, Y5_inf, Y6_inf, tau6)
+        """
         tau2 = 0.13 + 3.39*np.exp(-((-73-V)/20)**2)
         tau3 = 113*np.exp(-((-71-V)/29)**2)
         tau4 = 0.5 + (5.75*np.exp(-((-25-V)/32)**2))
-        tau5 = 890
         tau6 = 3 + 106*np.exp(-((-20-V)/22)**2)
 
-        dY2 = ((1/(1+np.exp((-23.7-V)/12.8)))**(1/3)-Y2)/tau2
-        dY3 = (((0.9/(1+np.exp((-55-V)/-3.9)))+(0.1/(1+np.exp((-74.8-V)/-10.7))))-Y3)/tau3
-        dY4 = ((1/(1+np.exp((-1-V)/9.1)))**(1/2)-Y4)/tau4
-        dY5 = (1/(1+np.exp((-25.7-V)/-6.4))-Y5)/tau5
-        dY6 = (1/(1+np.exp((-12-V)/11))-Y6)/tau6
-
-        V1 = V + dV * dt
-        Y21 = Y2 + dY2 * dt
-        Y31 = Y3 + dY3 * dt
-        Y41 = Y4 + dY4 * dt
-        Y51 = Y5 + dY5 * dt
-        Y61 = Y6 + dY6 * dt
-
-        self.states['V'].append(V1)
-        self.states['Y2'].append(Y21)
-        self.states['Y3'].append(Y31)
-        self.states['Y4'].append(Y41)
-        self.states['Y5'].append(Y51)
-        self.states['Y6'].append(Y61)
-
-        return self.states
+        Y2_inf = (1/(1+np.exp((-23.7-V)/12.8)))**(1/3)
+        Y3_inf = (0.9/(1+np.exp((-55-V)/-3.9)))+(0.1/(1+np.exp((-74.8-V)/-10.7)))
+        Y4_inf = (1/(1+np.exp((-1-V)/9.1)))**(1/2)
+        Y5_inf = 1/(1+np.exp((-25.7-V)/-6.4))
+        Y6_inf = 1/(1+np.exp((-12-V)/11))
+
+        return Y2_inf, tau2, Y3_inf, tau3, Y4_inf, tau4, Y5_inf, Y6_inf, tau6
+
+    @classmethod
+    def gradient(cls, states: dict, params: dict, I_syn, I_ext) -> dict:
+        """
+        Photo Insensitive gradient function, works on scalars as well as on
+        numpy arrays holding a whole population
+
+        :param states: dict(V, Y2, Y3, Y4, Y5, Y6)
+        :param params: the parameters of the model
+        :param I_syn: the input synapse current
+        :param I_ext: the external injection current
+        :return: dict(V, Y2, Y3, Y4, Y5, Y6) of the derivatives
+        """
+        V = states['V']
+        Y2 = states['Y2']
+        Y3 = states['Y3']
+        Y4 = states['Y4']
+        Y6 = states['Y6']
+
+        E_Cl = params['E_Cl']
+        E_K = params['E_K']
+
+        g_L = params['g_L']
+        g_A= params['g_A']
+        g_K = params['g_K']
+        g_dr = params['g_dr']
+        g_nov = params['g_nov']
+        C = params['C']
+
+        dV = (I_ext-g_K*(V-E_K)-g_L*(V-E_Cl)-g_A*Y2**3*Y3*(V-E_K)-
+              g_dr*Y4**2*Y3*(V-E_K)-g_nov*Y6*(V-E_K))/C
+
+        derivatives = OrderedDict(V=dV)
+        for key, (Y_inf, tau) in cls.gating(states, params, I_syn, I_ext).items():
+            derivatives[key] = (Y_inf-states[key])/tau
+
+        return derivatives
@@ -0,0 +1,112 @@
+"""Models and package attributes resolved by name on first use"""
+import importlib
+
+
+def lazy_exports(package: str, exports: dict, modules: tuple = ()) -> tuple:
+    """
+    the module ``__getattr__`` and ``__dir__`` of a package whose attributes
+    are only imported when first accessed
+
+    :param package: the name of the package
+    :param exports: dict from attribute name to the module defining it, relative to the package
+    :param modules: names of the subpackages exported themselves
+    :return: (__getattr__, __dir__)
+    """
+    exports = dict(exports, **{name: '.' + name for name in modules})
+
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(exports[name], package)
+        value = module if name in modules else getattr(module, name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))).union(exports))
+
+    return __getattr__, __dir__
+
+
+class Registry:
+    """
+    The models of one kind resolved by name, the built-in models are given
+    as "module:Class" strings imported on first use, other packages add
+    theirs with ``register`` or through an entry point of ``group`` in their
+    package metadata, e.g. in setup.py
+
+        entry_points={'compbrain.neurons': ['Izhikevich = mypackage.izhikevich:IzhikevichNeuron']}
+
+    the entry points are only scanned when a name is not found otherwise
+
+    :argument
+        kind: 'neurons' or 'synapses', used in the error messages
+        group: the entry point group of the plugin models
+        models: dict from the model name to "module:Class"
+    """
+    def __init__(self, kind: str, group: str, models: dict):
+        self.kind = kind
+        self.group = group
+        self.models = dict(models)
+        self.scanned = False
+
+    def register(self, name: str, model=None):
+        """
+        add a model, also usable as a class decorator
+
+        :param name: the model name used in the config files
+        :param model: the class, or "module:Class" imported on first use
+        :return: the model
+        """
+        if model is None:
+            return lambda cls: self.register(name, cls)
+        self.models[name] = model
+        return model
+
+    def scan(self):
+        """
+        add the models declared through entry points, once
+        """
+        if self.scanned:
+            return
+        self.scanned = True
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+        found = entry_points()
+        found = found.select(group=self.group) if hasattr(found, 'select') else found.get(self.group, [])
+        for entry in found:
+            self.models.setdefault(entry.name, entry.value)
+
+    def get(self, name: str):
+        """
+        the model class registered under a name
+
+        :param name: the model name
+        :return: the class
+        """
+        if name not in self.models:
+            self.scan()
+        if name not in self.models:
+            from compbrain.core import CompBrainModelError
+            raise CompBrainModelError("no {} {} implemented".format(name, self.kind))
+
+        model = self.models[name]
+        if isinstance(model, str):
+            module, _, attribute = model.partition(':')
+            model = getattr(importlib.import_module(module), attribute)
+            self.models[name] = model
+        return model
+
+    def __contains__(self, name: str) -> bool:
+        if name not in self.models:
+            self.scan()
+        return name in self.models
+
+    def names(self) -> list:
+        """
+        the names of every model, including the plugins
+        """
+        self.scan()
+        return list(self.models)
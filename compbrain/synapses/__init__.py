@@ -1,2 +1,23 @@
-from .custom_synapse import CustomSynapse
-from .inject_current import InjectCurrent
\ No newline at end of file
+from compbrain.registry import Registry, lazy_exports
+
+# the synapse models of the config files, by name
+registry = Registry('synapses', 'compbrain.synapses', {
+    'CustomSynapse': 'compbrain.synapses.custom_synapse:CustomSynapse',
+    'InjectCurrent': 'compbrain.synapses.inject_current:InjectCurrent',
+    'Projection': 'compbrain.synapses.projection:Projection',
+})
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'CustomSynapse': '.custom_synapse',
+    'InjectCurrent': '.inject_current',
+    'Projection': '.projection',
+    'Stimulus': '.stimulus',
+    'StimulusBuffer': '.stimulus',
+    'Step': '.stimulus',
+    'PulseTrain': '.stimulus',
+    'Ramp': '.stimulus',
+    'Sinusoid': '.stimulus',
+    'PiecewiseConstant': '.stimulus',
+    'MappedInput': '.mapped_input',
+    'InputChannel': '.mapped_input',
+})
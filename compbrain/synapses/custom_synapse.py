@@ -15,17 +15,24 @@ class CustomSynapse(BaseComponent):
         postsynaptic: the name of the postsynaptic neuron, doesn't need to be instantiated
         kwargs: keyword arguments that overwrite initial conditions of state
             variables and values of parameters
+
+            :delay
+                transmission delay in seconds, the synapse sees the presynaptic
+                voltage of that long ago, rounded to whole time steps. Note that
+                t_delay is a gain on the presynaptic voltage, not a delay
     """
+    output = 'I_syn'
 
     def __init__(self, name: str, presynaptic: str, postsynaptic: str, **kwargs):
         super(CustomSynapse, self).__init__(name, **kwargs)
 
-        self.params: OrderedDict = OrderedDict(g_sat=0.05, k=0.05, n=1, t_delay=1, V_th=-50.5, V_rev=-70, scale=2, )
+        self.params: OrderedDict = OrderedDict(g_sat=0.05, k=0.05, n=1, t_delay=1, V_th=-50.5, V_rev=-70, scale=2,
+                                            delay=0, )
         self.states: OrderedDict = OrderedDict(I_ext=[], I_syn=[])
         self.presynaptic = presynaptic
         self.postsynaptic = postsynaptic
 
-        if ('params' in kwargs.keys()) & (not kwargs['params'] is None):
+        if ('params' in kwargs.keys()) and (not kwargs['params'] is None):
             for key, val in kwargs['params'].items():
                 if key in self.params:
                     self.params[key] = val
@@ -59,25 +66,60 @@ class CustomSynapse(BaseComponent):
         """
         self.states = OrderedDict(I_ext=[], I_syn=[])
 
+    @staticmethod
+    def conductance(V_pre, params: dict):
+        """
+        custom synapse conductance, works on scalars as well as on numpy arrays
+
+        :param V_pre: presynaptic neuron voltage
+        :param params: the parameters of the synapse
+        :return: g
+        """
+        g_sat = params['g_sat']
+        k = params['k']
+        n = params['n']
+        t_delay = params['t_delay']
+        V_th = params['V_th']
+        return np.minimum(g_sat, k * np.maximum((V_pre * t_delay - V_th) ** n, 0))
+
+    @staticmethod
+    def active(V_pre, params: dict):
+        """
+        whether the conductance can be nonzero, a synapse whose presynaptic
+        voltage is below threshold outputs exactly zero and can be skipped
+
+        :param V_pre: presynaptic neuron voltage
+        :param params: the parameters of the synapse
+        :return: bool or bool array
+        """
+        x = V_pre * params['t_delay'] - params['V_th']
+        return (x > 0) | ((np.mod(params['n'], 2) == 0) & (x != 0))
+
+    @staticmethod
+    def update(V_pre, V_post, params: dict):
+        """
+        custom synapse current, works on scalars as well as on numpy arrays
+        holding a whole group of synapses
+
+        :param V_pre: presynaptic neuron voltage
+        :param V_post: post synaptic neuron voltage
+        :param params: the parameters of the synapse
+        :return: I_syn
+        """
+        V_rev = params['V_rev']
+        scale = params['scale']
+        g = CustomSynapse.conductance(V_pre, params)
+        return scale * g * (V_post - V_rev)
+
     def compute(self, V_pre: float, V_post: float) -> dict:
         """
         custom synapse function
 
         :param V_pre: presynaptic neuron voltage
         :param V_post: post synaptic neuron voltage
-        :return: dict(V, N)
+        :return: dict(I_ext, I_syn)
         """
-        g_sat = self.params['g_sat']
-        k = self.params['k']
-        n = self.params['n']
-        t_delay = self.params['t_delay']
-        V_th = self.params['V_th']
-        V_rev = self.params['V_rev']
-        scale = self.params['scale']
-        g = np.minimum(g_sat, k * np.maximum((V_pre * t_delay - V_th) ** n, 0))
-        I_syn = scale * g * (V_post - V_rev)
-
-        self.states['I_syn'].append(I_syn)
+        self.states['I_syn'].append(self.update(V_pre, V_post, self.params))
 
         return self.states
 
@@ -2,6 +2,7 @@ from compbrain.core.node import BaseComponent
 import numpy as np
 from collections import OrderedDict
 from compbrain.core import CompBrainModelError
+from compbrain.core.population import InjectionGroup
 
 
 class InjectCurrent(BaseComponent):
@@ -19,25 +20,32 @@ class InjectCurrent(BaseComponent):
 
             :current
                 a time series containing the current array
+            :stimulus
+                a Stimulus waveform (Step, PulseTrain, Ramp, Sinusoid, PiecewiseConstant)
+                evaluated on demand on t, the injections of the same stimulus share
+                one buffer instead of each storing a current array
             :type
                 input current type, needed is no current defined here. The class will generate an
                 input current for the model
     """
+    output = 'I_ext'
+    group = InjectionGroup
 
     def __init__(self, name, presynaptic, postsynaptic, **kwargs):
         super(InjectCurrent, self).__init__(name, **kwargs)
 
-        if 'current' in kwargs.keys():
-            self.current = kwargs['current']
-        else:
-            self.current = []
-
         if 't' in kwargs.keys():
             self.t = kwargs['t']
         else:
             self.t = np.arange(0, 1, 1e-4)
 
-        if 'type' in kwargs.keys():
+        if 'stimulus' in kwargs.keys():
+            self.current = kwargs['stimulus'].buffer(self.t)
+
+        elif 'current' in kwargs.keys():
+            self.current = kwargs['current']
+
+        elif 'type' in kwargs.keys():
             if kwargs['type'] == 'step':
                 if 'intensity' in kwargs.keys():
                     self.current = np.zeros_like(self.t)
@@ -0,0 +1,147 @@
+import numpy as np
+from compbrain.core import CompBrainModelError
+from .stimulus import Stimulus, ChannelBuffer
+from .inject_current import InjectCurrent
+
+
+class MappedInput(Stimulus):
+    """
+    A multichannel input current read from a (time, channel) matrix in a
+    memory-mapped file, only the samples around the simulated steps are paged
+    in, chunk by chunk as the simulation advances, and resampled onto the
+    time step of the circuit
+
+    the current of channel i is fed to a neuron by an InjectCurrent with
+    ``stimulus=input.channel(i)``, or by the injections built by ``inject``,
+    the channels read on the same time vector share one buffer. Before the
+    first sample and after the last one the current is zero
+
+    :argument
+        path: a .npy file, or a raw binary file of rows of ``channels`` samples
+        rate: the sample rate of the file in Hz
+        channels: number of channels of a raw binary file
+        dtype: dtype of a raw binary file
+        t0: time of the first sample in seconds
+        scale: factor applied to the samples
+        interpolation: 'linear' between the samples, or 'hold' the last sample
+    """
+    interpolations = ('linear', 'hold')
+
+    def __init__(self, path: str, rate: float, channels: int = None, dtype=np.float32, t0: float = 0.0,
+                 scale: float = 1.0, interpolation: str = 'linear'):
+        if interpolation not in self.interpolations:
+            raise CompBrainModelError("no {} interpolation implemented".format(interpolation))
+
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.dtype = dtype
+        self.t0 = t0
+        self.scale = scale
+        self.interpolation = interpolation
+        self.open()
+
+    def open(self):
+        """
+        map the file, nothing is read until the samples are needed
+        """
+        if self.path.endswith('.npy'):
+            self.data = np.load(self.path, mmap_mode='r')
+        else:
+            if self.channels is None:
+                raise CompBrainModelError("the number of channels of a raw file is needed")
+            self.data = np.memmap(self.path, dtype=self.dtype, mode='r').reshape(-1, self.channels)
+        if self.data.ndim == 1:
+            self.data = self.data.reshape(-1, 1)
+        self.channels = self.data.shape[1]
+
+    def __getstate__(self):
+        state = super(MappedInput, self).__getstate__()
+        state.pop('data', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.open()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __call__(self, t) -> np.ndarray:
+        """
+        resample every channel at the times t
+
+        :param t: numpy array of times in seconds
+        :return: (len(t), channels) numpy array of the current
+        """
+        t = np.asarray(t, dtype=float)
+        position = (t - self.t0) * self.rate
+        if self.interpolation == 'hold':
+            position = np.floor(position)
+        inside = (position >= 0) & (position <= len(self.data) - 1)
+        values = np.zeros((len(t), self.channels))
+        if not inside.any():
+            return values
+
+        position = position[inside]
+        first = int(position.min())
+        last = min(int(position.max()) + 2, len(self.data))
+        # one contiguous read of the rows spanned by the times
+        block = np.asarray(self.data[first:last], dtype=float)
+        index = position.astype(int) - first
+        frac = (position - np.floor(position))[:, np.newaxis]
+        upper = np.minimum(index + 1, len(block) - 1)
+        values[inside] = (block[index] * (1 - frac) + block[upper] * frac) * self.scale
+        return values
+
+    def channel(self, i: int) -> 'InputChannel':
+        """
+        the stimulus of one channel
+
+        :param i: index of the channel
+        :return: InputChannel
+        """
+        if not 0 <= i < self.channels:
+            raise CompBrainModelError(f"no channel {i} in {self.path}")
+        return InputChannel(self, i)
+
+    def inject(self, t: np.ndarray, targets: list, channels=None, names=None) -> list:
+        """
+        build the injections feeding the channels to the target neurons
+
+        :param t: a time numpy array
+        :param targets: names of the target neurons
+        :param channels: the channel fed to each target, channel i to target i by default
+        :param names: names of the injections, "input-target" by default
+        :return: list of InjectCurrent
+        """
+        channels = range(len(targets)) if channels is None else channels
+        names = ["input-{}".format(target) for target in targets] if names is None else names
+        return [InjectCurrent(name, 'None', target, t=t, stimulus=self.channel(i))
+                for name, target, i in zip(names, targets, channels)]
+
+
+class InputChannel(Stimulus):
+    """
+    One channel of a MappedInput
+
+    :argument
+        source: the MappedInput
+        column: the channel
+    """
+    def __init__(self, source: MappedInput, column: int):
+        self.source = source
+        self.column = column
+
+    def __call__(self, t) -> np.ndarray:
+        return self.source(t)[:, self.column]
+
+    def buffer(self, t: np.ndarray, chunk: int = 4096) -> ChannelBuffer:
+        """
+        the channel of the buffer shared by all the channels of the input
+
+        :param t: a uniformly sampled time numpy array
+        :param chunk: number of steps read at once
+        :return: ChannelBuffer
+        """
+        return ChannelBuffer(self.source.buffer(t, chunk), self.column)
@@ -0,0 +1,124 @@
+import numpy as np
+from compbrain.core import CompBrainModelError
+from compbrain.core.population import ProjectionGroup
+from .custom_synapse import CustomSynapse
+
+
+def to_csr(weights, shape: tuple) -> tuple:
+    """
+    convert a weight matrix into its CSR arrays
+
+    :param weights: None for all-to-all unit weights, a scipy sparse matrix,
+        a (data, indices, indptr) tuple or a dense (n_post, n_pre) array
+    :param shape: (n_post, n_pre)
+    :return: (data, indices, indptr)
+    """
+    n_post, n_pre = shape
+    if weights is None:
+        data = np.ones(n_post * n_pre)
+        indices = np.tile(np.arange(n_pre), n_post)
+        indptr = np.arange(0, n_post * n_pre + 1, n_pre) if n_pre > 0 else np.zeros(n_post + 1, dtype=int)
+    elif hasattr(weights, 'tocsr'):
+        if tuple(weights.shape) != tuple(shape):
+            raise CompBrainModelError(f"weights of shape {weights.shape} don't match {shape}")
+        weights = weights.tocsr()
+        data, indices, indptr = weights.data, weights.indices, weights.indptr
+    elif isinstance(weights, tuple):
+        data, indices, indptr = weights
+    else:
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != tuple(shape):
+            raise CompBrainModelError(f"weights of shape {weights.shape} don't match {shape}")
+        rows, indices = np.nonzero(weights)
+        data = weights[rows, indices]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_post))])
+
+    data = np.asarray(data, dtype=float)
+    indices = np.asarray(indices, dtype=int)
+    indptr = np.asarray(indptr, dtype=int)
+    if len(indptr) != n_post + 1 or len(indices) != len(data) or indptr[-1] != len(data):
+        raise CompBrainModelError("inconsistent CSR weight arrays")
+    if len(indices) > 0 and (indices.min() < 0 or indices.max() >= n_pre):
+        raise CompBrainModelError("CSR column index out of range")
+
+    return data, indices, indptr
+
+
+class Projection(CustomSynapse):
+    """
+    A sparse many-to-many projection of custom synapses from a source
+    population onto a target population
+
+    the conductance of every source neuron is computed once per step and
+    aggregated onto the target neurons through a sparse (CSR) weight matrix,
+    the synapse current of target i is
+
+        I_syn[i] = scale * sum_j W[i, j] * g(V_pre[j]) * (V_post[i] - V_rev)
+
+    which is the sum of the currents of CustomSynapses with the same params
+    scaled by the weights, so the neurons consume it as their I_syn.
+    Projections run on the population engine only
+
+    :argument
+        name: the name of the projection, notice that in a circuit all the
+            synapse's names should be different
+        presynaptic: list of the names of the source neurons
+        postsynaptic: list of the names of the target neurons
+        weights: (n_post, n_pre) weight matrix, None for all-to-all unit weights,
+            a scipy sparse matrix, a (data, indices, indptr) CSR tuple or a dense array
+        kwargs: keyword arguments that overwrite values of parameters, see CustomSynapse
+    """
+    group = ProjectionGroup
+    row_params = ('V_rev', 'scale')
+    population_only = True
+
+    def __init__(self, name: str, presynaptic: list, postsynaptic: list, weights=None, **kwargs):
+        super(Projection, self).__init__(name, list(presynaptic), list(postsynaptic), **kwargs)
+        self.shape = (len(self.postsynaptic), len(self.presynaptic))
+        self.data, self.indices, self.indptr = to_csr(weights, self.shape)
+
+    @classmethod
+    def from_edges(cls, name: str, presynaptic: list, postsynaptic: list, pre, post, weights=None, **kwargs):
+        """
+        build a projection from an edge list
+
+        :param name: the name of the projection
+        :param presynaptic: list of the names of the source neurons
+        :param postsynaptic: list of the names of the target neurons
+        :param pre: index of the source neuron of each edge in presynaptic
+        :param post: index of the target neuron of each edge in postsynaptic
+        :param weights: weight of each edge, 1 by default
+        :return: Projection
+        """
+        pre = np.asarray(pre, dtype=int)
+        post = np.asarray(post, dtype=int)
+        data = np.ones(len(pre)) if weights is None else np.broadcast_to(np.asarray(weights, dtype=float), pre.shape)
+
+        order = np.argsort(post, kind='stable')
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(post, minlength=len(postsynaptic)))])
+        return cls(name, presynaptic, postsynaptic, weights=(data[order], pre[order], indptr), **kwargs)
+
+    @staticmethod
+    def current(G, V_post, params: dict):
+        """
+        synapse current of the target neurons from their aggregated conductance
+
+        :param G: weighted sum of the conductances onto each target neuron
+        :param V_post: target neuron voltages
+        :param params: the row parameters (V_rev, scale)
+        :return: I_syn
+        """
+        return params['scale'] * G * (V_post - params['V_rev'])
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def get_V_pre(self):
+        raise CompBrainModelError("Projection runs on the population engine only")
+
+    def get_V_post(self):
+        raise CompBrainModelError("Projection runs on the population engine only")
+
+    def compute(self, V_pre, V_post):
+        raise CompBrainModelError("Projection runs on the population engine only")
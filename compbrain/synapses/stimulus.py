@@ -0,0 +1,274 @@
+"""Parametric stimulus waveforms evaluated on demand"""
+import abc
+import numpy as np
+from compbrain.core import CompBrainModelError
+
+
+class StimulusBuffer:
+    """
+    The current of a stimulus sampled on a time vector, evaluated chunk by
+    chunk as it is read instead of being stored for the whole time vector
+
+    it is indexed like the ``current`` array of an InjectCurrent, and the
+    injections reading the same stimulus on the same time vector share one
+    buffer, so the memory used per injection does not depend on len(t)
+
+    :argument
+        stimulus: the stimulus waveform
+        t0: the first time in seconds
+        dt: the time step in seconds
+        length: number of time steps
+        chunk: number of values evaluated at once
+    """
+    def __init__(self, stimulus, t0: float, dt: float, length: int, chunk: int = 4096):
+        self.stimulus = stimulus
+        self.t0 = t0
+        self.dt = dt
+        self.length = length
+        self.chunk = chunk
+        self.start = 0
+        self.values = np.empty(0)
+
+    def times(self, index) -> np.ndarray:
+        """
+        the times of the given steps
+
+        :param index: int or numpy array of step indices
+        :return: the times in seconds
+        """
+        return self.t0 + np.asarray(index) * self.dt
+
+    def take(self, index, columns=None) -> np.ndarray:
+        """
+        the current at many steps at once
+
+        :param index: numpy array of step indices
+        :param columns: the channel read at each step, for a multichannel stimulus
+        :return: numpy array of the current
+        """
+        index = np.asarray(index)
+        if len(index) == 0:
+            return np.zeros(0)
+        low, high = index.min(), index.max()
+        if not (self.start <= low and high < self.start + len(self.values)):
+            if high - low >= self.chunk:
+                values = np.asarray(self.stimulus(self.times(index)), dtype=float)
+                return values if columns is None else values[np.arange(len(index)), columns]
+            self.fill(low)
+        if columns is None:
+            return self.values[index - self.start]
+        return self.values[index - self.start, columns]
+
+    def fill(self, start: int):
+        """
+        evaluate the chunk of the current starting at a step
+        """
+        self.start = int(start)
+        stop = min(self.start + self.chunk, self.length)
+        self.values = np.asarray(self.stimulus(self.times(np.arange(self.start, stop))), dtype=float)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            index = item + self.length if item < 0 else item
+            if not 0 <= index < self.length:
+                raise IndexError("StimulusBuffer index out of range")
+            if not self.start <= index < self.start + len(self.values):
+                self.fill(index)
+            return self.values[index - self.start]
+        if isinstance(item, slice):
+            return self.stimulus(self.times(np.arange(*item.indices(self.length))))
+        return self.take(item)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+
+
+class ChannelBuffer:
+    """
+    One channel of the buffer of a multichannel stimulus, indexed like the
+    ``current`` array of an InjectCurrent
+
+    :argument
+        source: the StimulusBuffer of the multichannel stimulus
+        column: the channel
+    """
+    def __init__(self, source: StimulusBuffer, column: int):
+        self.source = source
+        self.column = column
+
+    def take(self, index) -> np.ndarray:
+        return self.source.take(index, self.column)
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self.source[item][self.column]
+        if isinstance(item, slice):
+            return self.source[item][:, self.column]
+        return self.take(item)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+
+
+class Stimulus(abc.ABC):
+    """
+    Base class of the stimulus waveforms, a function of time in seconds
+    returning the injected current, evaluated on numpy arrays of times
+    """
+    @abc.abstractmethod
+    def __call__(self, t) -> np.ndarray:
+        """
+        the current at the times t
+
+        :param t: numpy array of times in seconds
+        :return: numpy array of the current
+        """
+
+    def buffer(self, t: np.ndarray, chunk: int = 4096) -> StimulusBuffer:
+        """
+        the buffer sampling the stimulus on a time vector, one buffer is shared
+        by all the injections of the stimulus on the same time vector
+
+        :param t: a uniformly sampled time numpy array
+        :param chunk: number of values evaluated at once
+        :return: StimulusBuffer
+        """
+        t = np.asarray(t, dtype=float)
+        key = (float(t[0]), float(t[1] - t[0]) if len(t) > 1 else 0.0, len(t))
+        buffers = self.__dict__.setdefault('buffers', {})
+        if key not in buffers:
+            buffers[key] = StimulusBuffer(self, *key, chunk=chunk)
+        return buffers[key]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('buffers', None)
+        return state
+
+
+def window(t, start: float, stop: float) -> np.ndarray:
+    """
+    mask of the times in [start, stop)
+    """
+    return (t >= start) & (t < stop)
+
+
+class Step(Stimulus):
+    """
+    A constant current during [start, stop)
+
+    :argument
+        amplitude: the current
+        start: onset in seconds
+        stop: offset in seconds
+    """
+    def __init__(self, amplitude: float, start: float = 0.0, stop: float = np.inf):
+        self.amplitude = amplitude
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        return np.where(window(t, self.start, self.stop), self.amplitude, 0.0)
+
+
+class PulseTrain(Stimulus):
+    """
+    Rectangular pulses of a given width repeated every period during [start, stop)
+
+    :argument
+        amplitude: the current during a pulse
+        period: time between the onsets of two pulses in seconds
+        width: duration of a pulse in seconds
+        start: onset of the first pulse in seconds
+        stop: end of the train in seconds
+    """
+    def __init__(self, amplitude: float, period: float, width: float, start: float = 0.0, stop: float = np.inf):
+        self.amplitude = amplitude
+        self.period = period
+        self.width = width
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        on = window(t, self.start, self.stop) & (np.mod(t - self.start, self.period) < self.width)
+        return np.where(on, self.amplitude, 0.0)
+
+
+class Ramp(Stimulus):
+    """
+    A current changing linearly from amplitude_start to amplitude_stop during [start, stop)
+
+    :argument
+        amplitude_start: the current at start
+        amplitude_stop: the current reached at stop
+        start: onset in seconds
+        stop: offset in seconds
+    """
+    def __init__(self, amplitude_start: float, amplitude_stop: float, start: float, stop: float):
+        self.amplitude_start = amplitude_start
+        self.amplitude_stop = amplitude_stop
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        slope = (self.amplitude_stop - self.amplitude_start) / (self.stop - self.start)
+        return np.where(window(t, self.start, self.stop), self.amplitude_start + slope * (t - self.start), 0.0)
+
+
+class Sinusoid(Stimulus):
+    """
+    A sinusoidal current offset + amplitude * sin(2 pi frequency (t - start) + phase) during [start, stop)
+
+    :argument
+        amplitude: the amplitude of the oscillation
+        frequency: the frequency in Hz
+        phase: the phase at start in radians
+        offset: the mean current
+        start: onset in seconds
+        stop: offset in seconds
+    """
+    def __init__(self, amplitude: float, frequency: float, phase: float = 0.0, offset: float = 0.0,
+                 start: float = 0.0, stop: float = np.inf):
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.phase = phase
+        self.offset = offset
+        self.start = start
+        self.stop = stop
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        wave = self.offset + self.amplitude * np.sin(2 * np.pi * self.frequency * (t - self.start) + self.phase)
+        return np.where(window(t, self.start, self.stop), wave, 0.0)
+
+
+class PiecewiseConstant(Stimulus):
+    """
+    A current holding values[k] from times[k] until times[k + 1], zero before
+    times[0] and values[-1] after times[-1]
+
+    :argument
+        times: increasing switching times in seconds
+        values: the current from each switching time on
+    """
+    def __init__(self, times, values):
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        if self.times.shape != self.values.shape:
+            raise CompBrainModelError("times and values should have the same length")
+
+    def __call__(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        index = np.searchsorted(self.times, t, side='right') - 1
+        return np.where(index >= 0, self.values[np.maximum(index, 0)], 0.0)
@@ -1 +1,4 @@
-from .read_cfg import read_cfg
\ No newline at end of file
+from .read_cfg import read_cfg
+from .compare import compare_integrators, compare_precision, check_precision
+from .sweep import sweep
+from .cache import load_circuit, clear_cache
@@ -0,0 +1,137 @@
+"""Cache of the circuits built from configuration files"""
+import os
+import glob
+import yaml
+import pickle
+import hashlib
+import compbrain
+from compbrain.core import Circuit
+from compbrain.core.circuit import paused_gc
+from .read_cfg import read_config, config_files
+
+# bumped when the layout of the cached entries changes
+CACHE_FORMAT = 2
+
+# the attributes linking the components to each other, rebuilt by the Circuit
+WIRING = ('parents', 'children')
+
+
+def cache_directory(directory: str = None) -> str:
+    """
+    the directory of the cache, $COMPBRAIN_CACHE or ~/.cache/compbrain by default
+    """
+    if directory is None:
+        directory = os.environ.get('COMPBRAIN_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'compbrain')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def cache_key(content: bytes, kargs: dict) -> str:
+    """
+    the key of a built circuit, the hash of the configuration, of the Circuit
+    keyword arguments and of the library version
+
+    :param content: the bytes of the configuration file
+    :param kargs: keyword arguments of the Circuit
+    :return: hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    digest.update("{}:{}:".format(compbrain.__version__, CACHE_FORMAT).encode())
+    digest.update(repr(sorted(kargs.items())).encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def file_stamp(path: str) -> tuple:
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime_ns
+
+
+def flatten(components: list) -> list:
+    """
+    the components without their wiring, as (class, attributes) pairs, so the
+    pickle of a circuit stays shallow however long its chains of synapses are
+
+    :param components: list of neurons or synapses
+    :return: list of (class, dict of attributes)
+    """
+    return [(type(component), {key: val for key, val in vars(component).items() if key not in WIRING})
+            for component in components]
+
+
+def unflatten(entries: list) -> list:
+    """
+    the unwired components of ``flatten``
+
+    :param entries: list of (class, dict of attributes)
+    :return: list of components
+    """
+    components = []
+    for model, attributes in entries:
+        component = model.__new__(model)
+        component.__dict__.update(attributes)
+        component.parents = []
+        component.children = []
+        components.append(component)
+    return components
+
+
+def load_circuit(cfg: str, directory: str = None, cache: bool = True, **kargs) -> tuple:
+    """
+    build the circuit of a configuration file, or load it from the cache
+
+    the components (class, parameters, initial states and presynaptic and
+    postsynaptic names) are pickled unwired into the cache under the hash of
+    the configuration, the Circuit keyword arguments and the library version,
+    and wired again by the Circuit when loaded, so a change to the YAML builds
+    it again. The parameter files and edge lists the configuration reads are
+    checked by size and modification time. The older entries of the same
+    configuration file are removed
+
+    :param cfg: the configuration file, see ``read_cfg``
+    :param directory: the cache directory, see ``cache_directory``
+    :param cache: use the cache, False always builds the circuit
+    :param kargs: keyword arguments of the Circuit
+    :return: (circuit, t)
+    """
+    with open(cfg, 'rb') as config_file:
+        content = config_file.read()
+    base = os.path.dirname(os.path.abspath(cfg))
+
+    if cache:
+        directory = cache_directory(directory)
+        prefix = hashlib.sha256(os.path.abspath(cfg).encode()).hexdigest()[:12]
+        path = os.path.join(directory, "{}-{}.pkl".format(prefix, cache_key(content, kargs)[:32]))
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as file, paused_gc():
+                    entry = pickle.load(file)
+                if all(os.path.exists(stamp[0]) and file_stamp(stamp[0]) == tuple(stamp) for stamp in entry['files']):
+                    return Circuit(unflatten(entry['neurons']), unflatten(entry['synapses']), **kargs), entry['t']
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, KeyError):
+                pass
+
+    config = yaml.safe_load(content)
+    neurons, synapses, t = read_config(config, base)
+    circuit = Circuit(neurons, synapses, **kargs)
+
+    if cache:
+        entry = dict(files=[file_stamp(name) for name in config_files(config, base)],
+                     neurons=flatten(circuit.neurons), synapses=flatten(circuit.synapses), t=t)
+        for stale in glob.glob(os.path.join(directory, prefix + "-*.pkl")):
+            os.remove(stale)
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    return circuit, t
+
+
+def clear_cache(directory: str = None):
+    """
+    remove every cached circuit
+
+    :param directory: the cache directory, see ``cache_directory``
+    """
+    for path in glob.glob(os.path.join(cache_directory(directory), "*.pkl")):
+        os.remove(path)
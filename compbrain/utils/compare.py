@@ -0,0 +1,162 @@
+import time
+import numpy as np
+from collections import OrderedDict
+from compbrain.core.integrators import INTEGRATORS
+
+
+def run_model(model, states: dict, params: dict, I_ext, dt: float, steps: int, method: str, size: int = 1,
+              dtype=float):
+    """
+    step a population of identical neurons of one model without a circuit
+
+    :param model: the neuron class
+    :param states: initial state variables
+    :param params: parameters of the model
+    :param I_ext: constant external current
+    :param dt: time step in seconds
+    :param steps: number of steps
+    :param method: the integration scheme
+    :param size: number of neurons stepped together
+    :param dtype: the numpy dtype of the states and of the input
+    :return: (voltage trace of the first neuron, elapsed seconds)
+    """
+    dtype = np.dtype(dtype)
+    states = OrderedDict((key, np.full(size, val, dtype=dtype)) for key, val in states.items())
+    I_ext = np.full(size, I_ext, dtype=dtype)
+    V = np.empty(steps + 1)
+    V[0] = states['V'][0]
+
+    start = time.perf_counter()
+    for i in range(steps):
+        states = model.step(states, params, 0.0, I_ext, dt, method)
+        if dtype != np.float64:
+            states = OrderedDict((key, val.astype(dtype, copy=False)) for key, val in states.items())
+        V[i + 1] = states['V'][0]
+    elapsed = time.perf_counter() - start
+
+    return V, elapsed
+
+
+def compare_integrators(model, duration: float = 0.1, dt: float = 1e-5, factors: tuple = (1, 2, 5, 10),
+                        methods: tuple = tuple(INTEGRATORS), I_ext: float = 0.0, params: dict = None,
+                        size: int = 1000) -> list:
+    """
+    accuracy/speed comparison of the integration schemes on one neuron model
+
+    the reference trace is RK4 at dt/10, every scheme runs with the steps
+    dt * factor, the error is taken on the voltage at the times shared with the
+    reference, and the speed is measured on a population of ``size`` neurons.
+    The row of 'euler' with factor 1 is the output of the original models
+
+    :param model: the neuron class
+    :param duration: simulated time in seconds
+    :param dt: the base time step in seconds
+    :param factors: multiples of dt to run each scheme with
+    :param methods: names of the schemes to compare
+    :param I_ext: constant external current
+    :param params: keyword params overwriting the defaults of the model
+    :param size: number of neurons stepped together for the timing
+    :return: list of dict(method, dt, steps, max_error, rms_error, neuron_steps_per_second)
+    """
+    neuron = model('reference', params=params)
+    states = OrderedDict((key, val[-1]) for key, val in neuron.states.items())
+
+    ref_steps = int(round(duration / dt)) * 10
+    V_ref, _ = run_model(model, states, neuron.params, I_ext, dt / 10, ref_steps, 'rk4')
+
+    rows = []
+    for method in methods:
+        for factor in factors:
+            steps = int(round(duration / (dt * factor)))
+            V, elapsed = run_model(model, states, neuron.params, I_ext, dt * factor, steps, method, size)
+            error = V - V_ref[::10 * factor][:steps + 1]
+            rows.append(OrderedDict(
+                method=method, dt=dt * factor, steps=steps,
+                max_error=float(np.max(np.abs(error))),
+                rms_error=float(np.sqrt(np.mean(error ** 2))),
+                neuron_steps_per_second=steps * size / elapsed,
+            ))
+
+    return rows
+
+
+# the (constant input, spike threshold) each built-in model is checked with,
+# the LIF is reset within the step it reaches V_T so its spikes cross just below
+PRECISION_INPUTS = OrderedDict(
+    MorrisLecar=(100.0, 0.0),
+    PhotoInsensitive=(10.0, 0.0),
+    HodgkinHuxley=(30.0, 0.0),
+    LIF=(30.0, 19.5),
+    IAF=(10.0, -50.0),
+)
+
+
+def crossings(V: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    indices of the upward crossings of a threshold by a voltage trace
+    """
+    return np.flatnonzero((V[:-1] < threshold) & (V[1:] >= threshold)) + 1
+
+
+def compare_precision(model, duration: float = 0.1, dt: float = 1e-5, I_ext: float = 0.0, params: dict = None,
+                      method: str = 'euler', dtype=np.float32, threshold: float = None) -> OrderedDict:
+    """
+    accuracy check of a reduced precision on one neuron model
+
+    the model runs with the same input in float64 and in ``dtype``, the voltage
+    traces are compared step by step, and the spikes, the upward crossings of
+    ``threshold``, are compared by count and by time. A spike moved by a
+    single step makes a large pointwise error on a spiking model, the spike
+    shift tells whether the traces still agree up to that jitter
+
+    :param model: the neuron class
+    :param duration: simulated time in seconds
+    :param dt: time step in seconds
+    :param I_ext: constant external current
+    :param params: keyword params overwriting the defaults of the model
+    :param method: the integration scheme
+    :param dtype: the reduced precision
+    :param threshold: spike threshold in mV, the V_T parameter of the model or 0 by default
+    :return: dict(model, I_ext, max_error, rms_error, spikes, missed_spikes, max_spike_shift)
+        with the errors in mV and the shift in seconds
+    """
+    neuron = model('reference', params=params)
+    states = OrderedDict((key, val[-1]) for key, val in neuron.states.items())
+    if threshold is None:
+        threshold = neuron.params.get('V_T', 0.0)
+
+    steps = int(round(duration / dt))
+    V_ref, _ = run_model(model, states, neuron.params, I_ext, dt, steps, method)
+    V, _ = run_model(model, states, neuron.params, I_ext, dt, steps, method, dtype=dtype)
+    error = V - V_ref
+
+    spikes_ref = crossings(V_ref, threshold)
+    spikes = crossings(V, threshold)
+    common = min(len(spikes), len(spikes_ref))
+    shift = np.abs(spikes[:common] - spikes_ref[:common]).max(initial=0) * dt
+
+    return OrderedDict(
+        model=model.__name__, I_ext=I_ext,
+        max_error=float(np.max(np.abs(error))),
+        rms_error=float(np.sqrt(np.mean(error ** 2))),
+        spikes=len(spikes_ref),
+        missed_spikes=abs(len(spikes) - len(spikes_ref)),
+        max_spike_shift=float(shift),
+    )
+
+
+def check_precision(duration: float = 0.1, dt: float = 1e-5, method: str = 'euler', dtype=np.float32) -> list:
+    """
+    the accuracy check of ``compare_precision`` on every built-in neuron
+    model, each driven by its input and compared on its threshold of ``PRECISION_INPUTS``
+
+    :param duration: simulated time in seconds
+    :param dt: time step in seconds
+    :param method: the integration scheme
+    :param dtype: the reduced precision
+    :return: list of the dicts of ``compare_precision``
+    """
+    from compbrain.neurons import registry
+
+    return [compare_precision(registry.get(name), duration, dt, I_ext, method=method, dtype=dtype, threshold=threshold)
+            for name, (I_ext, threshold) in PRECISION_INPUTS.items()]
@@ -1,12 +1,26 @@
+import os
 import yaml
 import numpy as np
-from compbrain.neurons import MorrisLecarNeuron, PhotoInsensitiveNeuron, HodgkinHuxleyNeuron
-from compbrain.synapses import CustomSynapse, InjectCurrent
+from collections import OrderedDict
+from compbrain import neurons as neuron_models, synapses as synapse_models
+from compbrain.synapses import CustomSynapse, InjectCurrent, Projection, Step
 from compbrain.core import CompBrainUtilsError
+from compbrain.core.ensemble import replica_name
+
+DISTRIBUTIONS = OrderedDict(
+    uniform=lambda rng, size, low, high: rng.uniform(low, high, size),
+    normal=lambda rng, size, mean, std: rng.normal(mean, std, size),
+    lognormal=lambda rng, size, mean, sigma: rng.lognormal(mean, sigma, size),
+    choice=lambda rng, size, values: rng.choice(values, size),
+)
 
 
 def read_cfg(cfg):
     """
+    read a configuration file, either one entry per neuron and per synapse
+    (the ``neurons`` and ``synapses`` sections), or whole populations and the
+    projections between them (the ``populations``, ``projections`` and
+    ``inputs`` sections, see ``read_populations``), or both
 
     :param cfg: the configuration file
     :return: [neurons, synapses, t]
@@ -15,6 +29,17 @@ def read_cfg(cfg):
         config = yaml.safe_load(config_file)
         config_file.close()
 
+    return read_config(config, os.path.dirname(os.path.abspath(cfg)))
+
+
+def read_config(config: dict, base: str = '.'):
+    """
+    instantiate the components of a parsed configuration, see ``read_cfg``
+
+    :param config: the parsed configuration
+    :param base: the directory of the relative file paths
+    :return: [neurons, synapses, t]
+    """
     if 'times' in list(config):
         dt = config['times']['dt']
         steps = config['times']['steps']
@@ -24,14 +49,23 @@ def read_cfg(cfg):
         steps = 1e4
         t = np.arange(0, dt * steps, dt)
 
+    neurons, synapses = [], []
+    populations = OrderedDict()
+    if 'populations' in list(config):
+        rng = np.random.default_rng(config.get('seed'))
+        populations = read_populations(config['populations'], rng, base)
+        neurons.extend(neuron for population in populations.values() for neuron in population)
+        synapses.extend(read_inputs(config.get('inputs') or {}, populations, t))
+        synapses.extend(read_projections(config.get('projections') or {}, populations, rng, base))
+
     if 'neurons' in list(config):
-        neurons = read_neurons(config['neurons'])
-    else:
+        neurons = read_neurons(config['neurons']) + neurons
+    elif not populations:
         raise CompBrainUtilsError("no neuron defined in the config file")
 
     if 'synapses' in list(config):
-        synapses = read_synapses(config['synapses'], t)
-    else:
+        synapses = read_synapses(config['synapses'], t) + synapses
+    elif not populations:
         raise CompBrainUtilsError("no synapse defined in the config file")
 
     return [neurons, synapses, t]
@@ -49,20 +83,11 @@ def read_neurons(neurons_cfg):
     neurons = []
     models = list(neurons_cfg)
     for model in models:
-        if model == 'MorrisLecar':
-            for neuron in list(neurons_cfg['MorrisLecar']):
-                neurons.append(MorrisLecarNeuron(neuron, params=neurons_cfg['MorrisLecar'][neuron]))
-
-        elif model == 'PhotoInsensitive':
-            for neuron in list(neurons_cfg['PhotoInsensitive']):
-                neurons.append(PhotoInsensitiveNeuron(neuron, params=neurons_cfg['PhotoInsensitive'][neuron]))
-
-        elif model == 'HodgkinHuxley':
-            for neuron in list(neurons_cfg['HodgkinHuxley']):
-                neurons.append(HodgkinHuxleyNeuron(neuron, params=neurons_cfg['HodgkinHuxley'][neuron]))
-
-        else:
+        if model not in neuron_models.registry:
             raise CompBrainUtilsError("no {} neurons implemented".format(model))
+        cls = neuron_models.registry.get(model)
+        for neuron in list(neurons_cfg[model]):
+            neurons.append(cls(neuron, params=neurons_cfg[model][neuron]))
 
     return neurons
 
@@ -79,20 +104,269 @@ def read_synapses(synapses_cfg, t: np.ndarray):
     synapses = []
     models = list(synapses_cfg)
     for model in models:
-        if model == 'CustomSynapse':
-            for synapse in list(synapses_cfg['CustomSynapse']):
-                synapses.append(CustomSynapse(synapse, synapses_cfg['CustomSynapse'][synapse]['presynaptic'],
-                                              synapses_cfg['CustomSynapse'][synapse]['postsynaptic'],
-                                              params=synapses_cfg['CustomSynapse'][synapse]['params']))
-
-        elif model == 'InjectCurrent':
-            for synapse in list(synapses_cfg['InjectCurrent']):
-                synapses.append(InjectCurrent(synapse, synapses_cfg['InjectCurrent'][synapse]['presynaptic'],
-                                              synapses_cfg['InjectCurrent'][synapse]['postsynaptic'],
-                                              type=synapses_cfg['InjectCurrent'][synapse]['type'],
-                                              t=t))
+        if model not in synapse_models.registry:
+            raise ValueError("no {} synapses implemented".format(model))
+        cls = synapse_models.registry.get(model)
+        for synapse, entry in synapses_cfg[model].items():
+            kwargs = {key: val for key, val in entry.items() if key not in ('presynaptic', 'postsynaptic')}
+            if getattr(cls, 'output', None) == 'I_ext':
+                # the injections sample their current on t
+                kwargs['t'] = t
+            synapses.append(cls(synapse, entry['presynaptic'], entry['postsynaptic'], **kwargs))
+
+    return synapses
+
 
+def config_files(config: dict, base: str = '.') -> list:
+    """
+    the files a parsed configuration reads, its parameter files and edge lists
+
+    :param config: the parsed configuration
+    :param base: the directory of the relative file paths
+    :return: list of paths
+    """
+    specs = []
+    for population in (config.get('populations') or {}).values():
+        specs.extend((population.get('params') or {}).values())
+    for projection in (config.get('projections') or {}).values():
+        specs.extend([projection.get('rule'), projection.get('weights')])
+
+    return [os.path.join(base, spec[kind]) for spec in specs if isinstance(spec, dict)
+            for kind in ('file', 'edges') if kind in spec]
+
+
+def load_array(path: str) -> np.ndarray:
+    """
+    load a .npy file, or a text file of comma (.csv) or whitespace separated values
+    """
+    if path.endswith('.npy'):
+        return np.load(path)
+    return np.loadtxt(path, delimiter=',' if path.endswith('.csv') else None, ndmin=1)
+
+
+def read_array(spec, size: int, rng: np.random.Generator, base: str):
+    """
+    the values of a parameter over a population or the edges of a projection
+
+    :param spec: a scalar shared by all, a list of one value each, a dict
+        {file: path} of a .npy or text file of one value each, or a dict
+        {distribution: [arguments]} sampled for each, the distributions are
+        uniform [low, high], normal [mean, std], lognormal [mean, sigma] and choice [values]
+    :param size: number of values
+    :param rng: the random generator of the distributions
+    :param base: the directory of the relative file paths
+    :return: the scalar, or a numpy array of size values
+    """
+    if isinstance(spec, dict):
+        if len(spec) != 1:
+            raise CompBrainUtilsError("a parameter is given by one distribution or file, not {}".format(list(spec)))
+        (kind, args), = spec.items()
+        if kind == 'file':
+            path = os.path.join(base, args)
+            values = load_array(path)
+        elif kind in DISTRIBUTIONS:
+            values = DISTRIBUTIONS[kind](rng, size, *(args if kind != 'choice' else [args]))
         else:
-            raise ValueError("no {} synapses implemented".format(model))
+            raise CompBrainUtilsError("no {} distribution implemented".format(kind))
+    elif isinstance(spec, (list, tuple)):
+        values = np.asarray(spec, dtype=float)
+    else:
+        return spec
+
+    values = np.asarray(values, dtype=float).ravel()
+    if len(values) != size:
+        raise CompBrainUtilsError("{} values given for {}".format(len(values), size))
+    return values
+
+
+def read_populations(populations_cfg, rng: np.random.Generator, base: str = '.') -> OrderedDict:
+    """
+    instantiate the neurons of every population, named "population[k]"
+
+    the parameters are read as whole arrays, from the YAML or a file, and only
+    the neuron objects themselves are built one by one: the circuit, its
+    name index, ``sync``, the checkpoints, ``rest`` and the Ensemble all work on
+    neuron objects, and the population engine stacks their parameters back
+    into arrays in ``build_populations``
+
+        populations:
+          L:
+            model: MorrisLecar
+            count: 20000
+            params:
+              g_K: 2.0
+              V_1: {uniform: [-16.0, -14.0]}
+              V: {file: V0.npy}
+
+    :param populations_cfg: config['populations']
+    :param rng: the random generator of the distributions
+    :param base: the directory of the relative file paths
+    :return: dict from population name to its list of neurons
+    """
+    populations = OrderedDict()
+    for name, population in populations_cfg.items():
+        model = population.get('model')
+        if model not in neuron_models.registry:
+            raise CompBrainUtilsError("no {} neurons implemented".format(model))
+        count = int(population['count'])
+
+        shared, arrays = {}, OrderedDict()
+        for key, spec in (population.get('params') or {}).items():
+            values = read_array(spec, count, rng, base)
+            if isinstance(values, np.ndarray):
+                arrays[key] = values.tolist()
+            else:
+                shared[key] = values
+
+        cls = neuron_models.registry.get(model)
+        neurons = [cls(replica_name(name, k), params=shared) for k in range(count)]
+        for key, values in arrays.items():
+            if count > 0 and key not in neurons[0].params and key not in neurons[0].states:
+                raise CompBrainUtilsError(f"Unrecognized argument {key}")
+            for neuron, val in zip(neurons, values):
+                if key in neuron.states:
+                    neuron.states[key] = [val]
+                else:
+                    neuron.params[key] = val
+        populations[name] = neurons
+
+    return populations
+
+
+def connect(rule, n_pre: int, n_post: int, rng: np.random.Generator, base: str, autapses: bool = True) -> tuple:
+    """
+    the edges of a connectivity rule
+
+    :param rule: 'all_to_all', {fixed_indegree: k}, {probability: p} or
+        {edges: path} of a .npy or text file of (pre, post) index rows
+    :param n_pre: size of the source population
+    :param n_post: size of the target population
+    :param rng: the random generator of the random rules
+    :param base: the directory of the relative file paths
+    :param autapses: allow the edges from a neuron onto itself
+    :return: (pre, post) numpy arrays of the indices of the edges
+    """
+    kind, arg = (rule, None) if isinstance(rule, str) else next(iter(rule.items()))
+
+    if kind == 'all_to_all':
+        post, pre = np.divmod(np.arange(n_pre * n_post), n_pre)
+    elif kind == 'fixed_indegree':
+        k = int(arg)
+        if k > n_pre - (0 if autapses else 1):
+            raise CompBrainUtilsError("in-degree {} larger than the {} source neurons".format(k, n_pre))
+        pre = np.empty((n_post, k), dtype=int)
+        for i in range(n_post):
+            if autapses:
+                pre[i] = rng.choice(n_pre, k, replace=False)
+            else:
+                sources = rng.choice(n_pre - 1, k, replace=False)
+                pre[i] = sources + (sources >= i)
+        pre = pre.ravel()
+        post = np.repeat(np.arange(n_post), k)
+        return pre, post
+    elif kind == 'probability':
+        # the pairs are drawn by blocks of target rows to bound the memory
+        rows = max(1, 10 ** 7 // max(n_pre, 1))
+        pre, post = [], []
+        for start in range(0, n_post, rows):
+            post_block, pre_block = np.nonzero(rng.random((min(rows, n_post - start), n_pre)) < float(arg))
+            pre.append(pre_block)
+            post.append(post_block + start)
+        pre = np.concatenate(pre) if pre else np.zeros(0, dtype=int)
+        post = np.concatenate(post) if post else np.zeros(0, dtype=int)
+    elif kind == 'edges':
+        path = os.path.join(base, arg)
+        edges = np.asarray(load_array(path), dtype=int).reshape(-1, 2)
+        pre, post = edges[:, 0], edges[:, 1]
+        if len(pre) and (pre.min() < 0 or pre.max() >= n_pre or post.min() < 0 or post.max() >= n_post):
+            raise CompBrainUtilsError("edge index out of range in {}".format(path))
+        return pre, post
+    else:
+        raise CompBrainUtilsError("no {} connectivity rule implemented".format(kind))
+
+    if not autapses:
+        keep = pre != post
+        pre, post = pre[keep], post[keep]
+    return pre, post
+
+
+def read_projections(projections_cfg, populations: OrderedDict, rng: np.random.Generator, base: str = '.') -> list:
+    """
+    instantiate the projections between populations, a Projection (population
+    engine) or, with ``model: CustomSynapse``, one CustomSynapse per edge named
+    "name[k]" (any engine)
+
+        projections:
+          R-L:
+            presynaptic: R
+            postsynaptic: L
+            rule: {fixed_indegree: 10}
+            weights: {uniform: [0.5, 1.5]}
+            params:
+              g_sat: 0.1
+              V_rev: 0.0
+
+    a rule within one population has no autapses unless ``autapses: true``
+
+    :param projections_cfg: config['projections']
+    :param populations: dict from population name to its list of neurons
+    :param rng: the random generator of the rules and distributions
+    :param base: the directory of the relative file paths
+    :return: list of the synapses
+    """
+    synapses = []
+    for name, projection in projections_cfg.items():
+        for side in ('presynaptic', 'postsynaptic'):
+            if projection.get(side) not in populations:
+                raise CompBrainUtilsError("no population named {}".format(projection.get(side)))
+        sources = [neuron.name for neuron in populations[projection['presynaptic']]]
+        targets = [neuron.name for neuron in populations[projection['postsynaptic']]]
+        autapses = projection.get('autapses', projection['presynaptic'] != projection['postsynaptic'])
+        pre, post = connect(projection.get('rule', 'all_to_all'), len(sources), len(targets), rng, base, autapses)
+        weights = read_array(projection.get('weights', 1.0), len(pre), rng, base)
+        params = projection.get('params') or {}
+
+        model = projection.get('model', 'Projection')
+        if model == 'Projection':
+            synapses.append(Projection.from_edges(name, sources, targets, pre, post, weights=weights, params=params))
+        elif model == 'CustomSynapse':
+            if not np.all(np.equal(weights, 1.0)):
+                params = dict(params, scale=np.asarray(params.get('scale', 2), dtype=float) * weights)
+            per_edge = {key: np.broadcast_to(np.asarray(val), (len(pre),)).tolist() for key, val in params.items()}
+            for k, (i, j) in enumerate(zip(pre.tolist(), post.tolist())):
+                synapses.append(CustomSynapse(replica_name(name, k), sources[i], targets[j],
+                                              params={key: val[k] for key, val in per_edge.items()}))
+        else:
+            raise CompBrainUtilsError("no {} projections implemented".format(model))
+
+    return synapses
+
+
+def read_inputs(inputs_cfg, populations: OrderedDict, t: np.ndarray) -> list:
+    """
+    instantiate the current injections onto whole populations, the step
+    current of the per-name format (intensity from 20% to 70% of t), evaluated
+    on demand and shared by all the injections of an input
+
+        inputs:
+          ext-R:
+            postsynaptic: R
+            intensity: 5
+
+    :param inputs_cfg: config['inputs']
+    :param populations: dict from population name to its list of neurons
+    :param t: a time numpy array
+    :return: list of InjectCurrent named "name[k]"
+    """
+    synapses = []
+    for name, inject in inputs_cfg.items():
+        if inject.get('postsynaptic') not in populations:
+            raise CompBrainUtilsError("no population named {}".format(inject.get('postsynaptic')))
+        if inject.get('type', 'step') != 'step':
+            raise CompBrainUtilsError("no {} inject type implemented".format(inject['type']))
+        start, stop = int(0.2 * len(t)), int(0.7 * len(t))
+        stimulus = Step(inject.get('intensity', 5), t[start], t[stop] if stop < len(t) else np.inf)
+        for k, neuron in enumerate(populations[inject['postsynaptic']]):
+            synapses.append(InjectCurrent(replica_name(name, k), 'None', neuron.name, t=t, stimulus=stimulus))
 
     return synapses
@@ -0,0 +1,197 @@
+"""Parameter sweeps fanned out to a pool of processes"""
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from compbrain.core import Circuit, CompBrainUtilsError
+from compbrain.core.ensemble import copy_component
+from .read_cfg import read_cfg
+
+
+def shared_block(**kargs):
+    """
+    a block of shared memory, multiprocessing.shared_memory is imported here
+    since it needs Python >= 3.8 and ``import compbrain.utils`` does not
+
+    :param kargs: the arguments of SharedMemory
+    :return: SharedMemory
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise CompBrainUtilsError("the sweep shares its inputs between processes with Python >= 3.8")
+    return shared_memory.SharedMemory(**kargs)
+
+
+class SharedArray:
+    """
+    A numpy array placed in shared memory, pickled by the name of its block so
+    the processes attach to the same memory instead of receiving a copy
+
+    :argument
+        array: the values to place in shared memory
+    """
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.owner = True
+        self.shm = shared_block(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+
+    def __getstate__(self):
+        return self.shm.name, self.shape, self.dtype.str
+
+    def __setstate__(self, state):
+        name, self.shape, dtype = state
+        self.dtype = np.dtype(dtype)
+        self.owner = False
+        self.shm = shared_block(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def close(self):
+        """
+        release the block, and free it in the process that created it
+        """
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def share_inputs(synapses: list, t: np.ndarray, blocks: list) -> SharedArray:
+    """
+    move the time vector and the injection currents of the synapses into
+    shared memory, an array used by several synapses is placed once
+
+    :param synapses: list of unwired copies of the synapses, modified in place
+    :param t: the time vector
+    :param blocks: list the new SharedArray are added to
+    :return: the shared time vector
+    """
+    shared = {id(t): SharedArray(t)}
+    blocks.append(shared[id(t)])
+
+    def place(array):
+        if not isinstance(array, np.ndarray) or array.ndim == 0:
+            return array
+        if id(array) not in shared:
+            shared[id(array)] = SharedArray(array)
+            blocks.append(shared[id(array)])
+        return shared[id(array)]
+
+    for synapse in synapses:
+        if hasattr(synapse, 'current'):
+            synapse.current = place(synapse.current)
+            synapse.t = place(synapse.t)
+            synapse.kargs = {key: place(val) for key, val in synapse.kargs.items()}
+
+    return shared[id(t)]
+
+
+def attach(value):
+    """
+    the numpy array of a SharedArray, other values are returned as they are
+    """
+    return value.array if isinstance(value, SharedArray) else value
+
+
+# state of a worker process, set once by the pool initializer
+worker = {}
+
+
+def init_worker(neurons: list, synapses: list, t, kargs: dict):
+    """
+    pool initializer, receives the template circuit once per process and
+    attaches the shared arrays
+    """
+    blocks = [t]
+    for synapse in synapses:
+        if hasattr(synapse, 'current'):
+            blocks.extend(val for val in [synapse.current, synapse.t] + list(synapse.kargs.values())
+                          if isinstance(val, SharedArray))
+            synapse.current = attach(synapse.current)
+            synapse.t = attach(synapse.t)
+            synapse.kargs = {key: attach(val) for key, val in synapse.kargs.items()}
+
+    # the blocks stay referenced for as long as the process uses their arrays
+    worker.update(neurons=neurons, synapses=synapses, t=attach(t), kargs=kargs, blocks=blocks)
+
+
+def run_one(k: int, overrides: dict, record) -> tuple:
+    """
+    run the template circuit with one parameter set in a worker
+
+    :param k: index of the parameter set
+    :param overrides: dict from a component name to the dict of the
+        parameters or initial states overwritten in this run
+    :param record: names of the state variables returned, None for all of them
+    :return: (k, dict from component name to the dict of its recorded states)
+    """
+    neurons = [copy_component(neuron, neuron.name, overrides.get(neuron.name, {})) for neuron in worker['neurons']]
+    synapses = [copy_component(synapse, synapse.name, overrides.get(synapse.name, {}))
+                for synapse in worker['synapses']]
+
+    circuit = Circuit(neurons, synapses, **worker['kargs'])
+    circuit.execute_circuit(worker['t'], progress=False)
+
+    results = OrderedDict()
+    for component in neurons + synapses:
+        states = OrderedDict((key, np.array(val, dtype=circuit.dtype)) for key, val in component.states.items()
+                             if record is None or key in record)
+        if states:
+            results[component.name] = states
+
+    return k, results
+
+
+def sweep(source, params: list, t: np.ndarray = None, workers: int = None, record=('V',), **kargs):
+    """
+    run a circuit once per parameter set on a pool of processes and stream
+    the results back as the runs complete
+
+    the template circuit is sent once to every process, its time vector and
+    injection currents are placed in shared memory instead of being pickled,
+    and every run returns numpy arrays of the requested state variables only
+
+    :param source: the path of a configuration file for read_cfg, or a
+        (neurons, synapses) tuple of instantiated components
+    :param params: list of dicts, one per run, from a component name to the dict
+        of the parameters or initial states overwritten in that run, an
+        InjectCurrent also takes its keyword arguments (e.g. intensity)
+    :param t: a time numpy array, by default the one of the configuration file
+    :param workers: number of processes, all the cores by default
+    :param record: names of the state variables returned, None for all of them
+    :param kargs: keyword arguments of the Circuit (engine, recorder, method, ...)
+    :return: generator of (index of the parameter set, dict from component name
+        to the dict of its recorded states), in order of completion
+    """
+    if isinstance(source, str):
+        neurons, synapses, t_cfg = read_cfg(source)
+        t = t_cfg if t is None else t
+    else:
+        neurons, synapses = source
+    if t is None:
+        raise CompBrainUtilsError("no time vector given for the sweep")
+
+    names = set(component.name for component in list(neurons) + list(synapses))
+    for overrides in params:
+        for name in overrides:
+            if name not in names:
+                raise CompBrainUtilsError(f"no component named {name} in the circuit")
+
+    kargs.setdefault('recorder', 'array')
+    blocks = []
+    try:
+        neurons = [copy_component(neuron, neuron.name, {}) for neuron in neurons]
+        synapses = [copy_component(synapse, synapse.name, {}) for synapse in synapses]
+        shared_t = share_inputs(synapses, np.asarray(t, dtype=float), blocks)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(neurons, synapses, shared_t, kargs)) as pool:
+            futures = [pool.submit(run_one, k, overrides, record) for k, overrides in enumerate(params)]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        for block in blocks:
+            block.close()
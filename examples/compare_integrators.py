@@ -0,0 +1,17 @@
+import compbrain as cb
+
+# accuracy/speed of the integration schemes against the original forward Euler,
+# the error is measured against RK4 at dt/10
+cases = [
+    (cb.neurons.MorrisLecarNeuron, 10.0, 1e-4),
+    (cb.neurons.PhotoInsensitiveNeuron, 5.0, 1e-5),
+    (cb.neurons.HodgkinHuxleyNeuron, 10.0, 1e-5),
+    (cb.neurons.LIFNeuron, 10.0, 1e-5),
+]
+
+for model, I_ext, dt in cases:
+    print(model.__name__)
+    print("  {:<10}{:>10}{:>14}{:>14}{:>18}".format('method', 'dt', 'max error', 'rms error', 'neuron steps/s'))
+    for row in cb.utils.compare_integrators(model, duration=0.05, dt=dt, I_ext=I_ext, size=100):
+        print("  {:<10}{:>10.0e}{:>14.3g}{:>14.3g}{:>18.3g}".format(
+            row['method'], row['dt'], row['max_error'], row['rms_error'], row['neuron_steps_per_second']))
@@ -1,9 +1,9 @@
 import compbrain as cb
 
-neurons, synapses, t = cb.utils.read_cfg('neurons_config.yaml')
-
-circuit = cb.core.Circuit(neurons, synapses)
+# built once, then loaded from the cache until the config changes
+circuit, t = cb.utils.load_circuit('neurons_config.yaml')
 circuit.execute_circuit(t)
+neurons, synapses = circuit.neurons, circuit.synapses
 
 import matplotlib.pyplot as plt
 plt.figure(figsize=(20, 15))
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+import pytest
+from compbrain.utils import load_circuit, clear_cache
+from compbrain.utils import cache
+
+CONFIG = """
+seed: 3
+times:
+  dt: 1.0e-5
+  steps: 300
+populations:
+  L:
+    model: MorrisLecar
+    count: 6
+    params:
+      g_K: %s
+      V: {file: V0.npy}
+inputs:
+  ext-L:
+    postsynaptic: L
+    intensity: 80
+projections:
+  L-L:
+    model: CustomSynapse
+    presynaptic: L
+    postsynaptic: L
+    rule: {fixed_indegree: 2}
+"""
+
+LARGE = """
+seed: 1
+times:
+  dt: 1.0e-5
+  steps: 20
+populations:
+  L:
+    model: MorrisLecar
+    count: 3000
+inputs:
+  ext-L:
+    postsynaptic: L
+    intensity: 80
+projections:
+  L-L:
+    model: CustomSynapse
+    presynaptic: L
+    postsynaptic: L
+    rule: {fixed_indegree: 5}
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    np.save(str(tmp_path / 'V0.npy'), np.linspace(-50, -40, 6))
+    path = tmp_path / 'circuit.yaml'
+    path.write_text(CONFIG % 2.0)
+    return str(path)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    count = []
+    read_config = cache.read_config
+
+    def counted(*args):
+        count.append(1)
+        return read_config(*args)
+    monkeypatch.setattr(cache, 'read_config', counted)
+    return count
+
+
+def voltages(circuit, t):
+    circuit.execute_circuit(t, progress=False)
+    return np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons])
+
+
+def test_cached_circuit_runs_like_a_built_one(config, tmp_path, builds):
+    directory = str(tmp_path / 'cache')
+    built, t = load_circuit(config, directory=directory)
+    cached, cached_t = load_circuit(config, directory=directory)
+    assert len(builds) == 1
+    np.testing.assert_array_equal(cached_t, t)
+    np.testing.assert_array_equal(voltages(cached, t), voltages(load_circuit(config, cache=False)[0], t))
+
+
+def test_changes_build_again(config, tmp_path, builds):
+    directory = str(tmp_path / 'cache')
+    load_circuit(config, directory=directory)
+
+    with open(config, 'w') as file:
+        file.write(CONFIG % 2.5)
+    circuit, _ = load_circuit(config, directory=directory)
+    assert len(builds) == 2
+    assert circuit.neurons[0].params['g_K'] == 2.5
+
+    stamp = os.stat(str(tmp_path / 'V0.npy')).st_mtime_ns
+    np.save(str(tmp_path / 'V0.npy'), np.linspace(-60, -40, 6))
+    # the same size, a later modification time even on coarse file systems
+    os.utime(str(tmp_path / 'V0.npy'), ns=(stamp + 10 ** 9, stamp + 10 ** 9))
+    circuit, _ = load_circuit(config, directory=directory)
+    assert len(builds) == 3
+    assert circuit.neurons[0].states['V'][-1] == -60
+
+    load_circuit(config, directory=directory, engine='population')
+    assert len(builds) == 4
+    load_circuit(config, directory=directory)
+    assert len(builds) == 5
+    # the older entries of the configuration are removed
+    assert len(os.listdir(directory)) == 1
+
+
+def test_clear_cache(config, tmp_path, builds):
+    directory = str(tmp_path / 'cache')
+    load_circuit(config, directory=directory)
+    clear_cache(directory)
+    load_circuit(config, directory=directory)
+    assert len(builds) == 2
+
+
+def test_large_circuit(tmp_path):
+    # the components are cached unwired, the pickle does not follow the chains of synapses
+    path = tmp_path / 'large.yaml'
+    path.write_text(LARGE)
+    directory = str(tmp_path / 'cache')
+    built, t = load_circuit(str(path), directory=directory, engine='population')
+    cached, _ = load_circuit(str(path), directory=directory, engine='population')
+
+    assert len(cached.neurons) == 3000
+    for component, other in zip(built.neurons + built.synapses, cached.neurons + cached.synapses):
+        assert [parent.name for parent in other.parents] == [parent.name for parent in component.parents]
+        assert [child.name for child in other.children] == [child.name for child in component.children]
+    np.testing.assert_array_equal(voltages(cached, t), voltages(built, t))
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.02, 1e-5)
+
+
+def build(engine):
+    neurons = [MorrisLecarNeuron(name) for name in 'ABC']
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, current=np.full(len(t), 100.0)),
+                CustomSynapse('AB', 'A', 'B', params={'delay': 2e-4}),
+                CustomSynapse('BC', 'B', 'C')]
+    return Circuit(neurons, synapses, engine=engine, recorder='array')
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_resume_continues_the_whole_run(engine, tmp_path):
+    path = str(tmp_path / 'run.npz')
+    whole = build(engine)
+    whole.execute_circuit(t, progress=False)
+
+    build(engine).execute_circuit(t, checkpoint=path, every=700, progress=False)
+    resumed = build(engine)
+    step = resumed.resume(path)
+    assert step == 1400
+    resumed.execute_circuit(t, start=step, progress=False)
+
+    for neuron, other in zip(whole.neurons, resumed.neurons):
+        V = np.asarray(neuron.states['V'])
+        tail = np.asarray(other.states['V'])
+        assert len(tail) == len(t) - step
+        np.testing.assert_allclose(tail, V[-len(tail):], rtol=1e-12)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.005, 1e-5)
+
+
+def neurons():
+    return [MorrisLecarNeuron('n{}'.format(i)) for i in range(4)]
+
+
+def test_index_and_wiring():
+    circuit = Circuit(neurons(), [CustomSynapse('s', 'n0', 'n1')])
+    assert 'n3' in circuit and 's' in circuit
+    assert circuit['n1'] is circuit.neurons[1]
+    assert circuit['s'].parents == [circuit['n0']] and circuit['s'].children == [circuit['n1']]
+    assert circuit['n0'].children == [circuit['s']] and circuit['n1'].parents == [circuit['s']]
+
+
+def test_duplicate_and_missing_names():
+    with pytest.raises(CompBrainModelError):
+        Circuit(neurons() + [MorrisLecarNeuron('n0')], [])
+    with pytest.raises(CompBrainModelError):
+        Circuit(neurons(), [CustomSynapse('n0', 'n1', 'n2')])
+    with pytest.raises(ValueError):
+        Circuit(neurons(), [CustomSynapse('s', 'n0', 'n9')])
+
+
+def test_failed_synapse_leaves_no_wiring():
+    circuit = Circuit(neurons(), [])
+    with pytest.raises(ValueError):
+        circuit.add_synapse(CustomSynapse('s', 'n0', 'n9'))
+    assert circuit['n0'].children == []
+    assert 's' not in circuit and circuit.synapses == []
+
+
+def test_connect_matches_synapses_built_one_by_one():
+    pre, post = [0, 1, 2, 0], [1, 2, 3, 1]
+    th = [-40.0, -41.0, -42.0, -43.0]
+    built = Circuit(neurons(), [InjectCurrent('I', 'None', 'n0', t=t, intensity=100.0)])
+    synapses = built.connect(pre, post, params={'V_th': th, 'scale': 1.5})
+    assert [synapse.name for synapse in synapses] == ['n0-n1', 'n1-n2', 'n2-n3', 'n0-n1-1']
+    assert [synapse.params['V_th'] for synapse in synapses] == th
+
+    reference = Circuit(neurons(), [InjectCurrent('I', 'None', 'n0', t=t, intensity=100.0)] +
+                        [CustomSynapse('s{}'.format(k), 'n{}'.format(i), 'n{}'.format(j),
+                                       params={'V_th': th[k], 'scale': 1.5})
+                         for k, (i, j) in enumerate(zip(pre, post))])
+    for circuit in (built, reference):
+        circuit.execute_circuit(t, progress=False)
+    for neuron, other in zip(built.neurons, reference.neurons):
+        np.testing.assert_array_equal(neuron.states['V'], other.states['V'])
+
+    with pytest.raises(CompBrainModelError):
+        built.connect([0, 1], [2])
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.core.delay import DelayLine
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.01, 1e-5)
+STEPS = 37
+
+
+def test_delay_line():
+    line = DelayLine(np.zeros(2), 4)
+    for step in range(1, 7):
+        line.push(np.array([step, -step]))
+    np.testing.assert_array_equal(line.read(0), [6, -6])
+    np.testing.assert_array_equal(line.read(3), [3, -3])
+    np.testing.assert_array_equal(line.read(np.array([1, 2]), np.array([0, 1])), [5, -4])
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_delayed_synapse_sees_the_past(engine):
+    neurons = [MorrisLecarNeuron(name) for name in 'ABC']
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, current=np.full(len(t), 100.0)),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40, 'delay': STEPS * 1e-5}),
+                CustomSynapse('AC', 'A', 'C', params={'V_th': -40})]
+    circuit = Circuit(neurons, synapses, engine=engine, recorder='array')
+    circuit.execute_circuit(t, progress=False)
+
+    V_A, V_B, V_C = [np.asarray(neuron.states['V']) for neuron in circuit.neurons]
+    params = circuit.index['AB'].params
+    direct = np.asarray(circuit.index['AC'].states['I_syn'])
+    np.testing.assert_allclose(direct, CustomSynapse.update(V_A, V_C, params), rtol=1e-12)
+    # before the delay has elapsed the synapse sees the initial voltage
+    V_pre = np.concatenate([np.full(STEPS, V_A[0]), V_A[:-STEPS]])
+    delayed = np.asarray(circuit.index['AB'].states['I_syn'])
+    np.testing.assert_allclose(delayed, CustomSynapse.update(V_pre, V_B, params), rtol=1e-12)
+    assert np.ptp(delayed) > 0
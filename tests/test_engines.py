@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, NeuronPopulation
+from compbrain.neurons import registry
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.005, 1e-5)
+CURRENTS = dict(MorrisLecar=100.0, PhotoInsensitive=10.0, HodgkinHuxley=30.0, LIF=30.0, IAF=10.0)
+
+
+def build(model, engine, recorder='list'):
+    cls = registry.get(model)
+    neurons = [cls('a'), cls('b'), cls('c')]
+    synapses = [InjectCurrent('i', 'None', 'a', t=t, current=np.full(len(t), CURRENTS[model])),
+                CustomSynapse('ab', 'a', 'b', params={'V_th': -40}),
+                CustomSynapse('bc', 'b', 'c', params={'V_th': -40})]
+    return Circuit(neurons, synapses, engine=engine, recorder=recorder)
+
+
+def states(circuit) -> dict:
+    return {(component.name, key): np.asarray(val, dtype=float)
+            for component in circuit.neurons + circuit.synapses for key, val in component.states.items()}
+
+
+@pytest.mark.parametrize('model', sorted(CURRENTS))
+@pytest.mark.parametrize('recorder', ['list', 'array'])
+def test_population_engine_matches_object_engine(model, recorder):
+    reference = build(model, 'object')
+    reference.execute_circuit(t, progress=False)
+    circuit = build(model, 'population', recorder)
+    circuit.execute_circuit(t, progress=False)
+
+    expected = states(reference)
+    for key, val in states(circuit).items():
+        assert val.shape == expected[key].shape, key
+        np.testing.assert_allclose(val, expected[key], rtol=1e-10, atol=1e-10, err_msg=str(key))
+
+
+def test_population_stacks_differing_params():
+    cls = registry.get('MorrisLecar')
+    neurons = [cls('a', params={'g_K': 6.0}), cls('b', params={'g_K': 8.0}), cls('c', params={'g_K': 8.0})]
+    population = NeuronPopulation(cls, neurons)
+    np.testing.assert_array_equal(population.params['g_K'], [6.0, 8.0, 8.0])
+    assert np.ndim(population.params['g_Ca']) == 0
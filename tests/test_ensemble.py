@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, Ensemble, CompBrainModelError
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.01, 1e-5)
+PARAMS = [{}, {'A': {'g_K': 6.0}}, {'AB': {'V_th': -30}, 'I': {'intensity': 60.0}}, {'B': {'V': -50.0}}]
+
+
+def template(overrides=None):
+    overrides = overrides or {}
+    neurons = [MorrisLecarNeuron('A', params=overrides.get('A')), MorrisLecarNeuron('B', params=overrides.get('B'))]
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, **{'intensity': 100.0, **overrides.get('I', {})}),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40, **overrides.get('AB', {})})]
+    return neurons, synapses
+
+
+def single(overrides):
+    circuit = Circuit(*template(overrides))
+    circuit.execute_circuit(t, progress=False)
+    return np.array([neuron.states['V'] for neuron in circuit.neurons]).T
+
+
+def test_replicas_match_separate_circuits():
+    ensemble = Ensemble(*template(), PARAMS)
+    assert ensemble.execute_circuit(t, progress=False) == len(t)
+    assert len(ensemble) == len(PARAMS)
+    for k, overrides in enumerate(PARAMS):
+        V = np.stack([ensemble.trace('A')[:, k], ensemble.trace('B')[:, k]], axis=1)
+        np.testing.assert_allclose(V, single(overrides), rtol=1e-10, atol=1e-10)
+    assert not np.allclose(ensemble.trace('B')[:, 0], ensemble.trace('B')[:, 2])
+
+
+def test_unknown_component():
+    with pytest.raises(CompBrainModelError):
+        Ensemble(*template(), [{'C': {'g_K': 6.0}}])
+
+
+def test_checkpointed_ensemble(tmp_path):
+    path = str(tmp_path / 'ensemble.npz')
+    whole = Ensemble(*template(), PARAMS, recorder='array')
+    whole.execute_circuit(t, progress=False)
+    Ensemble(*template(), PARAMS, recorder='array').execute_circuit(t, progress=False, checkpoint=path, every=400)
+
+    resumed = Ensemble(*template(), PARAMS, recorder='array')
+    step = resumed.resume(path)
+    assert step == 800
+    assert resumed.execute_circuit(t, start=step, progress=False) == len(t)
+    np.testing.assert_allclose(resumed.trace('B'), whole.trace('B')[step:], rtol=1e-12)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.neurons import LIFNeuron, IAFNeuron, MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, Step
+
+t = np.arange(0, 0.05, 1e-5)
+
+
+def build(model, currents, **kargs):
+    neurons = [model('n{}'.format(i)) for i in range(len(currents) + 1)]
+    synapses = [InjectCurrent('i{}'.format(i), 'None', 'n{}'.format(i), t=t, current=np.full(len(t), float(current)))
+                for i, current in enumerate(currents)]
+    synapses.append(InjectCurrent('step', 'None', 'n{}'.format(len(currents)), t=t,
+                                  stimulus=Step(2 * currents[-1], 0.01, 0.03)))
+    return Circuit(neurons, synapses, **kargs)
+
+
+@pytest.mark.parametrize('model, currents', [(LIFNeuron, [25, 30, 35]), (IAFNeuron, [5, 10, 15])])
+def test_spikes_match_the_time_stepped_run(model, currents):
+    events = build(model, currents).execute_events(t)
+    stepped = build(model, currents, recorder='array', detect_spikes=True)
+    stepped.execute_circuit(t, progress=False)
+
+    for name, times in events.items():
+        other = stepped.spikes[name]
+        assert len(times) > 0
+        # forward Euler drifts by a fraction of a step per spike, which can
+        # move the last spike of a run out of it
+        assert abs(len(times) - len(other)) <= 1
+        count = min(len(times), len(other))
+        np.testing.assert_allclose(times[:count], other[:count], atol=5e-4)
+        np.testing.assert_allclose(times[0], other[0], atol=2e-5)
+
+
+def test_a_second_call_continues_the_first():
+    whole = build(LIFNeuron, [30]).execute_events(t)
+    circuit = build(LIFNeuron, [30])
+    half = len(t) // 2
+    first = circuit.execute_events(t[:half + 1])
+    second = circuit.execute_events(t[half:])
+    assert len(second['n1']) > 0
+    for name in whole:
+        np.testing.assert_allclose(np.concatenate([first[name], second[name]]), whole[name])
+
+
+def test_reconstruct_follows_the_time_stepped_trace():
+    circuit = build(LIFNeuron, [30])
+    circuit.execute_events(t)
+    circuit.reconstruct(t)
+    stepped = build(LIFNeuron, [30], recorder='array')
+    stepped.execute_circuit(t, progress=False)
+
+    V = np.asarray(circuit.neurons[0].states['V'])
+    assert len(V) == len(t)
+    # up to the first spike the traces only differ by the Euler error
+    first = int(circuit.event_solvers['n0'].spikes[0] / 1e-5) - 1
+    np.testing.assert_allclose(V[:first], np.asarray(stepped.neurons[0].states['V'])[:first], rtol=5e-3)
+
+
+def test_nonlinear_models_are_refused():
+    with pytest.raises(CompBrainModelError):
+        build(MorrisLecarNeuron, [100]).execute_events(t)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.02, 1e-5)
+
+
+def build(engine, gating):
+    neurons = [MorrisLecarNeuron(name) for name in 'ABCD']
+    current = np.concatenate([np.zeros(500), np.full(len(t) - 500, 100.0)])
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, current=current),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40}),
+                CustomSynapse('CD', 'C', 'D', params={'V_th': -20})]
+    circuit = Circuit(neurons, synapses, engine=engine, gating=gating, recorder='array')
+    circuit.rest(0.0)
+    return circuit
+
+
+def voltages(circuit):
+    return np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons])
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_gating_keeps_the_traces(engine):
+    reference = build(engine, False)
+    reference.execute_circuit(t, progress=False)
+    circuit = build(engine, True)
+    circuit.execute_circuit(t, progress=False)
+
+    V = voltages(circuit)
+    np.testing.assert_allclose(V, voltages(reference), rtol=1e-12, atol=1e-12)
+    assert np.ptp(V[1]) > 0.1
+    for val in circuit.index['CD'].states.values():
+        np.testing.assert_allclose(np.asarray(val), 0.0)
+
+
+def test_quiet_neurons():
+    circuit = build('object', True)
+    circuit.execute_circuit(t, progress=False)
+    # A is driven and B receives its synapse, C and D stay at rest
+    assert circuit.quiet == {'C', 'D'}
+
+    circuit = build('population', True)
+    circuit.execute_circuit(t, progress=False)
+    np.testing.assert_array_equal(circuit.populations[0].quiet, [False, False, True, True])
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.core.integrators import INTEGRATORS
+from compbrain.neurons import registry
+from compbrain.synapses import InjectCurrent, CustomSynapse
+from compbrain.utils import compare_integrators
+
+t = np.arange(0, 0.005, 1e-5)
+
+
+def errors(model, I_ext, factor=1, methods=tuple(INTEGRATORS)):
+    rows = compare_integrators(registry.get(model), duration=0.005, factors=(factor,), methods=methods,
+                               I_ext=I_ext, size=1)
+    return {row['method']: row['max_error'] for row in rows}
+
+
+@pytest.mark.parametrize('model, I_ext', [('MorrisLecar', 100.0), ('PhotoInsensitive', 10.0)])
+def test_higher_orders_are_more_accurate(model, I_ext):
+    error = errors(model, I_ext, methods=('euler', 'rk2', 'rk4'))
+    assert error['rk4'] < error['rk2'] < error['euler']
+    assert error['rk4'] < 1e-5
+
+
+def test_exponential_euler_stays_stable():
+    with np.errstate(all='ignore'):
+        error = errors('HodgkinHuxley', 30.0, factor=5, methods=('euler', 'exp_euler'))
+    assert not np.isfinite(error['euler'])
+    assert np.isfinite(error['exp_euler'])
+
+
+def build(engine, method):
+    cls = registry.get('HodgkinHuxley')
+    neurons = [cls('a'), cls('b')]
+    synapses = [InjectCurrent('i', 'None', 'a', t=t, current=np.full(len(t), 30.0)),
+                CustomSynapse('ab', 'a', 'b', params={'V_th': -40})]
+    return Circuit(neurons, synapses, engine=engine, method=method)
+
+
+@pytest.mark.parametrize('method', [method for method in INTEGRATORS if method != 'euler'])
+def test_engines_agree_on_every_scheme(method):
+    voltages = []
+    for engine in ('object', 'population'):
+        circuit = build(engine, method)
+        circuit.execute_circuit(t, progress=False)
+        voltages.append(np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons]))
+    np.testing.assert_allclose(voltages[1], voltages[0], rtol=1e-10, atol=1e-10)
+
+
+def test_unknown_scheme():
+    with pytest.raises(CompBrainModelError):
+        build('object', 'midpoint')
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import MappedInput
+
+# the file holds 10 ms at 20 kHz, the circuit steps 15 ms at 100 kHz
+RATE = 2e4
+t = np.arange(0, 0.015, 1e-5)
+DATA = np.random.default_rng(1).uniform(0, 100, (200, 3)).astype(np.float32)
+
+
+def expected(data, t, rate, t0=0.0, scale=1.0, interpolation='linear'):
+    # np.interp of every channel over the sample times, or the sample held over
+    # its period, zero outside the file
+    times = t0 + np.arange(len(data)) / rate
+    end = times[-1] if interpolation == 'linear' else times[-1] + (1 - 1e-9) / rate
+    inside = (t >= times[0]) & (t <= end)
+    values = np.zeros((len(t), data.shape[1]))
+    for i in range(data.shape[1]):
+        if interpolation == 'linear':
+            values[inside, i] = np.interp(t[inside], times, data[:, i].astype(float))
+        else:
+            values[inside, i] = data[np.floor((t[inside] - t0) * rate + 1e-9).astype(int), i]
+    return values * scale
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'input.npy')
+    np.save(path, DATA)
+    return path
+
+
+@pytest.mark.parametrize('interpolation', ['linear', 'hold'])
+def test_channels_resample_the_file(path, interpolation):
+    source = MappedInput(path, rate=RATE, interpolation=interpolation)
+    reference = expected(np.load(path, mmap_mode='r'), t, RATE, interpolation=interpolation)
+    # t runs past the end of the file
+    assert np.all(reference[-100:] == 0)
+    for i in range(3):
+        channel = source.channel(i)
+        np.testing.assert_allclose(channel(t), reference[:, i], rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(np.asarray(channel.buffer(t, chunk=128)), reference[:, i], rtol=1e-12, atol=1e-9)
+
+
+def test_offset_scale_and_raw_files(tmp_path):
+    path = str(tmp_path / 'input.bin')
+    DATA.tofile(path)
+    source = MappedInput(path, rate=RATE, channels=3, t0=2e-3, scale=0.5)
+    np.testing.assert_allclose(source(t), expected(DATA, t, RATE, t0=2e-3, scale=0.5), rtol=1e-12, atol=1e-9)
+    with pytest.raises(CompBrainModelError):
+        source.channel(3)
+
+
+def test_injections_feed_the_channels(path):
+    source = MappedInput(path, rate=RATE)
+    neurons = [MorrisLecarNeuron('n{}'.format(i)) for i in range(3)]
+    synapses = source.inject(t, ['n0', 'n1', 'n2'], channels=[2, 0, 1])
+    circuit = Circuit(neurons, synapses, recorder='array')
+    circuit.execute_circuit(t, progress=False)
+
+    reference = expected(DATA, t, RATE)
+    for synapse, i in zip(synapses, [2, 0, 1]):
+        np.testing.assert_allclose(np.asarray(synapse.states['I_ext']), reference[:, i], rtol=1e-12, atol=1e-9)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.neurons import MorrisLecarNeuron, HodgkinHuxleyNeuron, LIFNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+from compbrain.utils import check_precision
+
+t = np.arange(0, 0.02, 1e-5)
+
+
+def build(engine, dtype):
+    neurons = [MorrisLecarNeuron('A'), MorrisLecarNeuron('B'), HodgkinHuxleyNeuron('C'), LIFNeuron('D')]
+    synapses = [InjectCurrent('I_A', 'None', 'A', t=t, current=np.full(len(t), 100.0)),
+                InjectCurrent('I_C', 'None', 'C', t=t, current=np.full(len(t), 30.0)),
+                InjectCurrent('I_D', 'None', 'D', t=t, current=np.full(len(t), 30.0)),
+                CustomSynapse('AB', 'A', 'B')]
+    return Circuit(neurons, synapses, engine=engine, recorder='array', dtype=dtype)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_float32_follows_float64(engine):
+    traces = []
+    for dtype in ('float64', 'float32'):
+        circuit = build(engine, dtype)
+        circuit.execute_circuit(t, progress=False)
+        V = [np.asarray(neuron.states['V']) for neuron in circuit.neurons]
+        assert all(trace.dtype == np.dtype(dtype) for trace in V)
+        traces.append(np.array(V, dtype=float))
+    np.testing.assert_allclose(traces[1], traces[0], atol=1e-3)
+
+
+def test_object_engine_refuses_float32_lists():
+    with pytest.raises(CompBrainModelError):
+        Circuit([MorrisLecarNeuron('A')], [], recorder='list', dtype='float32')
+
+
+def test_check_precision_of_the_builtin_models():
+    for row in check_precision(duration=0.02):
+        assert row['max_error'] < 1e-3, row['model']
+        assert row['missed_spikes'] == 0, row['model']
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron, HodgkinHuxleyNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.005, 1e-5)
+
+
+def build(engine, profile, **kargs):
+    neurons = [MorrisLecarNeuron('A'), HodgkinHuxleyNeuron('B')]
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, current=np.full(len(t), 100.0)),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40})]
+    return Circuit(neurons, synapses, engine=engine, recorder='array', profile=profile, **kargs)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+@pytest.mark.parametrize('kargs', [{}, {'gating': True, 'detect_spikes': True}, {'tables': True}])
+def test_profiled_run_is_unchanged(engine, kargs):
+    reference = build(engine, False, **kargs)
+    reference.execute_circuit(t, progress=False)
+    assert reference.profiler is None
+    circuit = build(engine, True, **kargs)
+    circuit.execute_circuit(t, progress=False)
+
+    for neuron, other in zip(circuit.neurons, reference.neurons):
+        np.testing.assert_array_equal(np.asarray(neuron.states['V']), np.asarray(other.states['V']))
+    if kargs.get('detect_spikes'):
+        np.testing.assert_array_equal(circuit.spike_train[1], reference.spike_train[1])
+
+    summary = circuit.profiler.summary()
+    assert summary['steps'] == len(t)
+    assert summary['total'] > 0
+    assert list(summary['phases']) == list(circuit.profiler.phases)
+    assert np.isclose(sum(phase['share'] for phase in summary['phases'].values()), 1.0)
+    classes = set(name for phase in summary['phases'].values() for name in phase['classes'])
+    assert {'MorrisLecarNeuron', 'HodgkinHuxleyNeuron'} <= classes
+    assert 'MorrisLecarNeuron' in circuit.profiler.report()
+
+    circuit.profiler.reset()
+    assert circuit.profiler.summary()['steps'] == 0
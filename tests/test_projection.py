@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainModelError
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse, Projection
+from compbrain.synapses.projection import to_csr
+
+t = np.arange(0, 0.005, 1e-5)
+SOURCES = ['s{}'.format(i) for i in range(5)]
+TARGETS = ['r{}'.format(i) for i in range(4)]
+# (n_post, n_pre) weights, target r3 receives nothing
+WEIGHTS = np.array([[0.5, 0.0, 1.0, 0.0, 0.0],
+                    [0.0, 2.0, 0.0, 0.0, 1.5],
+                    [1.0, 1.0, 0.0, 0.25, 0.0],
+                    [0.0, 0.0, 0.0, 0.0, 0.0]])
+PARAMS = {'V_th': -45, 'V_rev': -70}
+
+
+def neurons():
+    return [MorrisLecarNeuron(name) for name in SOURCES + TARGETS]
+
+
+def inputs():
+    return [InjectCurrent('I' + name, 'None', name, t=t, intensity=40.0 + 15 * i) for i, name in enumerate(SOURCES)]
+
+
+def voltages(circuit):
+    circuit.execute_circuit(t, progress=False)
+    return np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons])
+
+
+def test_projection_matches_synapses_per_edge():
+    projection = Projection('P', SOURCES, TARGETS, weights=WEIGHTS, params=PARAMS)
+    expected = voltages(Circuit(neurons(), inputs() + [projection], engine='population'))
+
+    # a weight scales the current of its synapse, like its scale parameter
+    rows, columns = np.nonzero(WEIGHTS)
+    synapses = [CustomSynapse('e{}'.format(k), SOURCES[j], TARGETS[i],
+                              params=dict(PARAMS, scale=2 * WEIGHTS[i, j]))
+                for k, (i, j) in enumerate(zip(rows, columns))]
+    np.testing.assert_allclose(voltages(Circuit(neurons(), inputs() + synapses, engine='object')), expected,
+                               rtol=1e-9, atol=1e-9)
+    assert np.ptp(expected[len(SOURCES) + 1]) > 0.1
+
+
+def test_weight_formats():
+    rows, columns = np.nonzero(WEIGHTS)
+    dense = to_csr(WEIGHTS, WEIGHTS.shape)
+    edges = Projection.from_edges('P', SOURCES, TARGETS, columns, rows, WEIGHTS[rows, columns])
+    for csr in (to_csr(dense, WEIGHTS.shape), (edges.data, edges.indices, edges.indptr)):
+        for val, other in zip(csr, dense):
+            np.testing.assert_array_equal(val, other)
+    _, _, indptr = to_csr(None, (2, 3))
+    np.testing.assert_array_equal(indptr, [0, 3, 6])
+    with pytest.raises(CompBrainModelError):
+        to_csr(WEIGHTS[:, :4], WEIGHTS.shape)
+    with pytest.raises(CompBrainModelError):
+        to_csr((dense[0], dense[1] + 5, dense[2]), WEIGHTS.shape)
+
+
+def test_object_engine_rejects_projections():
+    with pytest.raises(CompBrainModelError):
+        Circuit(neurons(), [Projection('P', SOURCES, TARGETS, weights=WEIGHTS)], engine='object')
+    circuit = Circuit(neurons(), [])
+    rows, columns = np.nonzero(WEIGHTS)
+    with pytest.raises(CompBrainModelError):
+        circuit.connect(np.array(SOURCES)[columns], np.array(TARGETS)[rows], model=Projection)
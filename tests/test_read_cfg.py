@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, CompBrainUtilsError
+from compbrain.utils import read_cfg
+from compbrain.utils.read_cfg import connect
+
+CONFIG = """
+seed: 3
+times:
+  dt: 1.0e-5
+  steps: 500
+populations:
+  L:
+    model: MorrisLecar
+    count: 12
+    params:
+      g_K: 2.0
+      V_1: {uniform: [-16.0, -14.0]}
+      V: {file: V0.npy}
+inputs:
+  ext-L:
+    postsynaptic: L
+    intensity: 80
+projections:
+  L-L:
+    model: %s
+    presynaptic: L
+    postsynaptic: L
+    rule: {fixed_indegree: 3}
+    weights: {uniform: [0.5, 1.5]}
+"""
+
+
+def write(tmp_path, model):
+    np.save(str(tmp_path / 'V0.npy'), np.linspace(-50, -40, 12))
+    path = tmp_path / 'circuit.yaml'
+    path.write_text(CONFIG % model)
+    return str(path)
+
+
+def test_population_schema(tmp_path):
+    neurons, synapses, t = read_cfg(write(tmp_path, 'Projection'))
+    assert [neuron.name for neuron in neurons] == ["L[{}]".format(k) for k in range(12)]
+    assert len(t) == 500
+    assert all(neuron.params['g_K'] == 2.0 for neuron in neurons)
+    assert all(-16.0 <= neuron.params['V_1'] <= -14.0 for neuron in neurons)
+    np.testing.assert_allclose([neuron.states['V'][0] for neuron in neurons], np.linspace(-50, -40, 12))
+
+
+def test_projection_matches_synapses_per_edge(tmp_path):
+    voltages = []
+    for model, engine in (('Projection', 'population'), ('CustomSynapse', 'object'), ('CustomSynapse', 'population')):
+        neurons, synapses, t = read_cfg(write(tmp_path, model))
+        Circuit(neurons, synapses, engine=engine, recorder='array').execute_circuit(t, progress=False)
+        voltages.append(np.array([np.asarray(neuron.states['V']) for neuron in neurons]))
+    for V in voltages[1:]:
+        np.testing.assert_allclose(V, voltages[0], rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('rule, count', [('all_to_all', 20), ({'fixed_indegree': 2}, 10), ({'probability': 1.0}, 20)])
+def test_connectivity_rules(rule, count):
+    pre, post = connect(rule, 4, 5, np.random.default_rng(0), '.')
+    assert len(pre) == len(post) == count
+    assert pre.max() < 4 and post.max() < 5
+    pre, post = connect(rule, 5, 5, np.random.default_rng(0), '.', autapses=False)
+    assert not np.any(pre == post)
+
+
+def test_unknown_rule():
+    with pytest.raises(CompBrainUtilsError):
+        connect({'ring': 2}, 4, 4, np.random.default_rng(0), '.')
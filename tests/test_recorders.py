@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pytest
+from compbrain.core import Circuit, StreamBuffer
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent
+
+t = np.arange(0, 0.003, 1e-5)
+
+
+def build(recorder, engine='object', **kargs):
+    neurons = [MorrisLecarNeuron('n{}'.format(i)) for i in range(6)]
+    synapses = [InjectCurrent('i{}'.format(i), 'None', 'n{}'.format(i), t=t, current=np.full(len(t), 20.0 * i))
+                for i in range(0, 6, 2)]
+    circuit = Circuit(neurons, synapses, engine=engine, recorder=recorder, **kargs)
+    circuit.connect(np.arange(6), (np.arange(6) + 1) % 6, params={'V_th': -40})
+    return circuit
+
+
+def recordings(circuit) -> dict:
+    return {(component.name, key): np.array(val) for component in circuit.neurons + circuit.synapses
+            for key, val in component.states.items()}
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+@pytest.mark.parametrize('recorder', ['array', 'file'])
+def test_recorders_match_lists(engine, recorder, tmp_path):
+    reference = build('list')
+    reference.execute_circuit(t, progress=False)
+    circuit = build(recorder, engine, directory=str(tmp_path), chunk=32)
+    circuit.execute_circuit(t, progress=False)
+
+    expected = recordings(reference)
+    for key, val in recordings(circuit).items():
+        np.testing.assert_allclose(val, expected[key], rtol=1e-12, atol=1e-12)
+    if recorder == 'file':
+        assert len(os.listdir(str(tmp_path))) > 0
+
+
+def test_stream_buffer_reopens_its_file(tmp_path):
+    path = str(tmp_path / 'V.npy')
+    buffer = StreamBuffer(path, [1.0], chunk=4)
+    buffer.extend(np.arange(10.0))
+    buffer.finish()
+    loaded = StreamBuffer.load(path, chunk=4)
+    np.testing.assert_array_equal(loaded.array, buffer.array)
+    loaded.append(42.0)
+    loaded.finish()
+    np.testing.assert_array_equal(np.load(path), np.concatenate([[1.0], np.arange(10.0), [42.0]]))
+
+
+@pytest.mark.parametrize('recorder', ['list', 'array', 'file', 'none'])
+def test_sharded_matches_serial(recorder, tmp_path):
+    serial = build(recorder, directory=str(tmp_path / 'serial'))
+    serial.execute_circuit(t, progress=False)
+    expected = recordings(serial)
+
+    sharded = build(recorder, directory=str(tmp_path / 'sharded'))
+    sharded.execute_sharded(t, 2)
+    for key, val in recordings(sharded).items():
+        np.testing.assert_array_equal(val, expected[key])
+    if recorder == 'file':
+        assert isinstance(sharded.neurons[0].states['V'], StreamBuffer)
+        assert sharded.neurons[0].states['V'].path.startswith(str(tmp_path / 'sharded'))
@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+import importlib.metadata
+import pytest
+from compbrain.core import CompBrainModelError
+from compbrain.registry import Registry
+from compbrain.neurons import registry, MorrisLecarNeuron
+
+
+class EntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class EntryPoints(list):
+    def select(self, group):
+        return [entry for entry in self if group == 'test.neurons']
+
+
+def test_models_are_imported_on_first_use():
+    models = Registry('neurons', 'test.neurons', {'ML': 'compbrain.neurons.morris_lecar:MorrisLecarNeuron'})
+    assert isinstance(models.models['ML'], str)
+    assert models.get('ML') is MorrisLecarNeuron
+    assert models.models['ML'] is MorrisLecarNeuron
+    assert registry.get('MorrisLecar') is MorrisLecarNeuron
+
+
+def test_register_and_plugins(monkeypatch):
+    models = Registry('neurons', 'test.neurons', {})
+
+    @models.register('Custom')
+    class CustomNeuron(MorrisLecarNeuron):
+        pass
+    assert models.get('Custom') is CustomNeuron
+
+    monkeypatch.setattr(importlib.metadata, 'entry_points', lambda: EntryPoints(
+        [EntryPoint('Plugin', 'compbrain.neurons.leaky_integrate_and_fire:LIFNeuron')]))
+    assert 'Plugin' in models
+    assert models.get('Plugin').__name__ == 'LIFNeuron'
+    assert models.names() == ['Custom', 'Plugin']
+
+    with pytest.raises(CompBrainModelError):
+        models.get('Izhikevich')
+
+
+def test_import_is_lazy():
+    statement = ("import sys, compbrain, compbrain.neurons; compbrain.neurons.registry.names(); "
+                 "print(sorted(name for name in sys.modules if name.startswith(('compbrain.', 'numpy'))))")
+    loaded = subprocess.run([sys.executable, '-c', statement], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert "'compbrain.neurons'" in loaded
+    assert 'compbrain.core' not in loaded
+    assert 'compbrain.neurons.morris_lecar' not in loaded
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.core.rest import RESTING_STATES
+from compbrain.neurons import HodgkinHuxleyNeuron, PhotoInsensitiveNeuron, MorrisLecarNeuron, LIFNeuron, IAFNeuron
+from compbrain.synapses import InjectCurrent
+
+t = np.arange(0, 0.02, 1e-5)
+CURRENTS = dict(HH=2.0, PI=0.0, ML=0.0, L1=5.0, L2=40.0, IAF=5.0)
+
+
+def build(engine, **kargs):
+    neurons = [HodgkinHuxleyNeuron('HH'), PhotoInsensitiveNeuron('PI'), MorrisLecarNeuron('ML'),
+               LIFNeuron('L1'), LIFNeuron('L2'), IAFNeuron('IAF')]
+    synapses = [InjectCurrent('I_' + name, 'None', name, t=t, current=np.full(len(t), current))
+                for name, current in CURRENTS.items()]
+    return Circuit(neurons, synapses, engine=engine, recorder='array', **kargs)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_neurons_stay_at_rest(engine):
+    circuit = build(engine)
+    unchanged = circuit.rest(CURRENTS)
+    # a LIF above its threshold and an IAF fire at their holding current
+    assert unchanged == ['L2', 'IAF']
+    circuit.execute_circuit(t, progress=False)
+    for neuron in circuit.neurons:
+        if neuron.name not in unchanged:
+            V = np.asarray(neuron.states['V'])
+            assert np.ptp(V) < 1e-8, neuron.name
+    assert circuit.neurons[-1].states['V'][0] == IAFNeuron('IAF').states['V'][0]
+
+
+def test_currents_by_neuron():
+    by_name = build('object')
+    by_name.rest(CURRENTS)
+    by_index = build('object')
+    by_index.rest(list(CURRENTS.values()))
+    for neuron, other in zip(by_name.neurons, by_index.neurons):
+        assert neuron.states['V'][-1] == other.states['V'][-1]
+
+
+def test_resting_states_are_cached():
+    build('object').rest(CURRENTS)
+    solved = len(RESTING_STATES)
+    build('object').rest(CURRENTS)
+    assert len(RESTING_STATES) == solved
+    build('object').rest(dict(CURRENTS, HH=3.0))
+    assert len(RESTING_STATES) == solved + 1
+    build('object', tables=True).rest(CURRENTS)
+    assert len(RESTING_STATES) > solved + 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.005, 1e-5)
+
+
+def build(engine):
+    neurons = [MorrisLecarNeuron('A'), MorrisLecarNeuron('B')]
+    synapses = [InjectCurrent('I', 'None', 'A', t=t, current=np.full(len(t), 100.0)),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40})]
+    return Circuit(neurons, synapses, engine=engine, recorder='array')
+
+
+def voltages(circuit):
+    return np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons])
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+@pytest.mark.parametrize('chunk', [None, 1, 64])
+def test_chunks_do_not_change_the_run(engine, chunk):
+    reference = build(engine)
+    reference.execute_circuit(t, progress=False)
+    calls = []
+    circuit = build(engine)
+    step = circuit.execute_circuit(t, progress=False, chunk=chunk,
+                                   callback=lambda circuit, step, stop: calls.append(step))
+    assert step == len(t)
+    np.testing.assert_array_equal(voltages(circuit), voltages(reference))
+    assert calls[-1] == len(t) - 1
+    assert calls == sorted(calls)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_callback_stops_the_run(engine):
+    circuit = build(engine)
+    calls = []
+    step = circuit.run(len(t), dt=1e-5, chunk=100, interval=0.0,
+                       callback=lambda circuit, step, stop: calls.append(step) or step < 200)
+    assert step == 200
+    assert calls == [100, 200]
+    assert len(circuit.neurons[0].states['V']) == 201
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_runs_continue_each_other(engine):
+    reference = build(engine)
+    reference.execute_circuit(t, progress=False)
+    circuit = build(engine)
+    assert circuit.run(200, dt=1e-5) == 200
+    assert circuit.run(len(t) - 200) == len(t) - 200
+    np.testing.assert_array_equal(voltages(circuit)[:, :len(t)], voltages(reference)[:, :len(t)])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.core.shard import partition, BoundaryNeuron
+from compbrain.neurons import MorrisLecarNeuron, HodgkinHuxleyNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+
+t = np.arange(0, 0.003, 1e-5)
+SIZE = 24
+
+
+def build():
+    # a ring with chords, so every cut crosses synapses both ways
+    rng = np.random.default_rng(2)
+    neurons = [(MorrisLecarNeuron if i % 3 else HodgkinHuxleyNeuron)('n{}'.format(i)) for i in range(SIZE)]
+    synapses = [InjectCurrent('I{}'.format(i), 'None', 'n{}'.format(i), t=t, intensity=float(rng.uniform(20, 100)))
+                for i in range(0, SIZE, 4)]
+    pairs = [(i, (i + 1) % SIZE) for i in range(SIZE)] + [tuple(rng.choice(SIZE, 2, replace=False)) for _ in range(12)]
+    synapses += [CustomSynapse('s{}'.format(k), 'n{}'.format(i), 'n{}'.format(j), params={'V_th': -45})
+                 for k, (i, j) in enumerate(pairs)]
+    return Circuit(neurons, synapses, recorder='array')
+
+
+def traces(circuit):
+    return np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons])
+
+
+@pytest.mark.parametrize('shards', [2, 3, 5])
+def test_partition_covers_every_neuron_once(shards):
+    circuit = build()
+    shard = partition(circuit.neurons, circuit.synapses, shards)
+    assert shard.shape == (SIZE,)
+    assert set(shard.tolist()) == set(range(shards))
+    assert np.bincount(shard, minlength=shards).sum() == SIZE
+    assert np.bincount(shard).max() <= 1.05 * SIZE / shards
+
+
+def test_partition_follows_the_components():
+    neurons = [MorrisLecarNeuron('n{}'.format(i)) for i in range(8)]
+    synapses = [CustomSynapse('s{}'.format(i), 'n{}'.format(i), 'n{}'.format(i + 1)) for i in (0, 1, 2, 4, 5, 6)]
+    shard = partition(neurons, synapses, 2)
+    # two disconnected chains of 4 neurons, no synapse crosses the cut
+    assert len(set(shard[:4])) == 1 and len(set(shard[4:])) == 1 and shard[0] != shard[4]
+
+
+@pytest.mark.parametrize('shards', [1, 2, 3, 4])
+def test_sharded_matches_single_process(shards):
+    serial = build()
+    serial.execute_circuit(t, progress=False)
+    sharded = build()
+    shard = sharded.execute_sharded(t, shards)
+    assert len(shard) == SIZE and set(shard.tolist()) == set(range(shards))
+    np.testing.assert_array_equal(traces(sharded), traces(serial))
+
+
+def test_shards_without_boundary():
+    # two disconnected chains, no voltage is exchanged between the shards
+    def chains():
+        return Circuit([MorrisLecarNeuron('n{}'.format(i)) for i in range(4)],
+                       [InjectCurrent('I', 'None', 'n0', t=t, intensity=100.0),
+                        CustomSynapse('s', 'n0', 'n1'), CustomSynapse('r', 'n2', 'n3')])
+    serial = chains()
+    serial.execute_circuit(t, progress=False)
+    sharded = chains()
+    sharded.execute_sharded(t, 2)
+    np.testing.assert_array_equal(traces(sharded), traces(serial))
+
+
+def test_boundary_neuron_stands_in():
+    # a synapse reading a boundary neuron sees the published voltage
+    source = MorrisLecarNeuron('A')
+    source.states['V'] = [-30.0]
+    reference = Circuit([source, MorrisLecarNeuron('B')], [CustomSynapse('AB', 'A', 'B', params={'V_th': -45})])
+    reference.execute_step(1e-5, neurons_policy=False)
+    ghost = Circuit([BoundaryNeuron('A', -30.0), MorrisLecarNeuron('B')],
+                    [CustomSynapse('AB', 'A', 'B', params={'V_th': -45})])
+    ghost.execute_step(1e-5, neurons_policy=False)
+    assert ghost['AB'].states['I_syn'] == reference['AB'].states['I_syn']
+    assert ghost['AB'].states['I_syn'][-1] != 0
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron, LIFNeuron, IAFNeuron, HodgkinHuxleyNeuron
+from compbrain.synapses import InjectCurrent
+
+t = np.arange(0, 0.02, 1e-5)
+
+
+def build(model, currents, **kargs):
+    neurons = [model('n{}'.format(i)) for i in range(len(currents))]
+    synapses = [InjectCurrent('i{}'.format(i), 'None', 'n{}'.format(i), t=t, current=np.full(len(t), float(current)))
+                for i, current in enumerate(currents)]
+    return Circuit(neurons, synapses, **kargs)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_reset_restores_initial_states_without_recordings(engine):
+    circuit = build(MorrisLecarNeuron, [100.0], engine=engine, recorder='none')
+    circuit.execute_circuit(t, progress=False)
+    first = circuit.neurons[0].states['V'][-1]
+    assert len(circuit.neurons[0].states['V']) <= 2
+
+    circuit.reset_circuit()
+    assert circuit.neurons[0].states['V'][-1] == -44.5
+    assert circuit.neurons[0].states['N'][-1] == 0.5
+    circuit.execute_circuit(t, progress=False)
+    assert circuit.neurons[0].states['V'][-1] == first
+
+
+@pytest.mark.parametrize('model, currents', [(LIFNeuron, [25, 30, 35]), (IAFNeuron, [5, 10, 15]),
+                                             (HodgkinHuxleyNeuron, [10, 30, 50])])
+def test_engines_detect_the_same_spikes(model, currents):
+    trains = []
+    for engine in ('object', 'population'):
+        for recorder in ('array', 'none'):
+            circuit = build(model, currents, engine=engine, recorder=recorder, detect_spikes=True)
+            circuit.execute_circuit(t, progress=False)
+            trains.append(circuit.spike_train)
+
+    index, times = trains[0]
+    assert len(index) > 0
+    assert np.all(np.diff(times) >= 0)
+    for other_index, other_times in trains[1:]:
+        np.testing.assert_array_equal(other_index, index)
+        np.testing.assert_allclose(other_times, times)
+
+
+def test_spikes_found_before_the_reset():
+    # the recorded LIF voltage is reset within the step and never reaches the threshold
+    circuit = build(LIFNeuron, [30], recorder='array', detect_spikes=True)
+    circuit.execute_circuit(t, progress=False)
+    V = np.asarray(circuit.neurons[0].states['V'])
+    assert V.max() < circuit.neurons[0].params['V_T']
+    assert len(circuit.spikes['n0']) > 0
+
+
+def test_refractory_interval():
+    circuit = build(LIFNeuron, [35], detect_spikes=dict(refractory=2e-3))
+    circuit.execute_circuit(t, progress=False)
+    assert np.all(np.diff(circuit.spikes['n0']) >= 2e-3)
+
+
+@pytest.mark.parametrize('engine', ['object', 'population'])
+def test_resume_keeps_the_spikes(engine, tmp_path):
+    path = str(tmp_path / 'run.npz')
+    whole = build(IAFNeuron, [5, 10], engine=engine, recorder='none', detect_spikes=True)
+    whole.execute_circuit(t, progress=False)
+
+    saved = build(IAFNeuron, [5, 10], engine=engine, recorder='none', detect_spikes=True)
+    saved.execute_circuit(t, checkpoint=path, every=700, progress=False)
+    resumed = build(IAFNeuron, [5, 10], engine=engine, recorder='none', detect_spikes=True)
+    step = resumed.resume(path)
+    resumed.execute_circuit(t, start=step, progress=False)
+
+    np.testing.assert_array_equal(resumed.spike_train[0], whole.spike_train[0])
+    np.testing.assert_allclose(resumed.spike_train[1], whole.spike_train[1])
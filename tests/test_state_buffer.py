@@ -0,0 +1,29 @@
+import numpy as np
+from compbrain.core import StateBuffer
+
+
+def test_behaves_like_a_list():
+    buffer = StateBuffer([1.0], capacity=2)
+    for val in (2.0, 3.0, 4.0):
+        buffer.append(val)
+    buffer.extend([5.0, 6.0])
+    assert len(buffer) == 6
+    assert buffer[-1] == 6.0 and buffer[0] == 1.0
+    assert buffer.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    np.testing.assert_array_equal(np.asarray(buffer)[2:4], buffer[2:4])
+
+
+def test_reserve_keeps_the_values():
+    buffer = StateBuffer([1.0, 2.0])
+    buffer.reserve(100)
+    assert buffer.capacity >= 102
+    assert buffer.tolist() == [1.0, 2.0]
+
+
+def test_column_views_a_population_recording():
+    buffer = StateBuffer(np.zeros((1, 3)), capacity=4, shape=(3,))
+    buffer.append(np.array([1.0, 2.0, 3.0]))
+    column = buffer.column(1)
+    assert column.tolist() == [0.0, 2.0]
+    buffer.data[1, 1] = 7.0
+    assert column[-1] == 7.0
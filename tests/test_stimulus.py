@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, Step, PulseTrain, Ramp, Sinusoid, PiecewiseConstant, MappedInput
+
+t = np.arange(0, 0.01, 1e-5)
+STIMULI = [Step(80.0, 1e-3, 6e-3), PulseTrain(90.0, 2e-3, 5e-4), Ramp(0.0, 100.0, 0.0, 8e-3),
+           Sinusoid(50.0, 300.0, offset=50.0), PiecewiseConstant([0.0, 3e-3, 5e-3], [20.0, 90.0, 0.0])]
+
+
+@pytest.mark.parametrize('stimulus', STIMULI, ids=lambda stimulus: type(stimulus).__name__)
+def test_buffer_matches_the_waveform(stimulus):
+    buffer = stimulus.buffer(t, chunk=128)
+    np.testing.assert_allclose(np.asarray(buffer), stimulus(t))
+    assert buffer[len(t) - 1] == stimulus(t[-1:])[0]
+
+
+def build(path, engine):
+    source = MappedInput(path, rate=2e4)
+    neurons = [MorrisLecarNeuron('n{}'.format(i)) for i in range(len(STIMULI) + 4)]
+    synapses = [InjectCurrent('s{}'.format(i), 'None', 'n{}'.format(i), t=t, stimulus=stimulus)
+                for i, stimulus in enumerate(STIMULI)]
+    synapses += source.inject(t, ['n5', 'n6', 'n7'])
+    synapses.append(InjectCurrent('dense', 'None', 'n8', t=t, current=np.linspace(0, 100, len(t))))
+    return Circuit(neurons, synapses, engine=engine, recorder='array')
+
+
+def test_engines_read_the_same_inputs(tmp_path):
+    path = str(tmp_path / 'input.npy')
+    np.save(path, np.random.default_rng(0).uniform(0, 100, (300, 3)).astype(np.float32))
+
+    voltages = []
+    for engine in ('object', 'population'):
+        circuit = build(path, engine)
+        circuit.execute_circuit(t, progress=False)
+        voltages.append(np.array([np.asarray(neuron.states['V']) for neuron in circuit.neurons]))
+    np.testing.assert_allclose(voltages[1], voltages[0], rtol=1e-12, atol=1e-9)
@@ -0,0 +1,32 @@
+import numpy as np
+from compbrain.core import Circuit
+from compbrain.neurons import MorrisLecarNeuron
+from compbrain.synapses import InjectCurrent, CustomSynapse
+from compbrain.utils import sweep
+
+t = np.arange(0, 0.005, 1e-5)
+
+
+def components():
+    neurons = [MorrisLecarNeuron('A'), MorrisLecarNeuron('B')]
+    synapses = [InjectCurrent('iA', 'None', 'A', t=t, current=np.full(len(t), 80.0)),
+                CustomSynapse('AB', 'A', 'B', params={'V_th': -40})]
+    return neurons, synapses
+
+
+def test_sweep_matches_serial_runs():
+    params = [{'A': {'V': -50.0}}, {'AB': {'V_th': -30}}, {}]
+    results = dict(sweep(components(), params, t=t, workers=2))
+    assert sorted(results) == [0, 1, 2]
+
+    for k, overrides in enumerate(params):
+        neurons, synapses = components()
+        for component in neurons + synapses:
+            for key, val in overrides.get(component.name, {}).items():
+                if key in component.states:
+                    component.states[key] = [val]
+                else:
+                    component.params[key] = val
+        Circuit(neurons, synapses).execute_circuit(t, progress=False)
+        for neuron in neurons:
+            np.testing.assert_array_equal(results[k][neuron.name]['V'], np.asarray(neuron.states['V']))
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from compbrain.core import Circuit, RateTable
+from compbrain.core.rest import RESTING_STATES
+from compbrain.neurons import HodgkinHuxleyNeuron, PhotoInsensitiveNeuron
+from compbrain.synapses import InjectCurrent
+
+t = np.arange(0, 0.01, 1e-5)
+
+
+def run(model, engine, tables, current=30.0):
+    neuron = model('a')
+    circuit = Circuit([neuron], [InjectCurrent('i', 'None', 'a', t=t, current=np.full(len(t), current))],
+                      engine=engine, recorder='array', tables=tables)
+    circuit.execute_circuit(t, progress=False)
+    return np.asarray(neuron.states['V'])
+
+
+@pytest.mark.parametrize('model', [HodgkinHuxleyNeuron, PhotoInsensitiveNeuron])
+def test_tables_follow_the_analytic_rates(model):
+    exact = run(model, 'object', False)
+    for engine in ('object', 'population'):
+        np.testing.assert_allclose(run(model, engine, True), exact, atol=1e-2)
+    np.testing.assert_allclose(run(model, 'population', True), run(model, 'object', True), rtol=1e-9, atol=1e-9)
+
+
+def test_tables_belong_to_the_circuit():
+    exact = run(HodgkinHuxleyNeuron, 'object', False)
+    run(HodgkinHuxleyNeuron, 'object', dict(step=0.5))
+    assert HodgkinHuxleyNeuron.table is None
+    np.testing.assert_array_equal(run(HodgkinHuxleyNeuron, 'object', False), exact)
+
+
+def test_variant_is_cached_and_keeps_the_model():
+    variant = HodgkinHuxleyNeuron.tabulate(step=0.1)
+    assert variant is HodgkinHuxleyNeuron.tabulate(step=0.1)
+    assert issubclass(variant, HodgkinHuxleyNeuron) and variant.analytic is HodgkinHuxleyNeuron
+    assert variant.tabulate(step=0.1) is variant
+    assert isinstance(variant.table, RateTable)
+
+
+def test_subclass_reads_its_own_table():
+    class Shifted(HodgkinHuxleyNeuron):
+        pass
+
+    variant = Shifted.tabulate(step=1.0)
+    states = dict(V=np.array([-65.3]), n=np.array([0.3]), m=np.array([0.05]), h=np.array([0.6]))
+    params = Shifted('x').params
+    coarse = variant.gradient(states, params, 0.0, 0.0)['n']
+    fine = Shifted.gradient(states, params, 0.0, 0.0)['n']
+    assert coarse != fine
+    np.testing.assert_allclose(coarse, fine, rtol=1e-2)
+
+
+def test_error_report():
+    report = HodgkinHuxleyNeuron.tabulate(step=0.01).table.error(samples=10000)
+    for name, error in report.items():
+        assert error['max_abs_error'] < 1e-4
+        assert 'estimate' in error
+
+
+def test_resting_states_are_cached_per_variant():
+    RESTING_STATES.clear()
+    neurons = [HodgkinHuxleyNeuron('a')]
+    Circuit(neurons, []).rest(0.0)
+    Circuit([HodgkinHuxleyNeuron('b')], [], tables=dict(step=1.0)).rest(0.0)
+    assert {key[0] for key in RESTING_STATES} == {HodgkinHuxleyNeuron, HodgkinHuxleyNeuron.tabulate(step=1.0)}